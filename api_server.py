@@ -5,17 +5,13 @@ FastAPI 서버 - 천기문 사주풀이 API (배포용)
 
 import sys
 import os
-import re
-import yaml
 from pathlib import Path
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
-from sse_starlette.sse import EventSourceResponse
 from pydantic import BaseModel
 import asyncio
 from typing import Optional, List
-import json
 from dotenv import load_dotenv
 from datetime import datetime
 import httpx
@@ -34,7 +30,25 @@ BASE_DIR = Path(__file__).parent
 
 # LLM_모듈 경로 추가
 sys.path.insert(0, str(BASE_DIR))
-from client import LLMClient
+from client import StreamUsage
+from prompt_registry import PromptRegistry, VARIANT_FILES
+from prompt_template import CompiledSection, GenerationConfig
+from prompt_data import PRETTY, SajuDataFormat
+from cache_backends import create_cache_backend
+from reading_cache import ReadingCache, reading_cache_key
+from manseryuk_cache import ManseryukMemo, manseryuk_cache_key, normalize_birth_input
+from manseryuk_engine import calculate_batch, calculate_enrichment, diff_enrichment
+from saju_events import SajuEventHub
+from saju_jobs import SajuJobQueue
+from stream_sessions import StreamSessionStore
+from sse_streams import ClosingEventSourceResponse, aclosing, stream_stats
+from stream_generations import GenerationRegistry
+from single_flight import SingleFlight, generation_key
+from part_parser import PartStreamParser
+from token_coalescer import TokenCoalescer
+from cascade import ModelCascade
+from provider_router import ProviderRouter, create_provider_router
+import json_codec
 
 # FastAPI 앱 생성
 app = FastAPI(title="천기문 사주풀이 API", version="1.0.0")
@@ -48,40 +62,219 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# LLM 공급자 (claude / gemini, 쉼표로 여러 개면 앞이 primary - 첫 토큰이 늦으면 헤지, 오류면 다음 공급자로)
+LLM_PROVIDERS = [name.strip() for name in os.getenv("LLM_PROVIDERS", "claude").split(",") if name.strip()]
+LLM_HEDGE_AFTER_MS = float(os.getenv("LLM_HEDGE_AFTER_MS", "2000"))  # 첫 토큰 대기 한도 (0이면 헤지 없이 장애 전환만)
+LLM_PROVIDER_FAILURES = int(os.getenv("LLM_PROVIDER_FAILURES", "3"))  # 첫 토큰 전 연속 오류 → 일시 제외
+LLM_PROVIDER_COOLDOWN = float(os.getenv("LLM_PROVIDER_COOLDOWN", "30"))  # 제외 시간 (초)
+
 # 전역 변수
-llm_client = LLMClient()
+llm_client = create_provider_router(
+    LLM_PROVIDERS,
+    hedge_after=LLM_HEDGE_AFTER_MS / 1000,
+    failure_threshold=LLM_PROVIDER_FAILURES,
+    cooldown=LLM_PROVIDER_COOLDOWN
+)
 db_pool: Optional[asyncpg.Pool] = None
 
-# 스트림 세션 저장소 (EventSource용 2단계 방식)
-stream_sessions: dict = {}
+# 섹션 풀이 캐시 (memory / postgres / off)
+READING_CACHE_BACKEND = os.getenv("READING_CACHE_BACKEND", "memory")
+READING_CACHE_TTL = float(os.getenv("READING_CACHE_TTL", str(7 * 24 * 3600)))
+READING_CACHE_MAX_ENTRIES = int(os.getenv("READING_CACHE_MAX_ENTRIES", "5000"))
+reading_cache: Optional[ReadingCache] = None
+if READING_CACHE_BACKEND != "off":
+    reading_cache = ReadingCache(create_cache_backend(
+        READING_CACHE_BACKEND,
+        lambda: db_pool,
+        table="section_reading_cache",
+        max_entries=READING_CACHE_MAX_ENTRIES,
+        ttl=READING_CACHE_TTL
+    ))
+
+# 무료 사주 완료 알림 (같은 프로세스 + Postgres LISTEN/NOTIFY)
+# Supabase transaction pooler(6543)는 LISTEN을 지원하지 않아 기본값은 session pooler(5432)
+DATABASE_LISTEN_URL = os.getenv("DATABASE_LISTEN_URL", DATABASE_URL.replace(":6543/", ":5432/"))
+SAJU_EVENTS_LISTEN = os.getenv("SAJU_EVENTS_LISTEN", "1") != "0"
+SAJU_EVENTS_TIMEOUT = float(os.getenv("SAJU_EVENTS_TIMEOUT", "120"))  # SSE 최대 대기 (초)
+SAJU_EVENTS_RECHECK = float(os.getenv("SAJU_EVENTS_RECHECK", "15"))  # 알림 유실 대비 DB 재확인 주기 (초)
+saju_events = SajuEventHub()
+
+# 무료 사주 계산 작업 큐 (free_saju_records 기반, 0이면 BackgroundTasks로 바로 실행)
+SAJU_JOB_QUEUE = os.getenv("SAJU_JOB_QUEUE", "1") != "0"
+SAJU_JOB_WORKERS = int(os.getenv("SAJU_JOB_WORKERS", "4"))  # 프로세스당 동시 실행 작업 수
+SAJU_JOB_MAX_ATTEMPTS = int(os.getenv("SAJU_JOB_MAX_ATTEMPTS", "3"))
+SAJU_JOB_TIMEOUT = float(os.getenv("SAJU_JOB_TIMEOUT", "60"))  # 작업 1회 실행 제한 (초)
+SAJU_JOB_LOCK_TIMEOUT = float(os.getenv("SAJU_JOB_LOCK_TIMEOUT", "180"))  # 이 시간 넘게 잡힌 작업은 회수 (초)
+SAJU_JOB_BACKOFF = float(os.getenv("SAJU_JOB_BACKOFF", "5"))  # 재시도 대기 시작값 (초, 2배씩 증가)
+SAJU_JOB_POLL_INTERVAL = float(os.getenv("SAJU_JOB_POLL_INTERVAL", "2"))  # 다른 워커가 등록한 작업 확인 주기 (초)
+saju_jobs: Optional[SajuJobQueue] = None
+
+# 스트림 세션 저장소 (EventSource용 2단계 방식, 워커가 여러 개면 postgres)
+STREAM_SESSION_BACKEND = os.getenv("STREAM_SESSION_BACKEND", "memory")
+STREAM_SESSION_TTL = float(os.getenv("STREAM_SESSION_TTL", "300"))  # GET이 안 오면 만료 (초)
+STREAM_SESSION_MAX_ENTRIES = int(os.getenv("STREAM_SESSION_MAX_ENTRIES", "10000"))
+STREAM_SESSION_PAYLOAD_MAX_ENTRIES = int(os.getenv("STREAM_SESSION_PAYLOAD_MAX_ENTRIES", "10000"))  # saju_data (사람 수)
+STREAM_SESSION_PURGE_INTERVAL = float(os.getenv("STREAM_SESSION_PURGE_INTERVAL", "60"))  # 만료 세션 정리 주기 (초)
+stream_sessions = StreamSessionStore(
+    create_cache_backend(
+        STREAM_SESSION_BACKEND,
+        lambda: db_pool,
+        table="stream_sessions",
+        max_entries=STREAM_SESSION_MAX_ENTRIES,
+        ttl=STREAM_SESSION_TTL
+    ),
+    payload_backend=create_cache_backend(
+        STREAM_SESSION_BACKEND,
+        lambda: db_pool,
+        table="stream_session_payloads",
+        max_entries=STREAM_SESSION_PAYLOAD_MAX_ENTRIES,
+        ttl=STREAM_SESSION_TTL
+    )
+)
+
+# 재접속 가능한 섹션 스트림 (Last-Event-ID 재생, 프로세스 내 - 워커가 여러 개면 sticky session 필요)
+STREAM_RESUME_MAX_EVENTS = int(os.getenv("STREAM_RESUME_MAX_EVENTS", "4096"))  # 생성당 재생 버퍼 이벤트 수
+STREAM_RESUME_GRACE = float(os.getenv("STREAM_RESUME_GRACE", "15"))  # 연결이 모두 끊긴 뒤 재접속 대기 (초, 넘으면 LLM 취소)
+STREAM_RESUME_RETENTION = float(os.getenv("STREAM_RESUME_RETENTION", "120"))  # 완료 후 재생용 보관 (초)
+stream_generations = GenerationRegistry(
+    max_events=STREAM_RESUME_MAX_EVENTS,
+    idle_grace=STREAM_RESUME_GRACE,
+    retention=STREAM_RESUME_RETENTION
+)
+
+# 동일 프롬프트 동시 생성 합치기 (0이면 요청마다 LLM 호출)
+single_flight: Optional[SingleFlight] = SingleFlight() if os.getenv("SINGLE_FLIGHT", "1") != "0" else None
+
+# 토큰 합치기 (짧은 토큰을 묶어 SSE 프레임 수 감소, 첫 토큰은 즉시)
+TOKEN_COALESCE_WINDOW_MS = float(os.getenv("TOKEN_COALESCE_WINDOW_MS", "40"))  # 0이면 토큰마다 프레임
+TOKEN_COALESCE_MAX_BYTES = int(os.getenv("TOKEN_COALESCE_MAX_BYTES", "96"))
+TOKEN_COALESCE_SENTENCE = os.getenv("TOKEN_COALESCE_SENTENCE", "1") != "0"  # 문장 경계에서 바로 전송
+token_coalescer = TokenCoalescer(
+    window=TOKEN_COALESCE_WINDOW_MS / 1000,
+    max_bytes=TOKEN_COALESCE_MAX_BYTES,
+    sentence_flush=TOKEN_COALESCE_SENTENCE
+)
+
+# 모델 캐스케이드 (yaml generation.cascade_model이 있는 섹션: 파트 0은 빠른 모델, 0이면 항상 메인 모델만)
+model_cascade: Optional[ModelCascade] = ModelCascade() if os.getenv("MODEL_CASCADE", "1") != "0" else None
 
 # ═══════════════════════════════════════════════════════════
 # 스트리밍 Helper 함수
 # ═══════════════════════════════════════════════════════════
 
-_STREAM_END = object()  # Sentinel value for safe iteration
-
-def safe_next(iterator):
+async def llm_token_stream(
+    system_prompt: str,
+    user_message: str,
+    system_suffix: Optional[str] = None,
+    usage: Optional[StreamUsage] = None,
+    generation: Optional[GenerationConfig] = None,
+    cache_key: Optional[str] = None
+):
     """
-    StopIteration을 안전하게 처리하는 next() wrapper
+    모든 SSE 엔드포인트 공용 비동기 토큰 스트림
+
+    LLMClient.astream을 그대로 소비하므로 스트림마다 스레드를 점유하지 않고
+    토큰마다 run_in_executor 왕복도 없음 (기본 스레드풀 크기에 묶이지 않음)
+
+    system_prompt는 프롬프트 캐시 대상 고정 prefix (섹션은 (공통, 섹션) 블록 튜플), 요청별 텍스트는 system_suffix로 전달
+    클라이언트가 끊어서 이 생성기가 닫히면 astream도 바로 닫힘 → Anthropic HTTP 스트림 종료 (생성/과금 중단)
+    짧은 토큰은 token_coalescer가 묶어서 내보냄 (SSE 프레임 수 감소, 첫 토큰은 즉시)
+    generation은 섹션별 max_tokens / stop_sequences / temperature / model (yaml generation:)
+    cascade_model이 있으면 파트 0은 빠른 모델, 이후는 메인 모델이 이어 씀 (model_cascade)
+    LLM_PROVIDERS가 여러 개면 llm_client는 ProviderRouter (헤지 / 장애 전환, 진 쪽 스트림은 바로 닫음)
+
+    LLM 오류는 예외로 받음 (raise_errors=True) → cache_key가 있으면 합치기 전 원본 스트림을
+    reading_cache.record가 수집하므로 오류/중간 취소된 풀이는 캐시에 들어가지 않음
+    max_tokens에서 잘린 풀이도 저장하지 않음 (usage.stop_reason - 호출자가 usage를 안 주면 여기서 만듦)
+    클라이언트에는 지금처럼 "오류 발생: ..." 텍스트로 내보냄
+    """
+    if cache_key is not None and usage is None:
+        usage = StreamUsage()
+    if model_cascade is not None and generation is not None and generation.cascade_model:
+        stream = model_cascade.stream(
+            llm_client, system_prompt, user_message, system_suffix, usage, generation, raise_errors=True
+        )
+    else:
+        stream = llm_client.astream(
+            system_prompt, user_message, system_suffix=system_suffix, usage=usage, generation=generation,
+            raise_errors=True
+        )
+    if cache_key is not None:
+        stream = reading_cache.record(cache_key, stream, usage)
+    async with aclosing(token_coalescer.stream(llm_error_as_text(stream))) as chunks:
+        async for chunk in chunks:
+            yield chunk
 
-    async generator에서 run_in_executor()로 next()를 호출할 때
-    StopIteration이 Future로 전파되어 에러가 발생하는 것을 방지
 
-    Returns:
-        - iterator의 다음 값
-        - iterator가 끝나면 _STREAM_END sentinel 반환
-    """
+async def llm_error_as_text(stream):
+    """LLM 예외 → "오류 발생: ..." 텍스트 청크 (LLMClient.astream 기본 동작과 같은 형태)"""
     try:
-        return next(iterator)
-    except StopIteration:
-        return _STREAM_END
+        async with aclosing(stream):
+            async for chunk in stream:
+                yield chunk
+    except Exception as e:
+        print(f"[ERROR] LLM stream failed: {e}")
+        yield f"오류 발생: {str(e)}"
+
+
+def section_reading_key(section: CompiledSection, saju_data: Optional[dict], user_name: str) -> Optional[str]:
+    """섹션 풀이 캐시 키 (캐시 비활성화면 None)"""
+    if reading_cache is None:
+        return None
+    return reading_cache_key(section.version, section.name, saju_data, user_name)
+
+
+async def lookup_reading(cache_key: Optional[str]) -> Optional[str]:
+    """섹션 풀이 캐시 조회 → 저장된 텍스트 또는 None"""
+    if cache_key is None:
+        return None
+    return await reading_cache.get(cache_key)
+
+
+def reading_token_stream(
+    cache_key: Optional[str],
+    cached_text: Optional[str],
+    system_prompt: str,
+    user_message: str,
+    system_suffix: Optional[str] = None,
+    usage: Optional[StreamUsage] = None,
+    generation: Optional[GenerationConfig] = None
+):
+    """
+    섹션 풀이 토큰 스트림 (캐시 적용)
+    - 캐시 히트: 저장된 텍스트를 대기 없이 재생 (LLM 호출 없음)
+    - 캐시 미스: LLM 스트리밍, 정상 종료 시 캐시에 저장
+    - 같은 프롬프트가 이미 생성 중이면 그 스트림에 합류 (usage는 처음 요청한 쪽에만 집계)
+    """
+    if cached_text is not None:
+        return reading_cache.replay(cached_text)
+
+    def start_stream():
+        return llm_token_stream(system_prompt, user_message, system_suffix, usage, generation, cache_key)
+
+    if single_flight is None:
+        return start_stream()
+    return single_flight.stream(generation_key(system_prompt, user_message, generation), start_stream)
+
+
+# 서버 수명 동안 도는 백그라운드 태스크 (참조를 잡아둬야 GC되지 않음, shutdown에서 취소)
+server_tasks: set = set()
+
+
+def start_background_task(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    server_tasks.add(task)
+    task.add_done_callback(server_tasks.discard)
+    return task
+
 
 # 서버 시작/종료 이벤트
 @app.on_event("startup")
 async def startup():
-    """서버 시작 시 DB 연결 풀 생성"""
-    global db_pool
+    """서버 시작 시 DB 연결 풀 + 만세력 API 클라이언트 생성"""
+    global db_pool, manseryuk_client
+    manseryuk_client = create_manseryuk_client()
+
     print("[INFO] Connecting to Supabase...")
     try:
         db_pool = await asyncpg.create_pool(
@@ -89,16 +282,51 @@ async def startup():
             min_size=1,
             max_size=10,
             command_timeout=60,
-            statement_cache_size=0  # Supabase pgbouncer compatibility
+            statement_cache_size=0,  # Supabase pgbouncer compatibility
+            init=json_codec.register_json_codecs  # json/jsonb ↔ dict 자동 변환
         )
         print("[OK] Supabase connection pool created")
     except Exception as e:
         print(f"[ERROR] Failed to create DB pool: {e}")
 
+    if SAJU_EVENTS_LISTEN:
+        saju_events.start(DATABASE_LISTEN_URL)
+    if saju_jobs:
+        saju_jobs.start()
+    if reading_cache:
+        start_background_task(purge_cache_loop("Reading cache", reading_cache.backend))
+    if manseryuk_memo:
+        start_background_task(purge_cache_loop("Manseryuk cache", manseryuk_memo.backend))
+    start_background_task(purge_cache_loop("Stream sessions", stream_sessions.backend, STREAM_SESSION_PURGE_INTERVAL))
+    start_background_task(purge_cache_loop(
+        "Stream session payloads", stream_sessions.payload_backend, STREAM_SESSION_PURGE_INTERVAL
+    ))
+
+
+async def purge_cache_loop(label: str, backend, interval: float = 3600):
+    """만료/초과된 캐시 항목 주기적 정리 (기본 1시간 간격)"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = await backend.purge()
+            if removed:
+                print(f"[INFO] {label} purged: {removed}")
+        except Exception as e:
+            print(f"[WARN] {label} purge failed: {e}")
+
 @app.on_event("shutdown")
 async def shutdown():
-    """서버 종료 시 DB 연결 풀 닫기"""
-    global db_pool
+    """서버 종료 시 백그라운드 태스크 취소 + DB 연결 풀 + 만세력 API 클라이언트 닫기"""
+    global db_pool, manseryuk_client
+    for task in list(server_tasks):
+        task.cancel()
+    await asyncio.gather(*server_tasks, return_exceptions=True)
+    if saju_jobs:
+        await saju_jobs.stop()
+    await saju_events.stop()
+    if manseryuk_client:
+        await manseryuk_client.aclose()
+        manseryuk_client = None
     if db_pool:
         await db_pool.close()
         print("[INFO] Supabase connection pool closed")
@@ -110,8 +338,70 @@ SAJU_DATA_DIR = BASE_DIR / "saju_data"
 STORAGE_DIR = BASE_DIR / "saju_data"
 STORAGE_DIR.mkdir(exist_ok=True)
 
+# 병렬 전체 풀이 동시 생성 섹션 수 (요청별 concurrency는 이 값을 넘을 수 없음)
+PARALLEL_SECTION_CONCURRENCY = int(os.getenv("PARALLEL_SECTION_CONCURRENCY", "8"))
+# 병렬 전체 풀이 이벤트 큐 크기 (클라이언트가 느리면 섹션 생성이 여기서 기다림 → 요청당 메모리 상한)
+PARALLEL_QUEUE_MAX_EVENTS = int(os.getenv("PARALLEL_QUEUE_MAX_EVENTS", "256"))
+
 # 만세력 API URL
-MANSERYUK_API_URL = "https://api.cheongimun.com/api/v1/manseryuk/calculate-enriched"
+MANSERYUK_API_URL = os.getenv(
+    "MANSERYUK_API_URL", "https://api.cheongimun.com/api/v1/manseryuk/calculate-enriched"
+)
+
+# 만세력 API 커넥션 풀 (startup에서 생성, 요청 간 keep-alive 연결 재사용)
+MANSERYUK_HTTP2 = os.getenv("MANSERYUK_HTTP2", "1") != "0"
+MANSERYUK_MAX_CONNECTIONS = int(os.getenv("MANSERYUK_MAX_CONNECTIONS", "20"))
+MANSERYUK_MAX_KEEPALIVE = int(os.getenv("MANSERYUK_MAX_KEEPALIVE", "10"))
+MANSERYUK_KEEPALIVE_EXPIRY = float(os.getenv("MANSERYUK_KEEPALIVE_EXPIRY", "60"))
+MANSERYUK_CONNECT_TIMEOUT = float(os.getenv("MANSERYUK_CONNECT_TIMEOUT", "5"))
+MANSERYUK_TIMEOUT = float(os.getenv("MANSERYUK_TIMEOUT", "30"))
+manseryuk_client: Optional[httpx.AsyncClient] = None
+
+# 만세력 계산 방식
+# - remote: 항상 원격 API (기본값)
+# - shadow: 원격 API 결과로 응답 + 로컬 엔진도 계산해서 비교 (불일치 로그, /health 집계)
+# - local: 프로세스 내 엔진, 계산 불가 입력만 원격 API
+#   (기록된 원격 응답이 생년월일/시각/윤달/절기 경계를 충분히 덮기 전까지는 shadow로 검증)
+MANSERYUK_ENGINE = os.getenv("MANSERYUK_ENGINE", "remote")
+manseryuk_shadow = {"compared": 0, "mismatched": 0, "local_errors": 0}
+MANSERYUK_BATCH_MAX = int(os.getenv("MANSERYUK_BATCH_MAX", "500"))
+
+# 만세력 결과 메모 (tiered = 메모리 LRU + Postgres / memory / postgres / off)
+MANSERYUK_CACHE_BACKEND = os.getenv("MANSERYUK_CACHE_BACKEND", "tiered")
+MANSERYUK_CACHE_TTL = float(os.getenv("MANSERYUK_CACHE_TTL", str(30 * 24 * 3600)))
+MANSERYUK_CACHE_MAX_ENTRIES = int(os.getenv("MANSERYUK_CACHE_MAX_ENTRIES", "200000"))
+MANSERYUK_CACHE_MEMORY_ENTRIES = int(os.getenv("MANSERYUK_CACHE_MEMORY_ENTRIES", "2000"))
+manseryuk_memo: Optional[ManseryukMemo] = None
+if MANSERYUK_CACHE_BACKEND != "off":
+    manseryuk_memo = ManseryukMemo(create_cache_backend(
+        MANSERYUK_CACHE_BACKEND,
+        lambda: db_pool,
+        table="manseryuk_cache",
+        max_entries=MANSERYUK_CACHE_MAX_ENTRIES,
+        ttl=MANSERYUK_CACHE_TTL,
+        memory_max_entries=MANSERYUK_CACHE_MEMORY_ENTRIES
+    ))
+
+
+def create_manseryuk_client() -> httpx.AsyncClient:
+    """만세력 API용 공유 httpx 클라이언트 (HTTP/2는 h2 패키지가 있을 때만)"""
+    http2 = MANSERYUK_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401  (httpx[http2])
+        except ImportError:
+            print("[WARN] h2 not installed - manseryuk client falls back to HTTP/1.1")
+            http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=httpx.Timeout(MANSERYUK_TIMEOUT, connect=MANSERYUK_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=MANSERYUK_MAX_CONNECTIONS,
+            max_keepalive_connections=MANSERYUK_MAX_KEEPALIVE,
+            keepalive_expiry=MANSERYUK_KEEPALIVE_EXPIRY,
+        ),
+    )
 
 # 기본 테스트 데이터 로드 (비활성화 - 실제 데이터만 사용)
 DEFAULT_SAJU_DATA = None
@@ -128,103 +418,62 @@ DEFAULT_USER_NAME = "테스트"
 #     DEFAULT_USER_NAME = "테스트"
 print("[INFO] Default saju data disabled - using request data only")
 
+# 프롬프트 레지스트리 (파일마다 1회 파싱, 변경 시에만 다시 로드)
+PROMPTS_DIR = BASE_DIR / "prompts"
+prompt_registry = PromptRegistry(PROMPTS_DIR)
+
 # v9.1 프롬프트 경로 (배포용 - prompts 폴더)
-V9_PROMPT_PATH = BASE_DIR / "prompts" / "v9.1_with_buttons.yaml"
+V9_PROMPT_PATH = PROMPTS_DIR / "v9.1_with_buttons.yaml"
 
 
 def load_v8_prompts():
-    """v9.1 프롬프트 실시간 로드 (yaml 수정 즉시 반영)"""
-    try:
-        if V9_PROMPT_PATH.exists():
-            with open(V9_PROMPT_PATH, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f)
-                import datetime
-                timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-                print(f"[{timestamp}] v9.1 prompts loaded from disk")
-                return data
-    except Exception as e:
-        print(f"[WARN] v9.1 prompts load failed: {e}")
-    return None
+    """v9.1 프롬프트 조회 (메모리 캐시, yaml 수정 즉시 반영)"""
+    return prompt_registry.get(V9_PROMPT_PATH.name)
 
 
 # v10.0_v4.0.1 프롬프트 경로 (배포용 - prompts 폴더)
-V10_PROMPT_PATH = BASE_DIR / "prompts" / "v10.0_v4.0.1.yaml"
+V10_PROMPT_PATH = PROMPTS_DIR / "v10.0_v4.0.1.yaml"
 
 
 def load_v10_prompts():
-    """v10.0_v4.0.1 프롬프트 실시간 로드 (yaml 수정 즉시 반영)"""
-    try:
-        if V10_PROMPT_PATH.exists():
-            with open(V10_PROMPT_PATH, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f)
-                import datetime
-                timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-                print(f"[{timestamp}] v10.0_v4.0.1 prompts loaded from disk")
-                return data
-    except Exception as e:
-        print(f"[WARN] v10.0_v4.0.1 prompts load failed: {e}")
-    return None
+    """v10.0_v4.0.1 프롬프트 조회 (메모리 캐시, yaml 수정 즉시 반영)"""
+    return prompt_registry.get(V10_PROMPT_PATH.name)
 
 
 def load_prompts_by_variant(variant: Optional[str] = None):
-    """variant에 따라 다른 프롬프트 로드 (v4.0/v4.1 분기)
+    """variant에 따라 다른 프롬프트 조회 (v4.0/v4.1 분기)
 
     Args:
-        variant: "v4.0" (소프트 유도), "v4.1" (빠른 후킹), None (기본 v3.0)
+        variant: "v4.0" (소프트 유도), "v4.0.1" (채팅 UX 최적화), "v4.1" (빠른 후킹),
+                 None 또는 기타 값 (기본 v4.0.1)
 
     Returns:
         프롬프트 데이터 (dict) 또는 None
     """
-    import datetime
-    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-
-    try:
-        # variant에 따라 파일 경로 선택
-        if variant == "v4.0":
-            yaml_path = BASE_DIR / "prompts" / "v10.0_v4.0.yaml"
-            print(f"[{timestamp}] ✅ v4.0 variant selected (소프트 유도)")
-        elif variant == "v4.0.1":
-            yaml_path = BASE_DIR / "prompts" / "v10.0_v4.0.1.yaml"
-            print(f"[{timestamp}] ✅ v4.0.1 variant selected (채팅 UX 최적화)")
-        elif variant == "v4.1":
-            yaml_path = BASE_DIR / "prompts" / "v10.0_v4.1.yaml"
-            print(f"[{timestamp}] ✅ v4.1 variant selected (빠른 후킹)")
-        else:
-            # None 또는 기타 값이면 기본 v4.0.1 (채팅 UX 최적화)
-            yaml_path = BASE_DIR / "prompts" / "v10.0_v4.0.1.yaml"
-            print(f"[{timestamp}] ✅ v4.0.1 variant selected (기본 - 채팅 UX 최적화)")
-
-        # 파일 존재 확인 및 로드
-        if yaml_path.exists():
-            with open(yaml_path, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f)
-                print(f"[{timestamp}] Prompts loaded from: {yaml_path.name}")
-                return data
-        else:
-            print(f"[{timestamp}] ⚠️  Prompt file not found: {yaml_path}")
-            return None
+    data = prompt_registry.get_variant(variant)
+    if data is None:
+        print(f"[WARN] Prompt file not found: {prompt_registry.variant_file(variant)}")
+    return data
 
-    except Exception as e:
-        print(f"[{timestamp}] ❌ Prompt load failed: {e}")
-        return None
 
+def load_section_by_variant(variant: Optional[str], section_name: str) -> Optional[CompiledSection]:
+    """variant 프롬프트에서 컴파일된 섹션 조회 (프롬프트 버전마다 1회 컴파일)"""
+    return prompt_registry.get_section(prompt_registry.variant_file(variant), section_name)
 
-# 서버 시작 시 확인
-if V9_PROMPT_PATH.exists():
-    print("[OK] v9.1 prompts file found (will load on each request)")
-else:
-    print(f"[WARN] v9.1 prompts file not found at {V9_PROMPT_PATH}")
 
-if V10_PROMPT_PATH.exists():
-    print("[OK] v10.0_v4.0.1 prompts file found (will load on each request)")
-else:
-    print(f"[WARN] v10.0_v4.0.1 prompts file not found at {V10_PROMPT_PATH}")
+# 서버 시작 시 미리 파싱 (이후 요청은 메모리에서 조회)
+for _prompt_file in [V9_PROMPT_PATH.name, *VARIANT_FILES.values()]:
+    if prompt_registry.get(_prompt_file) is None:
+        print(f"[WARN] prompts file not found at {PROMPTS_DIR / _prompt_file}")
 
 
 # ============ v8 헬퍼 함수 ============
 
-def get_template_variables(saju_data: dict, user_name: str) -> dict:
-    """사주 데이터에서 모든 템플릿 변수 추출"""
+def get_template_variables(saju_data: dict, user_name: str, data_format: SajuDataFormat = PRETTY) -> dict:
+    """사주 데이터에서 모든 템플릿 변수 추출
+
+    data_format: saju_data/목록 변수 표기 (섹션 프롬프트는 section.data_format, yaml의 saju_data_format)
+    """
     if not saju_data:
         return {"name": user_name, "saju_data": "{}"}
 
@@ -256,10 +505,10 @@ def get_template_variables(saju_data: dict, user_name: str) -> dict:
         "ilju": ilju,
         "ilgan": core.get("일간", ""),
         "ilji": ilji,
-        "ohang_gwada": str(ohang.get("과다", [])),
-        "ohang_gyeolpip": str(ohang.get("결핍", [])),
-        "sipsung_gwada": str(sipsung.get("과다", [])),
-        "sipsung_gyeolpip": str(sipsung.get("결핍", [])),
+        "ohang_gwada": data_format.format_list(ohang.get("과다", [])),
+        "ohang_gyeolpip": data_format.format_list(ohang.get("결핍", [])),
+        "sipsung_gwada": data_format.format_list(sipsung.get("과다", [])),
+        "sipsung_gyeolpip": data_format.format_list(sipsung.get("결핍", [])),
         "jaesong_count": jaesong_count,
         "gwansung_count": gwansung_count,
         "siksang_count": siksang_count,
@@ -267,11 +516,11 @@ def get_template_variables(saju_data: dict, user_name: str) -> dict:
         "bigeop_count": bigeop_count,
         "current_daewoon": daewoon.get("현재", {}).get("간지", ""),
         "sewoon_2026": sewoon.get("분석대상", {}).get("간지", ""),
-        "sinsal": str(sinsal),
+        "sinsal": data_format.format_value(sinsal),
         "dohwasal": "있음" if sinsal.get("특수", {}).get("도화살") else "없음",
         "mbti": meta.get("mbti", "알 수 없음"),
-        "gisin": str(gisin.get("오행", [])),
-        "saju_data": json.dumps(saju_data, ensure_ascii=False, indent=2)
+        "gisin": data_format.format_list(gisin.get("오행", [])),
+        "saju_data": data_format.encode(saju_data)
     }
 
 
@@ -283,32 +532,40 @@ def render_template(template: str, variables: dict) -> str:
     return result
 
 
-def parse_v8_response(text: str) -> List[str]:
-    """v8 형식 응답을 말풍선 + 버튼으로 분리"""
-    parts = text.split("---")
-    bubbles = []
+# ============ V2.5 하이브리드 파트 헬퍼 함수 ============
 
-    for part in parts:
-        part = part.strip()
-        if not part:
-            continue
+# 프론트엔드 카드 ID(영문) → section_prompts 키
+SECTION_ALIASES = {
+    "first-impression": "first-impression",
+    "strength": "강점", "강점": "강점",
+    "yearly": "yearly",
+    "wealth": "재물운", "재물운": "재물운",
+    "career": "진로운", "진로운": "진로운",
+    "personality": "성격", "성격": "성격",
+    "love": "연애운", "연애운": "연애운",
+    "warning": "하반기경고", "하반기경고": "하반기경고"
+}
 
-        button_match = re.search(r'\[BUTTON:\s*([^\]]+)\]', part)
-        button_text = None
 
-        if button_match:
-            button_text = button_match.group(1)
-            part = re.sub(r'\[BUTTON:\s*[^\]]+\]', '', part).strip()
-
-        sentences = [s.strip() for s in part.split("\n") if s.strip()]
+async def section_part_events(token_stream):
+    """
+    섹션 1개 토큰 스트림 → (event, payload) 튜플 생성기
 
-        for sentence in sentences:
-            bubbles.append(sentence)
+    - ("token", {"text": chunk}): 토큰마다
+    - ("part", {"index", "content", "button", "blurs"}): '---' 감지 시 파트 완료 (PartStreamParser)
+    - ("cards", {"part_index", "cards"}): [/CARDS] 감지 즉시 (파트 완료 전)
+    """
+    parser = PartStreamParser()
 
-        if button_text:
-            bubbles.append(f"[BUTTON]{button_text}")
+    async with aclosing(token_stream):
+        async for chunk in token_stream:
+            yield "token", {"text": chunk}
+            for event in parser.feed(chunk):
+                yield event
 
-    return bubbles
+    # 마지막 파트 (보류 중이던 꼬리 포함)
+    for event in parser.close():
+        yield event
 
 
 # ============ 만세력 API 통합 헬퍼 함수 ============
@@ -330,7 +587,7 @@ async def save_to_db(form_data: dict) -> int:
             RETURNING id
             """,
             "processing",
-            json.dumps(form_data),
+            form_data,
             None,
             None
         )
@@ -362,32 +619,62 @@ async def load_from_db(saju_id: int) -> Optional[dict]:
             "id": row['id'],
             "created_at": row['created_at'].isoformat(),
             "status": row['status'],
-            "form_data": json.loads(row['form_data']),
-            "saju_data": json.loads(row['saju_data']) if row['saju_data'] else None,
+            "form_data": row['form_data'],
+            "saju_data": row['saju_data'] or None,
             "error": row['error']
         }
 
 
+async def load_saju_record_or_none(saju_id: int) -> Optional[dict]:
+    """섹션 세션용 레코드 조회 (DB 장애면 503)"""
+    try:
+        return await load_from_db(saju_id)
+    except Exception as e:
+        print(f"[ERROR] 사주 레코드 조회 실패 ({saju_id}): {e}")
+        raise HTTPException(status_code=503, detail="saju record store unavailable")
+
+
 async def update_saju_status(saju_id: int, status: str, saju_data: Optional[dict] = None, error: Optional[str] = None):
     """Supabase에서 사주 상태 업데이트"""
     global db_pool
     if not db_pool:
         raise Exception("DB pool not initialized")
 
-    async with db_pool.acquire() as conn:
-        await conn.execute(
+    # 작업 큐 컬럼(locked_at / locked_by / finished_at)은 큐 마이그레이션 이후에만 있음
+    # → SAJU_JOB_QUEUE=0이면 마이그레이션 전 DB에서도 돌도록 기존 UPDATE 그대로
+    if saju_jobs:
+        query = """
+            UPDATE free_saju_records
+            SET status = $1, saju_data = $2, error = $3,
+                locked_at = NULL, locked_by = NULL, finished_at = NOW()
+            WHERE id = $4
             """
+    else:
+        query = """
             UPDATE free_saju_records
             SET status = $1, saju_data = $2, error = $3
             WHERE id = $4
-            """,
+            """
+
+    async with db_pool.acquire() as conn:
+        await conn.execute(
+            query,
             status,
-            json.dumps(saju_data) if saju_data else None,
+            saju_data or None,
             error,
             saju_id
         )
         print(f"[OK] Updated status to '{status}': ID={saju_id}")
 
+        # 다른 워커의 /events 대기 요청에 알림 (실패해도 상태 저장은 유지)
+        try:
+            await SajuEventHub.notify(conn, saju_id, status)
+        except Exception as e:
+            print(f"[WARN] NOTIFY failed: {e}")
+
+    # 이 프로세스의 /events 대기 요청은 바로 깨움
+    saju_events.publish(saju_id, status)
+
 
 async def call_manseryuk_api(
     name: str,
@@ -420,67 +707,187 @@ async def call_manseryuk_api(
     start_time = time.time()
     print(f"⏱️ [SERVER DEBUG] 📡 만세력 API 호출 시작: {name}, {year}-{month}-{day}")
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.post(
-            MANSERYUK_API_URL,
-            json=payload
+    # startup 전(스크립트/테스트에서 직접 호출)에는 1회용 클라이언트로 호출
+    if manseryuk_client is None:
+        async with create_manseryuk_client() as client:
+            response = await client.post(MANSERYUK_API_URL, json=payload)
+    else:
+        response = await manseryuk_client.post(MANSERYUK_API_URL, json=payload)
+    response.raise_for_status()
+
+    elapsed = time.time() - start_time
+    print(f"⏱️ [SERVER DEBUG] ✅ 만세력 API 호출 완료: {elapsed:.2f}초 ({response.http_version})")
+    print(f"[OK] 만세력 API 호출 성공: {response.status_code}")
+    return response.json()
+
+
+async def cached_manseryuk_api(
+    name: str,
+    year: int,
+    month: int,
+    day: int,
+    hour: Optional[int],
+    minute: Optional[int],
+    gender: str,
+    is_lunar: bool,
+    mbti: Optional[str],
+    birth_place: Optional[str]
+) -> tuple:
+    """출생 입력 기준 메모를 거쳐 만세력 API 호출 → (응답, 캐시 사용 여부)"""
+    async def call():
+        return await call_manseryuk_api(
+            name, year, month, day, hour, minute, gender, is_lunar, mbti, birth_place
         )
-        response.raise_for_status()
 
-        elapsed = time.time() - start_time
-        print(f"⏱️ [SERVER DEBUG] ✅ 만세력 API 호출 완료: {elapsed:.2f}초")
-        print(f"[OK] 만세력 API 호출 성공: {response.status_code}")
-        return response.json()
+    if manseryuk_memo is None:
+        return await call(), False
 
+    birth_input = normalize_birth_input(year, month, day, hour, minute, gender, is_lunar, birth_place, mbti)
+    return await manseryuk_memo.get_or_call(manseryuk_cache_key(birth_input), name, call)
 
-async def process_saju_calculation(saju_id: int, form_data: dict):
-    """백그라운드에서 만세력 API 호출 및 DB 업데이트"""
-    import time
-    total_start_time = time.time()
 
+async def compute_manseryuk(
+    name: str,
+    year: int,
+    month: int,
+    day: int,
+    hour: Optional[int],
+    minute: Optional[int],
+    gender: str,
+    is_lunar: bool,
+    mbti: Optional[str],
+    birth_place: Optional[str]
+) -> tuple:
+    """만세력 계산 → (응답, 출처: "local" / "memo" / "remote")"""
+    if MANSERYUK_ENGINE == "local":
+        try:
+            enrichment = calculate_enrichment(
+                name, year, month, day, hour, minute, gender, is_lunar, mbti, birth_place
+            )
+            return {"success": True, "enrichment": enrichment}, "local"
+        except ValueError as e:
+            # 테이블 범위 밖 연도 등 → 원격 API로 계산
+            print(f"[WARN] 로컬 만세력 계산 불가, 원격 API 사용: {e}")
+
+    response, memo_hit = await cached_manseryuk_api(
+        name, year, month, day, hour, minute, gender, is_lunar, mbti, birth_place
+    )
+    if MANSERYUK_ENGINE == "shadow":
+        compare_local_manseryuk(
+            response, name, year, month, day, hour, minute, gender, is_lunar, mbti, birth_place
+        )
+    return response, "memo" if memo_hit else "remote"
+
+
+def compare_local_manseryuk(
+    response: dict,
+    name: str,
+    year: int,
+    month: int,
+    day: int,
+    hour: Optional[int],
+    minute: Optional[int],
+    gender: str,
+    is_lunar: bool,
+    mbti: Optional[str],
+    birth_place: Optional[str]
+) -> None:
+    """섀도 모드: 원격 응답과 로컬 엔진 결과 비교 (응답에는 영향 없음)"""
+    remote = response.get("enrichment")
+    if not remote:
+        return
     try:
-        print(f"⏱️ [SERVER DEBUG] 🔄 사주 계산 프로세스 시작: ID={saju_id}")
-        print(f"[BG] 사주 계산 시작: {saju_id}")
-
-        # 1. 만세력 API 호출 (0.6~3.5초 소요)
-        api_start_time = time.time()
-        manseryuk_response = await call_manseryuk_api(
-            name=form_data["name"],
-            year=form_data["birth_year"],
-            month=form_data["birth_month"],
-            day=form_data["birth_day"],
-            hour=form_data.get("birth_hour"),
-            minute=form_data.get("birth_minute"),
-            gender=form_data["gender"],
-            is_lunar=form_data.get("is_lunar", False),
-            mbti=form_data.get("mbti"),
-            birth_place=form_data.get("birth_place", "미상")
+        local = calculate_enrichment(
+            name, year, month, day, hour, minute, gender, is_lunar, mbti, birth_place,
+            base_year=remote.get("meta", {}).get("기준년도")
         )
-        api_elapsed = time.time() - api_start_time
+    except Exception as e:
+        manseryuk_shadow["local_errors"] += 1
+        print(f"[WARN] 만세력 섀도: 로컬 계산 실패: {e}")
+        return
+    manseryuk_shadow["compared"] += 1
+    diffs = diff_enrichment(local, remote)
+    if diffs:
+        manseryuk_shadow["mismatched"] += 1
+        birth = remote.get("meta", {}).get("생년월일")
+        print(f"[WARN] 만세력 섀도 불일치 ({birth}): {diffs[:10]}{' ...' if len(diffs) > 10 else ''}")
+
+
+async def calculate_saju(saju_id: int, form_data: dict):
+    """만세력 계산 후 DB 업데이트 (status: "completed"), 실패 시 예외"""
+    import time
+    total_start_time = time.time()
+
+    print(f"⏱️ [SERVER DEBUG] 🔄 사주 계산 프로세스 시작: ID={saju_id}")
+    print(f"[BG] 사주 계산 시작: {saju_id}")
+
+    # 1. 만세력 계산 (로컬 엔진 ~1ms / 원격 API 0.6~3.5초, 같은 출생 입력이면 메모에서 즉시 반환)
+    api_start_time = time.time()
+    manseryuk_response, source = await compute_manseryuk(
+        name=form_data["name"],
+        year=form_data["birth_year"],
+        month=form_data["birth_month"],
+        day=form_data["birth_day"],
+        hour=form_data.get("birth_hour"),
+        minute=form_data.get("birth_minute"),
+        gender=form_data["gender"],
+        is_lunar=form_data.get("is_lunar", False),
+        mbti=form_data.get("mbti"),
+        birth_place=form_data.get("birth_place", "미상")
+    )
+    api_elapsed = time.time() - api_start_time
 
-        # 2. enrichment 데이터 추출 (가공 시작)
-        processing_start_time = time.time()
-        saju_data = manseryuk_response.get("enrichment")
-        if not saju_data:
-            raise ValueError("enrichment 데이터가 없습니다")
-        processing_elapsed = time.time() - processing_start_time
+    # 2. enrichment 데이터 추출 (가공 시작)
+    processing_start_time = time.time()
+    saju_data = manseryuk_response.get("enrichment")
+    if not saju_data:
+        raise ValueError("enrichment 데이터가 없습니다")
+    processing_elapsed = time.time() - processing_start_time
+
+    # 3. DB 업데이트 (status: "completed")
+    await update_saju_status(saju_id, "completed", saju_data=saju_data)
 
-        # 3. DB 업데이트 (status: "completed")
-        await update_saju_status(saju_id, "completed", saju_data=saju_data)
+    total_elapsed = time.time() - total_start_time
+    print(f"⏱️ [SERVER DEBUG] 🎉 사주 계산 프로세스 완료!")
+    print(f"⏱️ [SERVER DEBUG]   - 만세력 계산: {api_elapsed:.3f}초 ({source})")
+    print(f"⏱️ [SERVER DEBUG]   - 데이터 가공: {processing_elapsed:.3f}초")
+    print(f"⏱️ [SERVER DEBUG]   - 전체 소요: {total_elapsed:.2f}초")
+    print(f"[BG] 사주 계산 완료: {saju_id}")
 
-        total_elapsed = time.time() - total_start_time
-        print(f"⏱️ [SERVER DEBUG] 🎉 사주 계산 프로세스 완료!")
-        print(f"⏱️ [SERVER DEBUG]   - 만세력 API: {api_elapsed:.2f}초")
-        print(f"⏱️ [SERVER DEBUG]   - 데이터 가공: {processing_elapsed:.3f}초")
-        print(f"⏱️ [SERVER DEBUG]   - 전체 소요: {total_elapsed:.2f}초")
-        print(f"[BG] 사주 계산 완료: {saju_id}")
 
+async def process_saju_calculation(saju_id: int, form_data: dict):
+    """백그라운드에서 만세력 계산 (작업 큐 미사용 시, 실패하면 바로 error)"""
+    try:
+        await calculate_saju(saju_id, form_data)
     except Exception as e:
-        # 4. 에러 발생 시 상태 업데이트
         await update_saju_status(saju_id, "error", error=str(e))
         print(f"[ERROR] 만세력 API 호출 실패: {saju_id}, {e}")
 
 
+async def run_saju_job(job: dict):
+    """작업 큐 핸들러 (실패 시 예외 → 큐가 백오프 후 재시도)"""
+    await calculate_saju(job["id"], job["form_data"])
+
+
+async def fail_saju_job(job: dict, error: str):
+    """재시도 횟수를 다 쓴 작업 → status: "error" 저장"""
+    await update_saju_status(job["id"], "error", error=error)
+
+
+if SAJU_JOB_QUEUE:
+    saju_jobs = SajuJobQueue(
+        lambda: db_pool,
+        run_saju_job,
+        fail_saju_job,
+        workers=SAJU_JOB_WORKERS,
+        max_attempts=SAJU_JOB_MAX_ATTEMPTS,
+        job_timeout=SAJU_JOB_TIMEOUT,
+        lock_timeout=SAJU_JOB_LOCK_TIMEOUT,
+        backoff_base=SAJU_JOB_BACKOFF,
+        poll_interval=SAJU_JOB_POLL_INTERVAL
+    )
+
+
 # ============ 요청/응답 모델 ============
 
 class FirstImpressionRequest(BaseModel):
@@ -508,6 +915,7 @@ class SectionRequest(BaseModel):
     section_name: str  # "first-impression", "강점", "yearly", "재물운", "진로운", "성격", "연애운", "하반기경고"
     user_name: str = "사용자"
     saju_data: Optional[dict] = None
+    saju_id: Optional[int] = None  # 무료 사주 ID (/section-start: 있으면 세션에 ID만 저장, saju_data는 GET 때 DB에서)
     variant: Optional[str] = None  # "v4.0" (소프트 유도), "v4.1" (빠른 후킹), None (기본 v3.0)
 
 
@@ -518,6 +926,15 @@ class SectionStreamRequest(BaseModel):
     saju_data: dict  # 필수
 
 
+class ParallelReadingRequest(BaseModel):
+    """서버 병렬 전체 풀이 요청 (섹션들을 동시에 생성해서 SSE 1개로 다중화)"""
+    user_name: str = "사용자"
+    saju_data: dict  # 필수
+    variant: Optional[str] = None  # "v4.0", "v4.0.1", "v4.1", None (기본 v4.0.1)
+    sections: Optional[List[str]] = None  # None이면 variant의 section_prompts 전체
+    concurrency: Optional[int] = None  # 동시 생성 섹션 수 (None이면 PARALLEL_SECTION_CONCURRENCY)
+
+
 class FreeSajuCreateRequest(BaseModel):
     """무료 사주 생성 요청 (비동기 만세력 API 통합)"""
     session_id: Optional[str] = None
@@ -541,6 +958,27 @@ class FreeSajuCreateRequest(BaseModel):
     referred_share_id: Optional[str] = None
 
 
+class ManseryukInput(BaseModel):
+    """만세력 계산 입력 (배치 항목)"""
+    name: str = "사용자"
+    birth_year: int
+    birth_month: int
+    birth_day: int
+    birth_hour: Optional[int] = None
+    birth_minute: Optional[int] = None
+    gender: str  # "male" or "female"
+    is_lunar: bool = False
+    is_leap_month: bool = False  # 음력 윤달
+    mbti: Optional[str] = None
+    birth_place: Optional[str] = "미상"
+
+
+class ManseryukBatchRequest(BaseModel):
+    """만세력 배치 계산 요청"""
+    items: List[ManseryukInput]
+    base_year: Optional[int] = None  # 세운/나이 기준 연도 (None이면 올해)
+
+
 class ApiResponse(BaseModel):
     """API 응답"""
     success: bool
@@ -564,10 +1002,35 @@ async def health_check():
     return {
         "status": "ok",
         "prompts_loaded": V9_PROMPT_PATH.exists(),
-        "default_data_loaded": DEFAULT_SAJU_DATA is not None
+        "prompt_versions": {
+            "v9.1": prompt_registry.describe(V9_PROMPT_PATH.name),
+            **{variant: prompt_registry.describe(filename) for variant, filename in VARIANT_FILES.items()}
+        },
+        "default_data_loaded": DEFAULT_SAJU_DATA is not None,
+        "reading_cache": reading_cache.stats() if reading_cache else None,
+        "manseryuk_cache": manseryuk_memo.stats() if manseryuk_memo else None,
+        "manseryuk_engine": MANSERYUK_ENGINE,
+        "manseryuk_shadow": dict(manseryuk_shadow) if MANSERYUK_ENGINE == "shadow" else None,
+        "saju_events": saju_events.stats(),
+        "saju_jobs": saju_jobs.stats() if saju_jobs else None,
+        "stream_sessions": stream_sessions.stats(),
+        "sse_streams": stream_stats.to_dict(),
+        "stream_generations": stream_generations.stats(),
+        "single_flight": single_flight.stats() if single_flight else None,
+        "token_coalescer": token_coalescer.stats(),
+        "model_cascade": model_cascade.stats() if model_cascade else None,
+        "llm_providers": llm_client.stats() if isinstance(llm_client, ProviderRouter) else None
     }
 
 
+@app.get("/metrics/saju-jobs")
+async def saju_job_metrics():
+    """무료 사주 작업 큐 지표 (대기/실행 중 개수, 가장 오래 기다린 작업, 완료 지연 p50/p95)"""
+    if not saju_jobs:
+        raise HTTPException(status_code=404, detail="작업 큐가 비활성화되어 있습니다")
+    return saju_jobs.stats()
+
+
 @app.post("/full-reading-stream")
 async def get_full_reading_stream(request: FullReadingRequest):
     """전체 풀이 - 통합 프롬프트로 8개 섹션을 한번에 생성 (스트리밍)"""
@@ -598,7 +1061,8 @@ async def get_full_reading_stream(request: FullReadingRequest):
     timestamp = datetime.datetime.now().isoformat()
 
     # 프롬프트 준비
-    system_prompt = unified_prompt.get("system", "") + f"\n\n[Internal timestamp: {timestamp}]"
+    system_prompt = unified_prompt.get("system", "")
+    system_suffix = f"[Internal timestamp: {timestamp}]"  # 캐시 breakpoint 뒤 (요청별)
     user_message = render_template(unified_prompt.get("user_template", ""), variables)
 
     print(f"[OK] 프롬프트 준비 완료 (system: {len(system_prompt)}자, user: {len(user_message)}자)")
@@ -606,25 +1070,17 @@ async def get_full_reading_stream(request: FullReadingRequest):
     async def event_generator():
         try:
             print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] LLM 스트리밍 시작...")
-            # 동기 generator를 별도 스레드에서 실행
-            loop = asyncio.get_event_loop()
-            stream_iter = iter(llm_client.stream(system_prompt, user_message))
-
-            while True:
-                chunk = await loop.run_in_executor(None, safe_next, stream_iter)
-
-                if chunk is _STREAM_END:
-                    break
+            async with aclosing(llm_token_stream(system_prompt, user_message, system_suffix)) as tokens:
+                async for chunk in tokens:
+                    yield {"event": "message", "data": json_codec.dumps({"token": chunk})}
 
-                yield {"event": "message", "data": json.dumps({"token": chunk})}
-
-            yield {"event": "message", "data": json.dumps({"done": True})}
+            yield {"event": "message", "data": json_codec.dumps({"done": True})}
             print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 스트리밍 완료")
         except Exception as e:
             print(f"[ERROR] 스트리밍 실패: {str(e)}")
-            yield {"event": "error", "data": json.dumps({"error": str(e)})}
+            yield {"event": "error", "data": json_codec.dumps({"error": str(e)})}
 
-    return EventSourceResponse(event_generator())
+    return ClosingEventSourceResponse(event_generator())
 
 
 @app.post("/first-impression-stream")
@@ -651,29 +1107,22 @@ async def get_first_impression_stream(request: FirstImpressionRequest):
     user_template = step_prompt.get("user_template", "")
 
     timestamp = datetime.datetime.now().isoformat()
-    system_prompt = f"{system_prompt}\n\n[Internal timestamp: {timestamp}]"
+    system_suffix = f"[Internal timestamp: {timestamp}]"  # 캐시 breakpoint 뒤 (요청별)
 
     variables = get_template_variables(saju_data, user_name)
     user_message = render_template(user_template, variables)
 
     async def event_generator():
         try:
-            loop = asyncio.get_event_loop()
-            stream_iter = iter(llm_client.stream(system_prompt, user_message))
-
-            while True:
-                chunk = await loop.run_in_executor(None, safe_next, stream_iter)
-
-                if chunk is _STREAM_END:
-                    break
-
-                yield {"event": "message", "data": json.dumps({"token": chunk})}
+            async with aclosing(llm_token_stream(system_prompt, user_message, system_suffix)) as tokens:
+                async for chunk in tokens:
+                    yield {"event": "message", "data": json_codec.dumps({"token": chunk})}
 
-            yield {"event": "message", "data": json.dumps({"done": True})}
+            yield {"event": "message", "data": json_codec.dumps({"done": True})}
         except Exception as e:
-            yield {"event": "error", "data": json.dumps({"error": str(e)})}
+            yield {"event": "error", "data": json_codec.dumps({"error": str(e)})}
 
-    return EventSourceResponse(event_generator())
+    return ClosingEventSourceResponse(event_generator())
 
 
 @app.post("/step-stream")
@@ -700,29 +1149,22 @@ async def get_step_stream(request: StepRequest):
     user_template = step_prompt.get("user_template", "")
 
     timestamp = datetime.datetime.now().isoformat()
-    system_prompt = f"{system_prompt}\n\n[Internal timestamp: {timestamp}]"
+    system_suffix = f"[Internal timestamp: {timestamp}]"  # 캐시 breakpoint 뒤 (요청별)
 
     variables = get_template_variables(saju_data, user_name)
     user_message = render_template(user_template, variables)
 
     async def event_generator():
         try:
-            loop = asyncio.get_event_loop()
-            stream_iter = iter(llm_client.stream(system_prompt, user_message))
+            async with aclosing(llm_token_stream(system_prompt, user_message, system_suffix)) as tokens:
+                async for chunk in tokens:
+                    yield {"event": "message", "data": json_codec.dumps({"token": chunk})}
 
-            while True:
-                chunk = await loop.run_in_executor(None, safe_next, stream_iter)
-
-                if chunk is _STREAM_END:
-                    break
-
-                yield {"event": "message", "data": json.dumps({"token": chunk})}
-
-            yield {"event": "message", "data": json.dumps({"done": True})}
+            yield {"event": "message", "data": json_codec.dumps({"done": True})}
         except Exception as e:
-            yield {"event": "error", "data": json.dumps({"error": str(e)})}
+            yield {"event": "error", "data": json_codec.dumps({"error": str(e)})}
 
-    return EventSourceResponse(event_generator())
+    return ClosingEventSourceResponse(event_generator())
 
 
 # ╔════════════════════════════════════════════════════════════════╗
@@ -735,49 +1177,42 @@ async def start_section_stream(request: SectionRequest):
     """
     스트림 세션 생성 (EventSource용 2단계 방식 - 1단계)
     - 파라미터를 저장하고 stream_id 반환
-    - 클라이언트는 이 ID로 GET /section-stream/{id} 호출
+    - 클라이언트는 이 ID로 GET /section-stream/{id} 호출 (STREAM_SESSION_TTL초 안에)
+    - saju_id(무료 사주 ID)를 보내면 saju_data 대신 ID만 저장 (완료된 레코드만)
     """
-    import uuid
+    import time
     import datetime as dt
 
-    stream_id = str(uuid.uuid4())[:8]
-
     # variant에 따라 프롬프트 로드
     v10_prompts = load_prompts_by_variant(request.variant)
     if not v10_prompts:
         raise HTTPException(status_code=500, detail="prompts not loaded")
 
-    section_prompt = v10_prompts.get("section_prompts", {}).get(request.section_name, {})
-    if not section_prompt:
+    section = load_section_by_variant(request.variant, request.section_name)
+    if not section:
         raise HTTPException(status_code=404, detail=f"section not found: {request.section_name}")
 
-    if not request.saju_data:
-        raise HTTPException(status_code=400, detail="saju_data is required")
+    if request.saju_id is not None:
+        record = await load_saju_record_or_none(request.saju_id)
+        if not record or record["status"] != "completed" or not record.get("saju_data"):
+            raise HTTPException(status_code=404, detail=f"completed saju record not found: {request.saju_id}")
+    elif not request.saju_data:
+        raise HTTPException(status_code=400, detail="saju_data or saju_id is required")
 
-    saju_data = request.saju_data
     user_name = request.user_name if request.user_name and request.user_name != "사용자" else DEFAULT_USER_NAME
 
-    # 변수 추출 및 프롬프트 렌더링
-    variables = get_template_variables(saju_data, user_name)
-    timestamp = dt.datetime.now().isoformat()
-
-    common_system = v10_prompts.get("common_system", "")
-    section_system = section_prompt.get("system", "")
-    system_prompt = section_system.replace("{common_system}", common_system)
-    system_prompt = f"{system_prompt}\n\n[Internal timestamp: {timestamp}]"
-
-    common_data = v10_prompts.get("common_data_template", "")
-    section_user = section_prompt.get("user_template", "")
-    user_message = section_user.replace("{common_data_template}", common_data)
-    user_message = render_template(user_message, variables)
-
-    # 세션 저장
-    stream_sessions[stream_id] = {
-        "section_name": request.section_name,
-        "system_prompt": system_prompt,
-        "user_message": user_message,
-        "created_at": dt.datetime.now()
-    }
+    # 세션 저장 (입력만 - 프롬프트 렌더링은 GET 시점에 컴파일된 섹션으로)
+    try:
+        stream_id = await stream_sessions.create({
+            "variant": request.variant,
+            "section_name": request.section_name,
+            "prompt_version": section.version,
+            "user_name": user_name,
+            "created_at": time.time()
+        }, request.saju_data, saju_id=request.saju_id)
+    except Exception as e:
+        print(f"[ERROR] 스트림 세션 저장 실패: {e}")
+        raise HTTPException(status_code=503, detail="stream session store unavailable")
 
     print(f"[{dt.datetime.now().strftime('%H:%M:%S')}] 스트림 세션 생성: {stream_id} ({request.section_name})")
 
@@ -786,37 +1221,63 @@ async def start_section_stream(request: SectionRequest):
 
 @app.get("/section-stream/{stream_id}")
 @app.get("/api/v1/section-stream/{stream_id}")
-async def stream_section_by_id(stream_id: str):
+async def stream_section_by_id(stream_id: str, last_event_id: Optional[str] = Header(None)):
     """
     EventSource용 SSE 스트림 (2단계 방식 - 2단계)
-    - stream_id로 세션 조회 후 LLM 스트리밍
+    - stream_id로 세션 조회 → 프롬프트 렌더링 → LLM 스트리밍
     - 브라우저 EventSource API와 완벽 호환
+    - 이벤트마다 id 부여 → 끊겼다 재접속하면(Last-Event-ID) 놓친 이벤트부터 재생 후 이어서 전송
+      (LLM 재호출 없음, STREAM_RESUME_RETENTION초 안의 재접속만)
     """
     import datetime as dt
 
-    if stream_id not in stream_sessions:
+    try:
+        resume_after = max(int(last_event_id or 0), 0)
+    except ValueError:
+        resume_after = 0
+
+    # 진행 중이거나 방금 끝난 생성에 재접속
+    generation = stream_generations.get(stream_id)
+    if generation is not None:
+        stream_generations.resumed += 1
+        print(f"[{dt.datetime.now().strftime('%H:%M:%S')}] EventSource 재접속: {stream_id} (Last-Event-ID={resume_after})")
+        return ClosingEventSourceResponse(generation.subscribe(resume_after))
+
+    session = await stream_sessions.take(stream_id)  # 1회용 세션 (꺼내면서 삭제)
+    if session is None:
         raise HTTPException(status_code=404, detail="Stream session not found or expired")
 
-    session = stream_sessions.pop(stream_id)  # 1회용 세션 삭제
     section_name = session["section_name"]
-    system_prompt = session["system_prompt"]
-    user_message = session["user_message"]
-
-    print(f"[{dt.datetime.now().strftime('%H:%M:%S')}] EventSource 스트리밍 시작: {stream_id} ({section_name})")
+    section = load_section_by_variant(session["variant"], section_name)
+    if not section:
+        raise HTTPException(status_code=404, detail=f"section not found: {section_name}")
+    if section.version != session["prompt_version"]:
+        # 세션 생성 후 프롬프트 파일이 바뀜 → 현재 버전으로 렌더링
+        print(f"[INFO] 프롬프트 버전 변경: {session['prompt_version']} → {section.version} ({stream_id})")
+
+    if "saju_id" in session:
+        record = await load_saju_record_or_none(session["saju_id"])
+        if not record or not record.get("saju_data"):
+            raise HTTPException(status_code=404, detail=f"saju record not found: {session['saju_id']}")
+        saju_data = record["saju_data"]
+    else:
+        saju_data = session["saju_data"]
+    user_name = session["user_name"]
+    system_prompt = section.system_blocks  # (공통, 섹션) 시스템 블록 - 블록마다 캐시 breakpoint
+    timestamp = dt.datetime.fromtimestamp(session["created_at"]).isoformat()
+    system_suffix = f"[Internal timestamp: {timestamp}]"  # 캐시 breakpoint 뒤 (요청별)
+    user_message = section.render_user(get_template_variables(saju_data, user_name, section.data_format))
+    cache_key = section_reading_key(section, saju_data, user_name)
 
     async def event_generator():
         try:
-            loop = asyncio.get_event_loop()
-            stream_iter = iter(llm_client.stream(system_prompt, user_message))
-
-            while True:
-                chunk = await loop.run_in_executor(None, safe_next, stream_iter)
-
-                if chunk is _STREAM_END:
-                    break
-
-                # event: token 으로 명확한 이벤트 타입 지정
-                yield {"event": "token", "data": json.dumps({"text": chunk})}
+            # 캐시 조회도 생성 태스크 안에서 (세션을 꺼낸 뒤 생성 등록 전까지 await 없음 → 동시 재접속도 같은 생성에 붙음)
+            cached_text = await lookup_reading(cache_key)
+            print(f"[{dt.datetime.now().strftime('%H:%M:%S')}] EventSource 스트리밍 시작: {stream_id} ({section_name}{', 캐시' if cached_text is not None else ''})")
+            async with aclosing(reading_token_stream(cache_key, cached_text, system_prompt, user_message, system_suffix, generation=section.generation)) as tokens:
+                async for chunk in tokens:
+                    # event: token 으로 명확한 이벤트 타입 지정
+                    yield {"event": "token", "data": json_codec.dumps({"text": chunk})}
 
             # 완료 이벤트
             yield {"event": "done", "data": ""}
@@ -824,9 +1285,10 @@ async def stream_section_by_id(stream_id: str):
 
         except Exception as e:
             print(f"[ERROR] EventSource 스트리밍 실패 ({stream_id}): {str(e)}")
-            yield {"event": "error", "data": json.dumps({"error": str(e)})}
+            yield {"event": "error", "data": json_codec.dumps({"error": str(e)})}
 
-    return EventSourceResponse(event_generator())
+    generation = stream_generations.start(stream_id, event_generator())
+    return ClosingEventSourceResponse(generation.subscribe(resume_after))
 
 
 # ╔════════════════════════════════════════════════════════════════╗
@@ -850,8 +1312,8 @@ async def get_section_stream(request: SectionRequest):
     if not v10_prompts:
         raise HTTPException(status_code=500, detail="prompts not loaded")
 
-    section_prompt = v10_prompts.get("section_prompts", {}).get(request.section_name, {})
-    if not section_prompt:
+    section = load_section_by_variant(request.variant, request.section_name)
+    if not section:
         raise HTTPException(status_code=404, detail=f"section not found: {request.section_name}")
 
     # 사주 데이터 검증
@@ -862,49 +1324,42 @@ async def get_section_stream(request: SectionRequest):
     user_name = request.user_name if request.user_name and request.user_name != "사용자" else DEFAULT_USER_NAME
 
     # 변수 추출
-    variables = get_template_variables(saju_data, user_name)
+    variables = get_template_variables(saju_data, user_name, section.data_format)
     timestamp = datetime.datetime.now().isoformat()
 
-    # 공통 시스템 + 섹션별 시스템 결합
-    common_system = v10_prompts.get("common_system", "")
-    section_system = section_prompt.get("system", "")
-    system_prompt = section_system.replace("{common_system}", common_system)
-    system_prompt = f"{system_prompt}\n\n[Internal timestamp: {timestamp}]"
+    # 공통 시스템 + 섹션별 시스템 (컴파일 시 결합 완료)
+    system_prompt = section.system_blocks  # (공통, 섹션) 시스템 블록 - 블록마다 캐시 breakpoint
+    system_suffix = f"[Internal timestamp: {timestamp}]"  # 캐시 breakpoint 뒤 (요청별)
 
-    # 공통 데이터 + 섹션별 템플릿 결합
-    common_data = v10_prompts.get("common_data_template", "")
-    section_user = section_prompt.get("user_template", "")
-    user_message = section_user.replace("{common_data_template}", common_data)
-    user_message = render_template(user_message, variables)
+    # 공통 데이터 + 섹션별 템플릿 (슬롯만 채움)
+    user_message = section.render_user(variables)
+
+    # 풀이 캐시 조회 (같은 입력이면 저장된 텍스트 재생)
+    cache_key = section_reading_key(section, saju_data, user_name)
+    cached_text = await lookup_reading(cache_key)
 
     print(f"[OK] 섹션 프롬프트 준비 완료: {request.section_name}")
-    print(f"  - system_prompt 길이: {len(system_prompt)}자")
+    print(f"  - system_prompt 길이: {len(section.system_prompt)}자")
     print(f"  - user_message 길이: {len(user_message)}자")
+    print(f"  - 풀이 캐시: {'히트' if cached_text is not None else '미스'}")
 
     async def event_generator():
         try:
             print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 섹션 스트리밍 시작: {request.section_name}")
             full_text = ""  # 전체 텍스트 수집용
-            loop = asyncio.get_event_loop()
-            stream_iter = iter(llm_client.stream(system_prompt, user_message))
-
-            while True:
-                chunk = await loop.run_in_executor(None, safe_next, stream_iter)
-
-                if chunk is _STREAM_END:
-                    break
-
-                full_text += chunk  # 텍스트 수집
-                yield {"event": "message", "data": json.dumps({"token": chunk})}
+            async with aclosing(reading_token_stream(cache_key, cached_text, system_prompt, user_message, system_suffix, generation=section.generation)) as tokens:
+                async for chunk in tokens:
+                    full_text += chunk  # 텍스트 수집
+                    yield {"event": "message", "data": json_codec.dumps({"token": chunk})}
 
             # done 이벤트 단순화 (클라이언트에서 buffer로 파싱)
-            yield {"event": "message", "data": json.dumps({"done": True})}
+            yield {"event": "message", "data": json_codec.dumps({"done": True})}
             print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 섹션 스트리밍 완료: {request.section_name} ({len(full_text)}자)")
         except Exception as e:
             print(f"[ERROR] 섹션 스트리밍 실패 ({request.section_name}): {str(e)}")
-            yield {"event": "error", "data": json.dumps({"error": str(e)})}
+            yield {"event": "error", "data": json_codec.dumps({"error": str(e)})}
 
-    return EventSourceResponse(event_generator())
+    return ClosingEventSourceResponse(event_generator())
 
 
 @app.post("/free-saju/create")  # v3.0 호환 별칭
@@ -916,7 +1371,7 @@ async def create_free_saju(
     """
     무료 사주 생성 (비동기 방식 - Supabase + 순차 ID)
     - 폼 데이터만 저장하고 즉시 ID 반환 (0.1초)
-    - 백그라운드에서 만세력 API 호출 시작
+    - 저장된 레코드가 곧 작업 큐 항목 → 워커가 수령해서 만세력 계산 (실패 시 재시도)
     """
     print(f"\n{'='*60}")
     print(f"[{datetime.now().strftime('%H:%M:%S')}] /free-saju/create 호출")
@@ -928,13 +1383,17 @@ async def create_free_saju(
     saju_id = await save_to_db(request.dict())
     print(f"[OK] ID 생성 (SERIAL): {saju_id}")
 
-    # 2. 백그라운드 태스크로 만세력 API 호출
-    background_tasks.add_task(
-        process_saju_calculation,
-        saju_id=saju_id,
-        form_data=request.dict()
-    )
-    print(f"[OK] 백그라운드 태스크 등록: {saju_id}")
+    # 2. 작업 큐 워커 깨우기 (큐 미사용 시 백그라운드 태스크로 바로 실행)
+    if saju_jobs:
+        saju_jobs.wake()
+        print(f"[OK] 작업 큐 등록: {saju_id}")
+    else:
+        background_tasks.add_task(
+            process_saju_calculation,
+            saju_id=saju_id,
+            form_data=request.dict()
+        )
+        print(f"[OK] 백그라운드 태스크 등록: {saju_id}")
 
     # 3. 즉시 응답 반환 (0.1초 이내)
     return {
@@ -943,6 +1402,40 @@ async def create_free_saju(
     }
 
 
+@app.post("/api/v1/manseryuk/batch")
+async def manseryuk_batch(request: ManseryukBatchRequest):
+    """
+    만세력 배치 계산 (로컬 엔진)
+    - 항목별로 success/enrichment 또는 success=false/error
+    """
+    import time
+
+    if len(request.items) > MANSERYUK_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"items는 최대 {MANSERYUK_BATCH_MAX}개까지 가능합니다")
+
+    start_time = time.time()
+    results = calculate_batch([
+        {
+            "name": item.name,
+            "year": item.birth_year,
+            "month": item.birth_month,
+            "day": item.birth_day,
+            "hour": item.birth_hour,
+            "minute": item.birth_minute,
+            "gender": item.gender,
+            "is_lunar": item.is_lunar,
+            "is_leap_month": item.is_leap_month,
+            "mbti": item.mbti,
+            "birth_place": item.birth_place,
+        }
+        for item in request.items
+    ], base_year=request.base_year)
+    elapsed = time.time() - start_time
+
+    print(f"[OK] 만세력 배치 계산: {len(results)}건, {elapsed * 1000:.1f}ms")
+    return {"count": len(results), "elapsed": elapsed, "results": results}
+
+
 @app.get("/free-saju/{saju_id}")  # v3.0 호환 별칭
 @app.get("/api/v1/free-saju/{saju_id}")
 @app.get("/api/v2/free-saju/{saju_id}")  # V2 별칭 (Framer v4.0_v2 호환)
@@ -963,6 +1456,12 @@ async def get_free_saju(saju_id: int):
         raise HTTPException(status_code=404, detail="사주 데이터를 찾을 수 없습니다")
 
     # 3. 응답 반환 (status에 따라 다른 데이터)
+    print(f"[OK] 상태 응답: {record['status']}")
+    return free_saju_response(record)
+
+
+def free_saju_response(record: dict) -> dict:
+    """GET /free-saju/{id} 와 /events 공통 응답"""
     response = {
         "id": record["id"],
         "status": record["status"],
@@ -973,11 +1472,59 @@ async def get_free_saju(saju_id: int):
 
     if record["status"] == "error":
         response["error"] = record.get("error", "알 수 없는 오류")
-
-    print(f"[OK] 상태 응답: {record['status']}")
     return response
 
 
+@app.get("/api/v1/free-saju/{saju_id}/events")
+@app.get("/api/v2/free-saju/{saju_id}/events")
+async def free_saju_events(saju_id: int):
+    """
+    무료 사주 완료 알림 (SSE, 폴링 대체)
+
+    - 연결 직후 1번 조회 → 이미 끝났으면 바로 status 이벤트 후 종료
+    - processing이면 계산 완료 알림(같은 프로세스/NOTIFY)까지 연결 유지 → status 이벤트 1번
+    - 알림 유실 대비로 SAJU_EVENTS_RECHECK초마다만 DB 재확인
+    - SAJU_EVENTS_TIMEOUT초 안에 안 끝나면 timeout 이벤트 (클라이언트는 GET으로 폴백)
+    - 클라이언트가 끊으면 sse-starlette가 generator를 취소 → 대기 등록 해제
+    """
+    # 알림을 놓치지 않도록 조회 전에 먼저 등록
+    waiter = saju_events.subscribe(saju_id)
+    try:
+        record = await load_from_db(saju_id)
+    except Exception:
+        saju_events.unsubscribe(saju_id, waiter)
+        raise
+    if not record:
+        saju_events.unsubscribe(saju_id, waiter)
+        raise HTTPException(status_code=404, detail="사주 데이터를 찾을 수 없습니다")
+
+    async def event_generator():
+        nonlocal waiter, record
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + SAJU_EVENTS_TIMEOUT
+        try:
+            while record["status"] == "processing":
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    yield {"event": "timeout", "data": json_codec.dumps({"id": saju_id, "status": "processing"})}
+                    return
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter), min(SAJU_EVENTS_RECHECK, remaining))
+                except asyncio.TimeoutError:
+                    pass
+                # 알림 또는 재확인 → 다음 알림 등록 후 조회
+                saju_events.unsubscribe(saju_id, waiter)
+                waiter = saju_events.subscribe(saju_id)
+                record = await load_from_db(saju_id) or record
+
+            print(f"[OK] /events 상태 전송: ID={saju_id}, {record['status']}")
+            yield {"event": "status", "data": json_codec.dumps(free_saju_response(record))}
+        finally:
+            saju_events.unsubscribe(saju_id, waiter)
+
+    return ClosingEventSourceResponse(event_generator())
+
+
 # ═══════════════════════════════════════════════════════════════
 # V2.5 하이브리드 스트리밍 (토큰 실시간 + 파트 완료)
 # Riido 블로그 패턴 적용: https://blog.riido.io/llm-structured-streaming-with-langchain-sse/
@@ -989,7 +1536,8 @@ async def section_stream_v5(request: SectionStreamRequest):
 
     핵심 전략:
     1. 토큰마다 event: token 전송 (실시간 타이핑 효과)
-    2. '---' 감지 시 event: part 전송 (파트 완료, 버튼 활성화)
+    2. '---' 감지 시 event: part 전송 (파트 완료, 버튼 활성화, 블러 범위 blurs)
+    3. [/CARDS] 감지 즉시 event: cards 전송 (토큰을 다시 파싱하지 않고 카드 바로 표시)
 
     이점:
     - 첫 토큰 ~0.5초 내 표시 (Riido: 35초 → 0.8초 달성)
@@ -1017,33 +1565,22 @@ async def section_stream_v5(request: SectionStreamRequest):
     print(f"[V2.5 DEBUG] ✅ Prompts loaded, keys: {list(prompts.keys())}")
 
     # 3️⃣ 섹션 매핑
-    section_map = {
-        "first-impression": "first-impression",
-        "strength": "강점", "강점": "강점",
-        "yearly": "yearly",
-        "wealth": "재물운", "재물운": "재물운",
-        "career": "진로운", "진로운": "진로운",
-        "personality": "성격", "성격": "성격",
-        "love": "연애운", "연애운": "연애운",
-        "warning": "하반기경고", "하반기경고": "하반기경고"
-    }
-
-    section_key = section_map.get(request.section_name, request.section_name)
+    section_key = SECTION_ALIASES.get(request.section_name, request.section_name)
     print(f"[V2.5 DEBUG] 🔑 Section mapping: '{request.section_name}' → '{section_key}'")
 
     # 4️⃣ 섹션 프롬프트 확인
     section_prompts_dict = prompts.get("section_prompts", {})
     print(f"[V2.5 DEBUG] 📋 Available sections: {list(section_prompts_dict.keys())}")
 
-    section_prompts = section_prompts_dict.get(section_key)
-    if not section_prompts:
+    section = prompt_registry.get_section(V10_PROMPT_PATH.name, section_key)
+    if not section:
         print(f"[V2.5 DEBUG] ❌ ERROR: Section '{section_key}' not found in prompts")
         raise HTTPException(status_code=400, detail=f"Unknown section: {request.section_name}")
-    print(f"[V2.5 DEBUG] ✅ Section prompts found: system={bool(section_prompts.get('system'))}, user_template={bool(section_prompts.get('user_template'))}")
+    print(f"[V2.5 DEBUG] ✅ Section prompts found: system={bool(section.config.get('system'))}, user_template={bool(section.config.get('user_template'))}")
 
     # 5️⃣ 변수 추출
     print(f"[V2.5 DEBUG] 🔧 Extracting template variables...")
-    variables = get_template_variables(request.saju_data, request.user_name)
+    variables = get_template_variables(request.saju_data, request.user_name, section.data_format)
     print(f"[V2.5 DEBUG] ✅ Variables extracted: name={variables.get('name')}, ilgan={variables.get('ilgan')}")
 
     # 6️⃣ 프롬프트 준비
@@ -1051,17 +1588,18 @@ async def section_stream_v5(request: SectionStreamRequest):
     prompt_prep_start = time.time()
     print(f"⏱️ [SERVER DEBUG] 📝 LLM 프롬프트 준비 시작")
     print(f"[V2.5 DEBUG] 📝 Preparing prompts...")
-    common_system = prompts.get("common_system", "")
-    common_data_template = prompts.get("common_data_template", "")
+    system_prompt = section.system_blocks  # (공통, 섹션) 시스템 블록 - 블록마다 캐시 breakpoint
+    user_message = section.render_user(variables)
 
-    system_prompt = section_prompts.get("system", "").replace("{common_system}", common_system)
-    user_template = section_prompts.get("user_template", "").replace("{common_data_template}", common_data_template)
-    user_message = render_template(user_template, variables)
+    # 풀이 캐시 조회 (같은 입력이면 저장된 텍스트를 token/part/done 그대로 재생)
+    cache_key = section_reading_key(section, request.saju_data, request.user_name)
+    cached_text = await lookup_reading(cache_key)
+    print(f"[V2.5 DEBUG] 💾 Reading cache: {'HIT' if cached_text is not None else 'MISS'}")
 
     prompt_prep_elapsed = time.time() - prompt_prep_start
     print(f"⏱️ [SERVER DEBUG] ✅ LLM 프롬프트 준비 완료: {prompt_prep_elapsed:.3f}초")
     print(f"[V2.5 DEBUG] ✅ Prompts ready:")
-    print(f"[V2.5 DEBUG]   System prompt: {len(system_prompt)} chars")
+    print(f"[V2.5 DEBUG]   System prompt: {len(section.system_prompt)} chars")
     print(f"[V2.5 DEBUG]   User message: {len(user_message)} chars")
 
     async def generate():
@@ -1070,104 +1608,68 @@ async def section_stream_v5(request: SectionStreamRequest):
 
         1. 토큰마다 event: token 전송
         2. '---' 감지 시 event: part 전송
+        3. [/CARDS] 감지 시 event: cards 전송
         """
+        part_index = 0
+        token_count = 0  # event: token 프레임 수 (token_coalescer가 묶은 뒤라 LLM 토큰 수와 다름)
         try:
             # 7️⃣ 스트리밍 시작
             import time
             start_time = time.time()
             print(f"⏱️ [SERVER DEBUG] 🚀 LLM 스트리밍 시작 (Claude API 호출)")
             print(f"[V2.5 DEBUG] 🚀 Starting LLM streaming...")
-            buffer = ""
-            part_index = 0
-            token_count = 0
             first_token_time = None
-
-            for chunk in llm_client.stream(system_prompt, user_message):
-                buffer += chunk
-                token_count += 1
-
-                # 첫 토큰 시간 기록
-                if first_token_time is None:
-                    first_token_time = time.time() - start_time
-                    print(f"⏱️ [SERVER DEBUG] ⚡ LLM 첫 토큰 생성: {first_token_time:.2f}초")
-                    print(f"[V2.5 DEBUG] ⚡ First token received: {first_token_time:.2f}s (token #{token_count})")
-                    print(f"[V2.5 DEBUG] 📤 Starting token stream to client...")
-
-                # ★ 토큰마다 실시간 전송 (핵심!)
-                yield {
-                    "event": "token",
-                    "data": json.dumps({"text": chunk}, ensure_ascii=False)
-                }
-
-                # '---' 구분자 감지 → 파트 완료
-                while "---" in buffer:
-                    idx = buffer.index("---")
-                    part_text = buffer[:idx].strip()
-                    buffer = buffer[idx + 3:]  # '---' 이후로 버퍼 이동
-
-                    if part_text:
-                        # 버튼 추출
-                        button_match = re.search(r'\[BUTTON:\s*([^\]]+)\]', part_text)
-                        button = button_match.group(1) if button_match else "다음"
-
-                        # 마커 제거 → 깔끔한 컨텐츠
-                        content = re.sub(r'\[BUTTON:\s*[^\]]+\]', '', part_text)
-                        content = re.sub(r'\[CARDS\][\s\S]*?\[\/CARDS\]', '', content)
-                        content = re.sub(r'\[블러:\s*[^\]]+\]', '???', content)
-                        content = content.strip()
-
+            usage = StreamUsage()
+
+            # 비동기 스트리밍 (동기 SDK가 이벤트 루프를 막지 않도록)
+            # system_prompt는 (공통, 섹션) 블록 → 공통 블록 캐시를 8개 섹션이 공유, 사용자 데이터는 user 메시지
+            token_stream = reading_token_stream(
+                cache_key, cached_text, system_prompt, user_message, usage=usage, generation=section.generation
+            )
+            async with aclosing(section_part_events(token_stream)) as events:
+                async for event, payload in events:
+                    if event == "token":
+                        token_count += 1
+
+                        # 첫 토큰 시간 기록
+                        if first_token_time is None:
+                            first_token_time = time.time() - start_time
+                            print(f"⏱️ [SERVER DEBUG] ⚡ LLM 첫 토큰 생성: {first_token_time:.2f}초")
+                            print(f"[V2.5 DEBUG] ⚡ First token received: {first_token_time:.2f}s (token #{token_count})")
+                            print(f"[V2.5 DEBUG] 📤 Starting token stream to client...")
+                    elif event == "cards":
+                        print(f"[V2.5] 🃏 Cards (part {payload['part_index']}): {len(payload['cards'])}개")
+                    else:
                         # ★ 파트 완료 전송 (버튼 활성화 트리거)
-                        print(f"[V2.5] 📦 Part {part_index} 완료: {len(content)} chars, button='{button}'")
-                        yield {
-                            "event": "part",
-                            "data": json.dumps({
-                                "index": part_index,
-                                "content": content,
-                                "button": button
-                            }, ensure_ascii=False)
-                        }
+                        print(f"[V2.5] 📦 Part {payload['index']} 완료: {len(payload['content'])} chars, button='{payload['button']}'")
                         part_index += 1
 
-            # 마지막 파트 (버퍼에 남은 것)
-            if buffer.strip():
-                part_text = buffer.strip()
-                button_match = re.search(r'\[BUTTON:\s*([^\]]+)\]', part_text)
-                button = button_match.group(1) if button_match else "다음"
-
-                content = re.sub(r'\[BUTTON:\s*[^\]]+\]', '', part_text)
-                content = re.sub(r'\[CARDS\][\s\S]*?\[\/CARDS\]', '', content)
-                content = re.sub(r'\[블러:\s*[^\]]+\]', '???', content)
-                content = content.strip()
-
-                if content:
-                    print(f"[V2.5] 📦 Final Part {part_index}: {len(content)} chars, button='{button}'")
-                    yield {
-                        "event": "part",
-                        "data": json.dumps({
-                            "index": part_index,
-                            "content": content,
-                            "button": button
-                        }, ensure_ascii=False)
-                    }
-                    part_index += 1
+                    # ★ 토큰마다 실시간 전송 (핵심!)
+                    yield {"event": event, "data": json_codec.dumps(payload)}
 
             # 8️⃣ 완료 이벤트
             total_time = time.time() - start_time
             print(f"[V2.5 DEBUG] {'='*70}")
             print(f"[V2.5 DEBUG] ✅ Streaming completed successfully!")
             print(f"[V2.5 DEBUG]   Total parts: {part_index}")
-            print(f"[V2.5 DEBUG]   Total tokens: {token_count}")
+            print(f"[V2.5 DEBUG]   Total tokens: {token_count} (LLM output tokens: {usage.output_tokens})")
             print(f"[V2.5 DEBUG]   First token time: {first_token_time:.2f}s")
             print(f"[V2.5 DEBUG]   Total time: {total_time:.2f}s")
+            print(f"[V2.5 DEBUG]   Cache read/write tokens: {usage.cache_read_input_tokens}/{usage.cache_creation_input_tokens}")
             print(f"[V2.5 DEBUG] {'='*70}")
             yield {
                 "event": "done",
-                "data": json.dumps({
+                "data": json_codec.dumps({
                     "total_parts": part_index,
-                    "total_tokens": token_count,
+                    "total_tokens": token_count,  # 기존 의미 그대로: 보낸 token 이벤트 수
+                    "token_events": token_count,
+                    # LLM 출력 토큰 수 (캐시 재생 / 같은 생성에 합류한 요청은 0 - usage와 동일)
+                    "output_tokens": usage.output_tokens,
                     "first_token_time": first_token_time,
-                    "total_time": total_time
-                }, ensure_ascii=False)
+                    "total_time": total_time,
+                    "usage": usage.to_dict(),
+                    "cached": cached_text is not None
+                })
             }
 
         except Exception as e:
@@ -1176,14 +1678,131 @@ async def section_stream_v5(request: SectionStreamRequest):
             print(f"[V2.5 DEBUG] ❌ ERROR during streaming!")
             print(f"[V2.5 DEBUG]   Error type: {type(e).__name__}")
             print(f"[V2.5 DEBUG]   Error message: {str(e)}")
-            print(f"[V2.5 DEBUG]   Tokens streamed before error: {token_count}")
+            print(f"[V2.5 DEBUG]   Token events streamed before error: {token_count}")
             print(f"[V2.5 DEBUG]   Parts completed before error: {part_index}")
             print(f"[V2.5 DEBUG] {'='*70}")
             import traceback
             traceback.print_exc()
-            yield {"event": "error", "data": json.dumps({"error": str(e)}, ensure_ascii=False)}
+            yield {"event": "error", "data": json_codec.dumps({"error": str(e)})}
+
+    return ClosingEventSourceResponse(
+        generate(),
+        headers={
+            "X-Accel-Buffering": "no",
+            "Cache-Control": "no-cache"
+        }
+    )
+
+
+# ═══════════════════════════════════════════════════════════════
+# 서버 병렬 전체 풀이 (섹션 N개 동시 생성 → SSE 1개로 다중화)
+# ═══════════════════════════════════════════════════════════════
+@app.post("/api/v2/full-reading-parallel")
+async def full_reading_parallel(request: ParallelReadingRequest):
+    """
+    전체 풀이 - 섹션별 프롬프트를 서버에서 동시에 생성
+
+    - 모든 이벤트에 "section" 필드를 붙여서 하나의 SSE 스트림으로 섞어 보냄
+    - event: section_start / token / part / cards / section_done / section_error, 마지막에 done
+    - 소요 시간은 섹션 합계가 아니라 가장 느린 섹션 기준
+    """
+    import time
+    import datetime
+
+    print(f"\n{'='*60}")
+    print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] /api/v2/full-reading-parallel 호출")
+    print(f"  - user_name: {request.user_name}")
+    print(f"  - variant: {request.variant if request.variant else 'None (기본 v4.0.1)'}")
+    print('='*60)
+
+    if not request.saju_data:
+        raise HTTPException(status_code=400, detail="saju_data is required")
+
+    prompts = load_prompts_by_variant(request.variant)
+    if not prompts:
+        raise HTTPException(status_code=500, detail="prompts not loaded")
+
+    section_names = request.sections or list(prompts.get("section_prompts", {}).keys())
+    sections = []
+    for name in section_names:
+        section = load_section_by_variant(request.variant, SECTION_ALIASES.get(name, name))
+        if not section:
+            raise HTTPException(status_code=404, detail=f"section not found: {name}")
+        sections.append(section)
+
+    concurrency = min(request.concurrency or PARALLEL_SECTION_CONCURRENCY, PARALLEL_SECTION_CONCURRENCY)
+    concurrency = max(concurrency, 1)
+
+    user_name = request.user_name if request.user_name and request.user_name != "사용자" else DEFAULT_USER_NAME
+    # 섹션은 모두 같은 variant 파일 → saju_data 표기도 같음
+    data_format = sections[0].data_format if sections else PRETTY
+    variables = get_template_variables(request.saju_data, user_name, data_format)
+    system_suffix = f"[Internal timestamp: {datetime.datetime.now().isoformat()}]"
+
+    print(f"[OK] 병렬 생성 준비 완료: 섹션 {len(sections)}개, 동시 {concurrency}개")
+
+    async def run_section(section: CompiledSection, queue: asyncio.Queue, semaphore: asyncio.Semaphore):
+        """섹션 1개 생성 → 이벤트를 공용 큐에 넣음 (마지막은 항상 section_done/section_error)"""
+        async with semaphore:
+            try:
+                usage = StreamUsage()
+                part_count = 0
+                await queue.put(("section_start", {"section": section.name}))
+                user_message = section.render_user(variables)
+                cache_key = section_reading_key(section, request.saju_data, user_name)
+                cached_text = await lookup_reading(cache_key)
+                token_stream = reading_token_stream(
+                    cache_key, cached_text, section.system_blocks, user_message, system_suffix, usage,
+                    section.generation
+                )
+                async with aclosing(section_part_events(token_stream)) as events:
+                    async for event, payload in events:
+                        if event == "part":
+                            part_count += 1
+                        await queue.put((event, {"section": section.name, **payload}))
+                await queue.put(("section_done", {
+                    "section": section.name,
+                    "total_parts": part_count,
+                    "usage": usage.to_dict(),
+                    "cached": cached_text is not None
+                }))
+            except Exception as e:
+                print(f"[ERROR] 병렬 섹션 생성 실패 ({section.name}): {str(e)}")
+                await queue.put(("section_error", {"section": section.name, "error": str(e)}))
+
+    async def generate():
+        start_time = time.time()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=PARALLEL_QUEUE_MAX_EVENTS)
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = [asyncio.create_task(run_section(section, queue, semaphore)) for section in sections]
+        remaining = len(tasks)
+        failed = 0
+
+        try:
+            while remaining:
+                event, payload = await queue.get()
+                if event in ("section_done", "section_error"):
+                    remaining -= 1
+                    failed += event == "section_error"
+                yield {"event": event, "data": json_codec.dumps(payload)}
+
+            total_time = time.time() - start_time
+            print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 병렬 전체 풀이 완료: {len(sections)}개 섹션, {total_time:.2f}초")
+            yield {
+                "event": "done",
+                "data": json_codec.dumps({
+                    "sections": [section.name for section in sections],
+                    "failed": failed,
+                    "total_time": total_time
+                })
+            }
+        finally:
+            # 클라이언트가 먼저 끊으면 남은 섹션 생성도 중단 (LLM 스트림이 닫힐 때까지 대기)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-    return EventSourceResponse(
+    return ClosingEventSourceResponse(
         generate(),
         headers={
             "X-Accel-Buffering": "no",
@@ -5,15 +5,11 @@ FastAPI 서버 - 천기문 사주풀이 API (Gemini 3 Flash Preview 버전)
 
 import sys
 import os
-import re
-import yaml
 from pathlib import Path
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
-from sse_starlette.sse import EventSourceResponse
 from pydantic import BaseModel
-import asyncio
 from typing import Optional, List
 import json
 from dotenv import load_dotenv
@@ -27,6 +23,11 @@ BASE_DIR = Path(__file__).parent
 # LLM_모듈 경로 추가
 sys.path.insert(0, str(BASE_DIR))
 from client_gemini import LLMClient
+from prompt_registry import PromptRegistry
+from prompt_template import GenerationConfig
+from sse_streams import ClosingEventSourceResponse, aclosing
+from token_coalescer import TokenCoalescer
+import json_codec
 
 # FastAPI 앱 생성
 app = FastAPI(title="천기문 사주풀이 API (Gemini)", version="4.0.0")
@@ -43,6 +44,23 @@ app.add_middleware(
 # 전역 클라이언트
 llm_client = LLMClient()
 
+# 토큰 합치기 (api_server와 같은 설정, 0이면 토큰마다 프레임)
+token_coalescer = TokenCoalescer(
+    window=float(os.getenv("TOKEN_COALESCE_WINDOW_MS", "40")) / 1000,
+    max_bytes=int(os.getenv("TOKEN_COALESCE_MAX_BYTES", "96")),
+    sentence_flush=os.getenv("TOKEN_COALESCE_SENTENCE", "1") != "0"
+)
+
+
+async def llm_token_stream(system_prompt: str, user_message: str, system_suffix: Optional[str] = None,
+                           generation: Optional[GenerationConfig] = None):
+    """모든 SSE 엔드포인트 공용 비동기 토큰 스트림 (스트림당 스레드/토큰당 executor 홉 없음, 닫히면 astream도 닫음, 짧은 토큰은 묶음)"""
+    stream = llm_client.astream(system_prompt, user_message, system_suffix=system_suffix, generation=generation)
+    async with aclosing(token_coalescer.stream(stream)) as chunks:
+        async for chunk in chunks:
+            yield chunk
+
+
 # 사주 데이터 디렉토리 (배포 환경용)
 SAJU_DATA_DIR = BASE_DIR / "saju_data"
 
@@ -60,54 +78,32 @@ except Exception as e:
     print(f"[WARN] Default saju data load failed: {e}")
     DEFAULT_USER_NAME = "테스트"
 
+# 프롬프트 레지스트리 (파일마다 1회 파싱, 변경 시에만 다시 로드)
+PROMPTS_DIR = BASE_DIR / "prompts"
+prompt_registry = PromptRegistry(PROMPTS_DIR)
+
 # v4.0 프롬프트 경로 (Gemini용)
-V4_PROMPT_PATH = BASE_DIR / "prompts" / "v4.0_with_buttons.yaml"
+V4_PROMPT_PATH = PROMPTS_DIR / "v4.0_with_buttons.yaml"
 
 
 def load_v4_prompts():
-    """v4.0 프롬프트 실시간 로드 (yaml 수정 즉시 반영)"""
-    try:
-        if V4_PROMPT_PATH.exists():
-            with open(V4_PROMPT_PATH, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f)
-                import datetime
-                timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-                print(f"[{timestamp}] v4.0 prompts loaded from disk")
-                return data
-    except Exception as e:
-        print(f"[WARN] v4.0 prompts load failed: {e}")
-    return None
+    """v4.0 프롬프트 조회 (메모리 캐시, yaml 수정 즉시 반영)"""
+    return prompt_registry.get(V4_PROMPT_PATH.name)
 
 
 # v10.0 프롬프트 경로 (배포용 - prompts 폴더)
-V10_PROMPT_PATH = BASE_DIR / "prompts" / "v10.0_parallel.yaml"
+V10_PROMPT_PATH = PROMPTS_DIR / "v10.0_parallel.yaml"
 
 
 def load_v10_prompts():
-    """v10.0 프롬프트 실시간 로드 (yaml 수정 즉시 반영)"""
-    try:
-        if V10_PROMPT_PATH.exists():
-            with open(V10_PROMPT_PATH, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f)
-                import datetime
-                timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-                print(f"[{timestamp}] v10.0 prompts loaded from disk")
-                return data
-    except Exception as e:
-        print(f"[WARN] v10.0 prompts load failed: {e}")
-    return None
-
-
-# 서버 시작 시 확인
-if V4_PROMPT_PATH.exists():
-    print("[OK] v4.0 prompts file found (will load on each request)")
-else:
-    print(f"[WARN] v4.0 prompts file not found at {V4_PROMPT_PATH}")
-
-if V10_PROMPT_PATH.exists():
-    print("[OK] v10.0 prompts file found (will load on each request)")
-else:
-    print(f"[WARN] v10.0 prompts file not found at {V10_PROMPT_PATH}")
+    """v10.0 프롬프트 조회 (메모리 캐시, yaml 수정 즉시 반영)"""
+    return prompt_registry.get(V10_PROMPT_PATH.name)
+
+
+# 서버 시작 시 미리 파싱 (이후 요청은 메모리에서 조회)
+for _prompt_path in (V4_PROMPT_PATH, V10_PROMPT_PATH):
+    if prompt_registry.get(_prompt_path.name) is None:
+        print(f"[WARN] prompts file not found at {_prompt_path}")
 
 
 # ============ v8 헬퍼 함수 ============
@@ -160,7 +156,7 @@ def get_template_variables(saju_data: dict, user_name: str) -> dict:
         "dohwasal": "있음" if sinsal.get("특수", {}).get("도화살") else "없음",
         "mbti": meta.get("mbti", "알 수 없음"),
         "gisin": str(gisin.get("오행", [])),
-        "saju_data": json.dumps(saju_data, ensure_ascii=False, indent=2)
+        "saju_data": json_codec.dumps_pretty(saju_data)
     }
 
 
@@ -172,34 +168,6 @@ def render_template(template: str, variables: dict) -> str:
     return result
 
 
-def parse_v8_response(text: str) -> List[str]:
-    """v8 형식 응답을 말풍선 + 버튼으로 분리"""
-    parts = text.split("---")
-    bubbles = []
-
-    for part in parts:
-        part = part.strip()
-        if not part:
-            continue
-
-        button_match = re.search(r'\[BUTTON:\s*([^\]]+)\]', part)
-        button_text = None
-
-        if button_match:
-            button_text = button_match.group(1)
-            part = re.sub(r'\[BUTTON:\s*[^\]]+\]', '', part).strip()
-
-        sentences = [s.strip() for s in part.split("\n") if s.strip()]
-
-        for sentence in sentences:
-            bubbles.append(sentence)
-
-        if button_text:
-            bubbles.append(f"[BUTTON]{button_text}")
-
-    return bubbles
-
-
 # ============ 요청/응답 모델 ============
 
 class FirstImpressionRequest(BaseModel):
@@ -253,6 +221,10 @@ async def health_check():
         "status": "ok",
         "model": "gemini-3-flash-preview",
         "prompts_loaded": V4_PROMPT_PATH.exists(),
+        "prompt_versions": {
+            "v4.0": prompt_registry.describe(V4_PROMPT_PATH.name),
+            "v10.0": prompt_registry.describe(V10_PROMPT_PATH.name)
+        },
         "default_data_loaded": DEFAULT_SAJU_DATA is not None
     }
 
@@ -284,7 +256,8 @@ async def get_full_reading_stream(request: FullReadingRequest):
     timestamp = datetime.datetime.now().isoformat()
 
     # 프롬프트 준비
-    system_prompt = unified_prompt.get("system", "") + f"\n\n[Internal timestamp: {timestamp}]"
+    system_prompt = unified_prompt.get("system", "")
+    system_suffix = f"[Internal timestamp: {timestamp}]"  # 고정 system 뒤에 붙는 요청별 텍스트
     user_message = render_template(unified_prompt.get("user_template", ""), variables)
 
     print(f"[OK] 프롬프트 준비 완료 (system: {len(system_prompt)}자, user: {len(user_message)}자)")
@@ -292,24 +265,17 @@ async def get_full_reading_stream(request: FullReadingRequest):
     async def event_generator():
         try:
             print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] LLM 스트리밍 시작 (Gemini)...")
-            # 동기 generator를 별도 스레드에서 실행
-            loop = asyncio.get_event_loop()
-            stream_iter = iter(llm_client.stream(system_prompt, user_message))
-
-            while True:
-                try:
-                    chunk = await loop.run_in_executor(None, next, stream_iter)
-                    yield {"event": "message", "data": json.dumps({"token": chunk})}
-                except StopIteration:
-                    break
-
-            yield {"event": "message", "data": json.dumps({"done": True})}
+            async with aclosing(llm_token_stream(system_prompt, user_message, system_suffix)) as tokens:
+                async for chunk in tokens:
+                    yield {"event": "message", "data": json_codec.dumps({"token": chunk})}
+
+            yield {"event": "message", "data": json_codec.dumps({"done": True})}
             print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 스트리밍 완료 (Gemini)")
         except Exception as e:
             print(f"[ERROR] 스트리밍 실패 (Gemini): {str(e)}")
-            yield {"event": "error", "data": json.dumps({"error": str(e)})}
+            yield {"event": "error", "data": json_codec.dumps({"error": str(e)})}
 
-    return EventSourceResponse(event_generator())
+    return ClosingEventSourceResponse(event_generator())
 
 
 @app.post("/first-impression-stream")
@@ -332,28 +298,22 @@ async def get_first_impression_stream(request: FirstImpressionRequest):
     user_template = step_prompt.get("user_template", "")
 
     timestamp = datetime.datetime.now().isoformat()
-    system_prompt = f"{system_prompt}\n\n[Internal timestamp: {timestamp}]"
+    system_suffix = f"[Internal timestamp: {timestamp}]"  # 고정 system 뒤에 붙는 요청별 텍스트
 
     variables = get_template_variables(saju_data, user_name)
     user_message = render_template(user_template, variables)
 
     async def event_generator():
         try:
-            loop = asyncio.get_event_loop()
-            stream_iter = iter(llm_client.stream(system_prompt, user_message))
-
-            while True:
-                try:
-                    chunk = await loop.run_in_executor(None, next, stream_iter)
-                    yield {"event": "message", "data": json.dumps({"token": chunk})}
-                except StopIteration:
-                    break
+            async with aclosing(llm_token_stream(system_prompt, user_message, system_suffix)) as tokens:
+                async for chunk in tokens:
+                    yield {"event": "message", "data": json_codec.dumps({"token": chunk})}
 
-            yield {"event": "message", "data": json.dumps({"done": True})}
+            yield {"event": "message", "data": json_codec.dumps({"done": True})}
         except Exception as e:
-            yield {"event": "error", "data": json.dumps({"error": str(e)})}
+            yield {"event": "error", "data": json_codec.dumps({"error": str(e)})}
 
-    return EventSourceResponse(event_generator())
+    return ClosingEventSourceResponse(event_generator())
 
 
 @app.post("/step-stream")
@@ -376,28 +336,22 @@ async def get_step_stream(request: StepRequest):
     user_template = step_prompt.get("user_template", "")
 
     timestamp = datetime.datetime.now().isoformat()
-    system_prompt = f"{system_prompt}\n\n[Internal timestamp: {timestamp}]"
+    system_suffix = f"[Internal timestamp: {timestamp}]"  # 고정 system 뒤에 붙는 요청별 텍스트
 
     variables = get_template_variables(saju_data, user_name)
     user_message = render_template(user_template, variables)
 
     async def event_generator():
         try:
-            loop = asyncio.get_event_loop()
-            stream_iter = iter(llm_client.stream(system_prompt, user_message))
-
-            while True:
-                try:
-                    chunk = await loop.run_in_executor(None, next, stream_iter)
-                    yield {"event": "message", "data": json.dumps({"token": chunk})}
-                except StopIteration:
-                    break
+            async with aclosing(llm_token_stream(system_prompt, user_message, system_suffix)) as tokens:
+                async for chunk in tokens:
+                    yield {"event": "message", "data": json_codec.dumps({"token": chunk})}
 
-            yield {"event": "message", "data": json.dumps({"done": True})}
+            yield {"event": "message", "data": json_codec.dumps({"done": True})}
         except Exception as e:
-            yield {"event": "error", "data": json.dumps({"error": str(e)})}
+            yield {"event": "error", "data": json_codec.dumps({"error": str(e)})}
 
-    return EventSourceResponse(event_generator())
+    return ClosingEventSourceResponse(event_generator())
 
 
 @app.post("/section-stream")
@@ -410,12 +364,12 @@ async def get_section_stream(request: SectionRequest):
     print(f"  - user_name: {request.user_name}")
     print('='*60)
 
-    v10_prompts = load_v10_prompts()
-    if not v10_prompts:
+    if not load_v10_prompts():
         raise HTTPException(status_code=500, detail="v10.0 prompts not loaded")
 
-    section_prompt = v10_prompts.get("section_prompts", {}).get(request.section_name, {})
-    if not section_prompt:
+    # 컴파일된 섹션 프롬프트 (프롬프트 버전마다 1회 - 공통 블록 치환 + 템플릿 분해 완료)
+    section = prompt_registry.get_section(V10_PROMPT_PATH.name, request.section_name)
+    if not section:
         raise HTTPException(status_code=404, detail=f"section not found: {request.section_name}")
 
     # 사주 데이터 결정
@@ -426,17 +380,10 @@ async def get_section_stream(request: SectionRequest):
     variables = get_template_variables(saju_data, user_name)
     timestamp = datetime.datetime.now().isoformat()
 
-    # 공통 시스템 + 섹션별 시스템 결합
-    common_system = v10_prompts.get("common_system", "")
-    section_system = section_prompt.get("system", "")
-    system_prompt = section_system.replace("{common_system}", common_system)
-    system_prompt = f"{system_prompt}\n\n[Internal timestamp: {timestamp}]"
-
-    # 공통 데이터 + 섹션별 템플릿 결합
-    common_data = v10_prompts.get("common_data_template", "")
-    section_user = section_prompt.get("user_template", "")
-    user_message = section_user.replace("{common_data_template}", common_data)
-    user_message = render_template(user_message, variables)
+    system_prompt = section.system_prompt  # {common_system} 치환 완료
+    system_suffix = f"[Internal timestamp: {timestamp}]"  # 고정 system 뒤에 붙는 요청별 텍스트
+    user_message = section.render_user(variables)  # 슬롯만 채움 (변수마다 str.replace 없음)
+    generation = section.generation  # 섹션별 max_tokens 등
 
     print(f"[OK] 섹션 프롬프트 준비 완료: {request.section_name}")
     print(f"  - system_prompt 길이: {len(system_prompt)}자")
@@ -445,23 +392,17 @@ async def get_section_stream(request: SectionRequest):
     async def event_generator():
         try:
             print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 섹션 스트리밍 시작: {request.section_name}")
-            loop = asyncio.get_event_loop()
-            stream_iter = iter(llm_client.stream(system_prompt, user_message))
-
-            while True:
-                try:
-                    chunk = await loop.run_in_executor(None, next, stream_iter)
-                    yield {"event": "message", "data": json.dumps({"token": chunk})}
-                except StopIteration:
-                    break
+            async with aclosing(llm_token_stream(system_prompt, user_message, system_suffix, generation)) as tokens:
+                async for chunk in tokens:
+                    yield {"event": "message", "data": json_codec.dumps({"token": chunk})}
 
-            yield {"event": "message", "data": json.dumps({"done": True})}
+            yield {"event": "message", "data": json_codec.dumps({"done": True})}
             print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 섹션 스트리밍 완료: {request.section_name}")
         except Exception as e:
             print(f"[ERROR] 섹션 스트리밍 실패 ({request.section_name}): {str(e)}")
-            yield {"event": "error", "data": json.dumps({"error": str(e)})}
+            yield {"event": "error", "data": json_codec.dumps({"error": str(e)})}
 
-    return EventSourceResponse(event_generator())
+    return ClosingEventSourceResponse(event_generator())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,83 @@
+"""
+모델 캐스케이드 벤치마크 (가짜 LLM, 네트워크 호출 없음)
+
+v10.0_v4.0.1 first-impression 섹션을 section_part_events(llm_token_stream(...))로 생성해서
+- 첫 토큰 (TTFT)
+- 파트 0 완료 (첫 part 이벤트 - 랜딩 첫 화면)
+- 섹션 완료
+를 메인 모델만 / 캐스케이드(파트 0은 빠른 모델)로 비교, 두 방식의 part 이벤트가 같은지도 확인
+
+가짜 모델 지연 (첫 토큰, 토큰 간격 / 토큰 3글자):
+- 메인: 1.2초, 25ms
+- 빠른 모델: 0.4초, 10ms
+
+실행: python bench_cascade.py
+"""
+
+import os
+import io
+import time
+import asyncio
+import contextlib
+from dataclasses import replace
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench-dummy-key")
+
+import api_server
+from fake_llm import FakeLLMClient, DEFAULT_FAKE_TEXT
+from sse_streams import aclosing
+
+MAIN_DELAYS = (1.2, 0.025)
+FAST_DELAYS = (0.4, 0.010)
+RUNS = 5
+
+
+async def one_section(section, generation) -> tuple:
+    start = time.perf_counter()
+    ttft = first_part = None
+    parts = []
+    stream = api_server.llm_token_stream(section.system_blocks, "벤치", None, None, generation)
+    async with aclosing(api_server.section_part_events(stream)) as events:
+        async for event, payload in events:
+            now = time.perf_counter() - start
+            if event == "token" and ttft is None:
+                ttft = now
+            elif event == "part":
+                first_part = first_part or now
+                parts.append((payload["index"], payload["content"], payload["button"]))
+    return ttft, first_part, time.perf_counter() - start, parts
+
+
+def main():
+    section = api_server.load_section_by_variant("v4.0.1", "first-impression")
+    cascaded = section.generation
+    assert cascaded.cascade_model, "first-impression에 cascade_model이 없음"
+    settings = [("메인 모델만", replace(cascaded, cascade_model=None)), ("캐스케이드", cascaded)]
+
+    model_delays = {cascaded.model: MAIN_DELAYS, cascaded.cascade_model: FAST_DELAYS}
+    api_server.llm_client = FakeLLMClient(
+        DEFAULT_FAKE_TEXT, chunk_size=3, token_delay=MAIN_DELAYS[1], first_token_delay=MAIN_DELAYS[0],
+        model_delays=model_delays,
+    )
+
+    print("=" * 72)
+    print(f"모델 캐스케이드 벤치마크 (first-impression, {len(DEFAULT_FAKE_TEXT)}자, {RUNS}회 평균)")
+    print(f"메인 모델: 첫 토큰 {MAIN_DELAYS[0]}초 / 토큰 {MAIN_DELAYS[1] * 1000:.0f}ms, "
+          f"빠른 모델: 첫 토큰 {FAST_DELAYS[0]}초 / 토큰 {FAST_DELAYS[1] * 1000:.0f}ms")
+    print("=" * 72)
+    print(f"{'설정':<14}{'TTFT(초)':>12}{'파트 0 완료(초)':>18}{'섹션 완료(초)':>16}")
+
+    results = {}
+    for label, generation in settings:
+        with contextlib.redirect_stdout(io.StringIO()):
+            runs = [asyncio.run(one_section(section, generation)) for _ in range(RUNS)]
+        results[label] = runs[0][3]
+        ttft, first_part, total = (sum(run[i] for run in runs) / RUNS for i in range(3))
+        print(f"{label:<14}{ttft:>12.2f}{first_part:>18.2f}{total:>16.2f}")
+
+    assert results["메인 모델만"] == results["캐스케이드"], "part 이벤트가 다름"
+    print(f"[OK] part 이벤트 동일 ({len(results['캐스케이드'])}개), 집계: {api_server.model_cascade.stats()}")
+
+
+if __name__ == "__main__":
+    main()
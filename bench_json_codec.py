@@ -0,0 +1,77 @@
+"""
+JSON 직렬화 벤치마크 (saju_data/default.json 실제 데이터)
+
+- json:   기존 방식 (표준 json - SSE 프레임마다 json.dumps, 프롬프트용 indent=2, DB는 문자열로 직렬화/파싱)
+- orjson: json_codec (JSON_BACKEND=auto, orjson 설치 시) - DB는 asyncpg json/jsonb 코덱에서 같은 함수 사용
+
+실행: python bench_json_codec.py
+"""
+
+import os
+import json
+import timeit
+import importlib
+from pathlib import Path
+
+import json_codec
+
+SAJU_FILE = Path(__file__).parent / "saju_data" / "default.json"
+
+
+def codec_functions(backend: str):
+    os.environ["JSON_BACKEND"] = backend
+    module = importlib.reload(json_codec)
+    return module.BACKEND, module.dumps, module.dumps_pretty, module.loads
+
+
+def main():
+    saju_data = json.loads(SAJU_FILE.read_text(encoding="utf-8"))
+    saju_text = json.dumps(saju_data, ensure_ascii=False)
+    form_data = {"name": "앤드류", "year": 1990, "month": 5, "day": 15, "hour": 14, "minute": 30,
+                 "gender": "male", "is_lunar": False, "mbti": "INTJ", "birth_place": "서울"}
+    token = {"text": "자네"}
+    part = {"index": 1, "content": "자네는 무자(戊子) 일주야.\n겉은 단단한 산인데 속은 깊은 물이지.",
+            "button": "어떻게 알았어요?", "blurs": []}
+
+    # 기준선: 변경 전 호출 그대로
+    baseline = {
+        "SSE token 프레임": lambda: json.dumps(token),
+        "SSE part 프레임": lambda: json.dumps(part, ensure_ascii=False),
+        "프롬프트 saju_data (indent=2)": lambda: json.dumps(saju_data, ensure_ascii=False, indent=2),
+        "DB 저장 saju_data": lambda: json.dumps(saju_data),
+        "DB 로드 saju_data": lambda: json.loads(saju_text),
+        "DB 저장 form_data": lambda: json.dumps(form_data),
+    }
+
+    def codec_paths(dumps, dumps_pretty, loads) -> dict:
+        return {
+            "SSE token 프레임": lambda: dumps(token),
+            "SSE part 프레임": lambda: dumps(part),
+            "프롬프트 saju_data (indent=2)": lambda: dumps_pretty(saju_data),
+            "DB 저장 saju_data": lambda: dumps(saju_data),
+            "DB 로드 saju_data": lambda: loads(saju_text),
+            "DB 저장 form_data": lambda: dumps(form_data),
+        }
+
+    results = {}
+    for backend in ("json", "auto"):
+        name, dumps, dumps_pretty, loads = codec_functions(backend)
+        assert dumps_pretty(saju_data) == baseline["프롬프트 saju_data (indent=2)"](), name
+        assert loads(dumps(saju_data)) == saju_data, name
+        results[name] = codec_paths(dumps, dumps_pretty, loads)
+    fast_name = "orjson" if "orjson" in results else "json"
+
+    print("=" * 84)
+    print(f"JSON 직렬화 벤치마크 ({SAJU_FILE.name} {len(saju_text.encode())}바이트, 백엔드: {fast_name})")
+    print("=" * 84)
+    print(f"{'경로':<30}{'기존(us)':>12}{'json_codec[json](us)':>22}{f'[{fast_name}](us)':>14}{'배속':>8}")
+    for label, old_fn in baseline.items():
+        number = 20000 if "프레임" in label or "form" in label else 2000
+        old = timeit.timeit(old_fn, number=number) / number
+        std = timeit.timeit(results["json"][label], number=number) / number
+        new = timeit.timeit(results[fast_name][label], number=number) / number
+        print(f"{label:<30}{old * 1e6:>12.2f}{std * 1e6:>22.2f}{new * 1e6:>14.2f}{old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+만세력 API 클라이언트 벤치마크 (로컬 대역 서버 사용, 외부 네트워크 호출 없음)
+
+call_manseryuk_api를 순차로 N번 호출해서 호출당 지연을 비교
+- per-call: 수정 전 방식 재현 (호출마다 새 AsyncClient → TCP 연결 + TLS 핸드셰이크)
+- pooled:   startup에서 만든 공유 클라이언트 (keep-alive 연결 재사용)
+
+대역 서버는 자체 서명 인증서로 HTTPS를 열고, 앞단 TCP 프록시가 패킷마다
+RTT/2 지연을 넣어서 실제 api.cheongimun.com 까지의 왕복 시간을 흉내냄
+(핸드셰이크 비용은 RTT에 비례하므로 RTT 0 / 20ms / 50ms 로 측정)
+
+실행: python bench_manseryuk_client.py
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import subprocess
+import contextlib
+import io
+from pathlib import Path
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench-dummy-key")
+
+SERVER_PORT = 18443
+PROXY_PORT = 18444
+CALLS = 30
+RTTS = [0.0, 0.02, 0.05]
+
+STAND_IN_SERVER = f"""
+import uvicorn
+from fastapi import FastAPI
+
+app = FastAPI()
+
+@app.post("/api/v1/manseryuk/calculate-enriched")
+async def calculate(payload: dict):
+    return {{"success": True, "enrichment": {{"meta": {{"이름": payload.get("name")}}}}}}
+
+uvicorn.run(app, host="127.0.0.1", port={SERVER_PORT}, log_level="warning",
+            ssl_certfile=__import__("sys").argv[1], ssl_keyfile=__import__("sys").argv[2])
+"""
+
+
+def make_cert(directory: Path) -> tuple:
+    """localhost용 자체 서명 인증서 생성"""
+    cert, key = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", str(key), "-out", str(cert), "-days", "1",
+            "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+async def start_delay_proxy(rtt: float) -> asyncio.AbstractServer:
+    """각 방향 데이터에 RTT/2 지연을 넣는 TCP 프록시"""
+
+    async def pipe(reader, writer):
+        try:
+            while data := await reader.read(65536):
+                if rtt:
+                    await asyncio.sleep(rtt / 2)
+                writer.write(data)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle(client_reader, client_writer):
+        try:
+            server_reader, server_writer = await asyncio.open_connection("127.0.0.1", SERVER_PORT)
+            await asyncio.gather(pipe(client_reader, server_writer), pipe(server_reader, client_writer))
+        except asyncio.CancelledError:
+            client_writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", PROXY_PORT)
+
+
+async def wait_for_server(cert: Path) -> None:
+    import httpx
+
+    for _ in range(100):
+        try:
+            async with httpx.AsyncClient(verify=False) as client:
+                await client.post(f"https://127.0.0.1:{SERVER_PORT}/api/v1/manseryuk/calculate-enriched", json={})
+            return
+        except httpx.HTTPError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("stand-in server did not start")
+
+
+async def measure(api_server, pooled: bool) -> tuple:
+    """순차 CALLS회 호출 → (호출당 평균 ms, 첫 호출 ms)"""
+    if pooled:
+        api_server.manseryuk_client = api_server.create_manseryuk_client()
+
+    latencies = []
+    try:
+        for i in range(CALLS):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                await api_server.call_manseryuk_api(
+                    name=f"벤치{i}", year=1993, month=1, day=7, hour=16, minute=30,
+                    gender="male", is_lunar=False, mbti=None, birth_place=None,
+                )
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        if pooled:
+            await api_server.manseryuk_client.aclose()
+            api_server.manseryuk_client = None
+
+    return sum(latencies) / len(latencies), latencies[0]
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = make_cert(Path(tmp))
+        os.environ["SSL_CERT_FILE"] = str(cert)  # 공유 클라이언트가 자체 서명 인증서를 신뢰하도록
+        os.environ["MANSERYUK_API_URL"] = f"https://localhost:{PROXY_PORT}/api/v1/manseryuk/calculate-enriched"
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            import api_server
+
+        server = subprocess.Popen([sys.executable, "-c", STAND_IN_SERVER, str(cert), str(key)])
+        try:
+            await wait_for_server(cert)
+
+            print(f"만세력 API 순차 {CALLS}회 호출 (HTTPS, 로컬 대역 서버)")
+            print(f"{'RTT':>6} | {'per-call 평균':>14} | {'pooled 평균':>12} | {'pooled 첫 호출':>14} | {'호출당 절감':>10}")
+            print("-" * 72)
+            for rtt in RTTS:
+                proxy = await start_delay_proxy(rtt)
+                try:
+                    per_call_avg, _ = await measure(api_server, pooled=False)
+                    pooled_avg, pooled_first = await measure(api_server, pooled=True)
+                finally:
+                    proxy.close()
+                    await proxy.wait_closed()
+                print(
+                    f"{rtt * 1000:>4.0f}ms | {per_call_avg:>12.1f}ms | {pooled_avg:>10.1f}ms | "
+                    f"{pooled_first:>12.1f}ms | {per_call_avg - pooled_avg:>8.1f}ms"
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
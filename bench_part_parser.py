@@ -0,0 +1,161 @@
+"""
+하이브리드 파트 파서 벤치마크 (토큰 스트림 → part 이벤트)
+
+- legacy: 기존 section_part_events (buffer += chunk 후 토큰마다 '---' 전체 검색, 파트마다 re.sub 3번)
+- parser: PartStreamParser (새로 들어온 글자만 훑음, 경계에 걸친 구분자/마커만 보류)
+
+긴 응답 (fake_llm 응답 형식을 이어 붙인 것), 토큰 2글자 단위 (한국어 토큰 1~3글자):
+- 8섹션: 섹션당 4파트 (일반적인 전체 풀이)
+- 긴 섹션: 파트 40개 (파트당 ~600자)
+- 구분자 없는 긴 파트: 20,000자 파트 1개 (기존 방식의 최악 - 토큰마다 버퍼 전체 재검색)
+
+실행: python bench_part_parser.py
+"""
+
+import re
+import random
+import timeit
+
+from fake_llm import DEFAULT_FAKE_TEXT
+from part_parser import PartStreamParser
+
+
+def legacy_split_part(part_text: str) -> tuple:
+    """기존 api_server.split_part (기준선)"""
+    button_match = re.search(r'\[BUTTON:\s*([^\]]+)\]', part_text)
+    button = button_match.group(1) if button_match else "다음"
+    content = re.sub(r'\[BUTTON:\s*[^\]]+\]', '', part_text)
+    content = re.sub(r'\[CARDS\][\s\S]*?\[\/CARDS\]', '', content)
+    content = re.sub(r'\[블러:\s*[^\]]+\]', '???', content)
+    return content.strip(), button
+
+
+def legacy_part_events(chunks) -> list:
+    """기존 section_part_events의 파트 검출 (기준선)"""
+    events = []
+    buffer = ""
+    part_index = 0
+    for chunk in chunks:
+        buffer += chunk
+        while "---" in buffer:
+            idx = buffer.index("---")
+            part_text = buffer[:idx].strip()
+            buffer = buffer[idx + 3:]
+            if part_text:
+                content, button = legacy_split_part(part_text)
+                events.append(("part", {"index": part_index, "content": content, "button": button}))
+                part_index += 1
+    if buffer.strip():
+        content, button = legacy_split_part(buffer.strip())
+        if content:
+            events.append(("part", {"index": part_index, "content": content, "button": button}))
+    return events
+
+
+def parser_part_events(chunks) -> list:
+    parser = PartStreamParser()
+    events = []
+    for chunk in chunks:
+        events.extend(parser.feed(chunk))
+    events.extend(parser.close())
+    return events
+
+
+def legacy_fields(events: list) -> list:
+    """파서 이벤트 중 기존 방식에도 있던 부분만 (part의 index/content/button)"""
+    return [
+        (event, {key: payload[key] for key in ("index", "content", "button")})
+        for event, payload in events if event == "part"
+    ]
+
+
+def check_blurs(events: list) -> None:
+    for event, payload in events:
+        if event == "part":
+            for blur in payload["blurs"]:
+                assert payload["content"][blur["start"]:blur["end"]] == "???", payload
+
+
+def chunked(text: str, size: int) -> list:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def random_chunks(text: str, rng: random.Random) -> list:
+    chunks, i = [], 0
+    while i < len(text):
+        size = rng.randint(1, 6)
+        chunks.append(text[i:i + size])
+        i += size
+    return chunks
+
+
+# ---------- 결과 동일성 (토큰 경계 무작위) ----------
+
+FRAGMENTS = [
+    "자네는 무자(戊子) 일주야.\n", "겉은 단단한 산인데 속은 깊은 물이지.\n", "\n", "  ",
+    "[BUTTON: 왜요?]", "[BUTTON:알려주세요]", "[BUTTON:]", "[BUTTON: ]", "[BUTTON: 줄\n바꿈]",
+    "---", "----", "--", "-", "\n---\n",
+    "[블러: 올해 3월]", "[블러:]", "[블러", "[CARDS]\nyearly|📅 신년운세|2026년 월별 운세\n[/CARDS]",
+    "[CARDS]\n[BUTTON: 카드 안]\n[/CARDS]", "[CARDS]\nwealth|💰 재물운", "[/CARDS]", "[", "]",
+    "[BUT", "[버튼]", "[블러: 미완성 --- 다음]",
+    # 미완성 / 중첩 / 다른 대괄호 마커
+    "[BUTTON: 미완성", "[BUTTON: a [BUTTON: b]]", "[[BUTTON: z]", "[BUTTON: x --- y]", "[BUTTON: [블러: c]]",
+    "[PART 1]", "[PART 2: 제목]", "[PART", "[블러: a [블러: b]]", "[CARDS][CARDS]a|b|c[/CARDS]",
+]
+
+# 알려진 차이 (part_parser 모듈 설명): 다른 마커와 겹치는 BUTTON
+# - 블러 안에서 열린 BUTTON / 닫는 ']' 전에 [/CARDS]를 지나는 BUTTON
+KNOWN_DIFFERENCE = re.compile(r"\[블러:[^\]]*\[BUTTON:|\[BUTTON:[^\]]*\[/CARDS\]")
+
+
+def check_equivalence(rounds: int = 3000) -> None:
+    rng = random.Random(0)
+    samples = [DEFAULT_FAKE_TEXT * 3] + [
+        "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 25))) for _ in range(rounds)
+    ]
+    skipped = 0
+    for text in samples:
+        if KNOWN_DIFFERENCE.search(text):
+            skipped += 1
+            continue
+        expected = legacy_part_events([text])
+        for chunks in (chunked(text, 1), chunked(text, 2), random_chunks(text, rng), [text]):
+            assert legacy_part_events(chunks) == expected, (text, chunks)
+            events = parser_part_events(chunks)
+            assert legacy_fields(events) == expected, (text, chunks)
+            check_blurs(events)
+    print(f"[OK] 결과 동일: 응답 {len(samples) - skipped}개 × 토큰 분할 4가지")
+    print(f"     (다른 마커와 겹치는 BUTTON {skipped}개는 알려진 차이라 파트 비교 제외)")
+
+
+# ---------- 긴 응답 ----------
+
+def long_outputs() -> dict:
+    filler = "자네 사주를 펼치자마자 한숨이 나왔어. 아깝다는 한숨이야. [블러: 올해 가을] 조심하게.\n"
+    long_part = (filler * 7)[:560] + "\n\n[BUTTON: 계속]\n---\n"
+    return {
+        "8섹션": DEFAULT_FAKE_TEXT * 8,
+        "긴 섹션 (40파트)": long_part * 40,
+        "구분자 없는 20,000자": (filler * 400)[:20000] + "\n[BUTTON: 끝]",
+    }
+
+
+def main():
+    check_equivalence()
+
+    print("=" * 76)
+    print("파트 파서 벤치마크 (토큰 2글자, 응답 1개 처리 시간)")
+    print("=" * 76)
+    print(f"{'응답':<22}{'길이':>8}{'토큰':>8}{'legacy(ms)':>13}{'parser(ms)':>13}{'배속':>8}")
+
+    for name, text in long_outputs().items():
+        chunks = chunked(text, 2)
+        assert legacy_fields(parser_part_events(chunks)) == legacy_part_events(chunks), name
+        number = 20
+        old = timeit.timeit(lambda: legacy_part_events(chunks), number=number) / number
+        new = timeit.timeit(lambda: parser_part_events(chunks), number=number) / number
+        print(f"{name:<22}{len(text):>8}{len(chunks):>8}{old * 1e3:>13.2f}{new * 1e3:>13.2f}{old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
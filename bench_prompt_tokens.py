@@ -0,0 +1,100 @@
+"""
+섹션 프롬프트 입력 토큰 리포트 (prompts/*.yaml 의 section_prompts 전체, saju_data/default.json)
+
+섹션마다 시스템 + 유저 메시지의 입력 토큰을
+- pretty: 기존 표기 (saju_data indent=2, 목록 변수 str(list))
+- compact: yaml의 saju_data_format (compact 설정이 없는 파일은 drop 없는 compact로 계산)
+로 비교
+
+토큰 수:
+- 기본: 오프라인 추정 (한글/한자 1글자 = 1토큰, 그 외 글자 4개 = 1토큰, 공백 덩어리 1개 = 1토큰)
+- --api: Anthropic count_tokens API (ANTHROPIC_API_KEY 필요, 섹션마다 호출 2번)
+
+실행: python bench_prompt_tokens.py [--api]
+"""
+
+import os
+import re
+import sys
+import json
+from pathlib import Path
+
+import yaml
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench-dummy-key")
+
+from api_server import get_template_variables
+from prompt_data import PRETTY, SajuDataFormat
+from prompt_template import compile_section
+
+BASE_DIR = Path(__file__).parent
+PROMPTS_DIR = BASE_DIR / "prompts"
+SAJU_FILE = BASE_DIR / "saju_data" / "default.json"
+USER_NAME = "앤드류"
+
+_WIDE = re.compile(r"[ᄀ-ᇿ぀-ヿ㄰-㆏㐀-鿿가-힯豈-﫿]")
+_SPACE_RUN = re.compile(r"\s+")
+_WORD_RUN = re.compile(r"[^\s]+")
+
+
+def estimate_tokens(text: str) -> int:
+    """오프라인 토큰 추정 (절대값보다 pretty/compact 비교용)"""
+    wide = len(_WIDE.findall(text))
+    narrow = sum(len(_WIDE.sub("", word)) for word in _WORD_RUN.findall(text))
+    return wide + -(-narrow // 4) + len(_SPACE_RUN.findall(text))
+
+
+def api_counter():
+    """count_tokens API로 세는 함수 (시스템, 유저) → 토큰"""
+    from client import LLMClient
+
+    llm = LLMClient()  # 서버와 같은 모델
+
+    def count(system_prompt: str, user_message: str) -> int:
+        result = llm.client.messages.count_tokens(
+            model=llm.model,
+            system=system_prompt,
+            messages=[{"role": "user", "content": user_message}],
+        )
+        return result.input_tokens
+
+    return count
+
+
+def main():
+    use_api = "--api" in sys.argv[1:]
+    count = api_counter() if use_api else (lambda system, user: estimate_tokens(system) + estimate_tokens(user))
+    saju_data = json.loads(SAJU_FILE.read_text(encoding="utf-8"))
+
+    print("=" * 84)
+    print(f"섹션 프롬프트 입력 토큰 ({'count_tokens API' if use_api else '오프라인 추정'}, {SAJU_FILE.name})")
+    print("=" * 84)
+    print(f"{'파일':<24}{'섹션':<18}{'pretty':>9}{'compact':>9}{'감소':>8}{'saju_data 글자':>18}")
+
+    total_before = total_after = 0
+    for path in sorted(PROMPTS_DIR.glob("*.yaml")):
+        prompts = yaml.safe_load(path.read_text(encoding="utf-8"))
+        if not prompts.get("section_prompts"):
+            continue
+        configured = SajuDataFormat.from_prompts(prompts)
+        compact = configured if configured.compact else SajuDataFormat(style="compact")
+        label = path.stem + ("" if configured.compact else " *")
+        before_vars = get_template_variables(saju_data, USER_NAME, PRETTY)
+        after_vars = get_template_variables(saju_data, USER_NAME, compact)
+        data_sizes = f"{len(before_vars['saju_data'])}→{len(after_vars['saju_data'])}"
+
+        for section_name in prompts["section_prompts"]:
+            section = compile_section(prompts, section_name)
+            before = count(section.system_prompt, section.render_user(before_vars))
+            after = count(section.system_prompt, section.render_user(after_vars))
+            total_before += before
+            total_after += after
+            print(f"{label:<24}{section_name:<18}{before:>9}{after:>9}{(before - after) / before:>8.1%}{data_sizes:>18}")
+
+    print("-" * 84)
+    print(f"{'합계':<42}{total_before:>9}{total_after:>9}{(total_before - total_after) / total_before:>8.1%}")
+    print("* saju_data_format 설정이 없는 파일 (drop 없는 compact로 계산, 실제 요청은 pretty)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+섹션 프롬프트 렌더링 마이크로 벤치마크 (prompts/v10.0_v4.0.1.yaml 실제 섹션 사용)
+
+- replace:  기존 방식 ({common_system}/{common_data_template} 치환 + render_template 변수별 str.replace)
+- compiled: CompiledSection (버전마다 1회 컴파일, 요청마다 슬롯만 채움)
+
+실행: python bench_render_template.py
+"""
+
+import os
+import json
+import timeit
+from pathlib import Path
+
+import yaml
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench-dummy-key")
+
+from api_server import get_template_variables
+from prompt_template import compile_section
+
+BASE_DIR = Path(__file__).parent
+PROMPT_FILE = BASE_DIR / "prompts" / "v10.0_v4.0.1.yaml"
+SAJU_FILE = BASE_DIR / "saju_data" / "default.json"
+
+
+def render_template(template: str, variables: dict) -> str:
+    """api_server.render_template과 동일 (기준선)"""
+    result = template
+    for key, value in variables.items():
+        result = result.replace(f"{{{key}}}", str(value))
+    return result
+
+
+def prepare_replace(prompts: dict, section_name: str, variables: dict):
+    section_prompt = prompts["section_prompts"][section_name]
+    system_prompt = section_prompt.get("system", "").replace("{common_system}", prompts.get("common_system", ""))
+    user_message = section_prompt.get("user_template", "").replace(
+        "{common_data_template}", prompts.get("common_data_template", "")
+    )
+    user_message = render_template(user_message, variables)
+    return system_prompt, user_message
+
+
+def main():
+    prompts = yaml.safe_load(PROMPT_FILE.read_text(encoding="utf-8"))
+    saju_data = json.loads(SAJU_FILE.read_text(encoding="utf-8"))
+    variables = get_template_variables(saju_data, "앤드류")
+    number = 2000
+
+    print("=" * 72)
+    print(f"섹션 프롬프트 렌더링 벤치마크 ({PROMPT_FILE.name}, 변수 {len(variables)}개, {number}회 평균)")
+    print("=" * 72)
+    print(f"{'섹션':<14}{'replace(us)':>14}{'compiled(us)':>14}{'배속':>8}{'user 길이':>12}")
+
+    total_old = total_new = 0.0
+    for section_name in prompts["section_prompts"]:
+        compiled = compile_section(prompts, section_name)
+
+        # 결과 동일성 확인
+        expected = prepare_replace(prompts, section_name, variables)
+        assert (compiled.system_prompt, compiled.render_user(variables)) == expected, section_name
+
+        old = timeit.timeit(lambda: prepare_replace(prompts, section_name, variables), number=number) / number
+        new = timeit.timeit(lambda: (compiled.system_prompt, compiled.render_user(variables)), number=number) / number
+        total_old += old
+        total_new += new
+        print(f"{section_name:<14}{old * 1e6:>14.1f}{new * 1e6:>14.1f}{old / new:>7.1f}x{len(expected[1]):>12}")
+
+    print("-" * 72)
+    print(f"{'8섹션 합계':<14}{total_old * 1e6:>14.1f}{total_new * 1e6:>14.1f}{total_old / total_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+SSE 동시 스트림 수용량 벤치마크 (가짜 LLM 사용, 네트워크 호출 없음)
+
+POST /section-start로 세션 N개를 만든 뒤(측정 제외) GET /section-stream/{id}를
+N개 동시에 열고, 모든 스트림이 끝나는 시간(wall)이 단일 스트림 시간의 1.5배 이내인
+가장 큰 N을 "최대 동시 스트림"으로 기록
+- executor: 수정 전 방식 재현 (토큰마다 run_in_executor, 스트림마다 스레드 점유)
+- async:    llm_token_stream / LLMClient.astream 기반 (현재 방식)
+
+실행: python bench_stream_capacity.py
+"""
+
+import os
+import io
+import json
+import time
+import asyncio
+import contextlib
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench-dummy-key")
+
+import httpx
+
+import api_server
+from fake_llm import FakeLLMClient
+
+SAJU_DATA = json.loads((api_server.BASE_DIR / "saju_data" / "default.json").read_text(encoding="utf-8"))
+
+CHUNKS_PER_STREAM = 50
+TOKEN_DELAY = 0.02  # 스트림 1개 ≈ 1초
+LEVELS = [8, 16, 32, 64, 128, 256, 512, 1024]
+
+
+class ExecutorHopLLMClient(FakeLLMClient):
+    """수정 전 방식: 동기 스트림을 토큰마다 기본 스레드풀에서 next() 호출"""
+
+    async def astream(self, system_prompt: str, user_message: str, conversation_history: list = None,
+                      system_suffix: str = None, usage=None, generation=None, prefill=None, raise_errors=False):
+        loop = asyncio.get_running_loop()
+        stream_iter = iter(self.stream(system_prompt, user_message))
+        end = object()
+        while True:
+            chunk = await loop.run_in_executor(None, next, stream_iter, end)
+            if chunk is end:
+                break
+            yield chunk
+
+
+async def run_level(n: int) -> float:
+    transport = httpx.ASGITransport(app=api_server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        stream_ids = []
+        for _ in range(n):
+            response = await client.post(
+                "/section-start",
+                json={"section_name": "first-impression", "user_name": "앤드류", "saju_data": SAJU_DATA},
+            )
+            stream_ids.append(response.json()["stream_id"])
+
+        async def one(stream_id: str):
+            response = await client.get(f"/section-stream/{stream_id}")
+            assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(stream_id) for stream_id in stream_ids))
+        return time.perf_counter() - start
+
+
+def main():
+    single = CHUNKS_PER_STREAM * TOKEN_DELAY
+    print("=" * 60)
+    print(f"동시 스트림 수용량 벤치마크 (스트림 1개 ≈ {single:.1f}s, CPU {os.cpu_count()}코어)")
+    print(f"기본 스레드풀 크기: {min(32, (os.cpu_count() or 1) + 4)}")
+    print("=" * 60)
+
+    # 스트림마다 LLM을 실제로 호출하도록 (풀이 캐시 / 동일 생성 합치기 / 캐스케이드 끔)
+    api_server.reading_cache = None
+    api_server.single_flight = None
+    api_server.model_cascade = None
+
+    for label, fake_cls in (("executor", ExecutorHopLLMClient), ("async", FakeLLMClient)):
+        api_server.llm_client = fake_cls(text="가" * (CHUNKS_PER_STREAM * 3), chunk_size=3, token_delay=TOKEN_DELAY)
+        best = 0
+        print(f"\n[{label}]")
+        for n in LEVELS:
+            with contextlib.redirect_stdout(io.StringIO()):
+                wall = asyncio.run(run_level(n))
+            ok = wall <= single * 1.5
+            print(f"  - 동시 {n:5d}개: {wall:6.2f}s {'OK' if ok else '직렬화/포화'}")
+            if not ok:
+                break
+            best = n
+        print(f"  => 최대 동시 스트림: {best}개")
+
+
+if __name__ == "__main__":
+    main()
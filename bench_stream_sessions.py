@@ -0,0 +1,131 @@
+"""
+/section-start 세션 메모리 벤치마크 (대기 세션 10,000개, tracemalloc)
+
+- rendered: 수정 전 방식 재현 (세션마다 렌더링된 system/user 프롬프트 저장)
+- inputs:   입력만 저장 + saju_data는 사람당 1번 (memory 백엔드는 compact JSON 문자열)
+- saju_id:  입력 + 무료 사주 ID만 저장 (saju_data는 GET 때 DB에서, /section-start에 saju_id를 보낸 경우)
+
+시나리오
+- 8섹션: 1,250명이 섹션 8개씩 세션 생성 (병렬 결과 페이지)
+- 1섹션: 10,000명이 섹션 1개씩 (saju_data 공유 없음, 최악)
+
+메모리(프로세스 내) + 직렬화 크기(postgres 백엔드의 행 크기) 비교
+
+실행: python bench_stream_sessions.py
+"""
+
+import os
+import json
+import copy
+import time
+import asyncio
+import tracemalloc
+import datetime as dt
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench-dummy-key")
+
+import api_server
+from cache_backends import MemoryCacheBackend
+from stream_sessions import StreamSessionStore
+
+SAJU_DATA = json.loads((api_server.BASE_DIR / "saju_data" / "default.json").read_text(encoding="utf-8"))
+VARIANT = "v4.1"
+SESSIONS = 10_000
+
+
+def make_users(count: int) -> list:
+    """사람마다 다른 saju_data (이름만 다름 → 해시도 다름)"""
+    users = []
+    for i in range(count):
+        saju_data = copy.deepcopy(SAJU_DATA)
+        saju_data["meta"]["이름"] = f"사용자{i}"
+        users.append((f"사용자{i}", saju_data))
+    return users
+
+
+def section_names() -> list:
+    return list(api_server.load_prompts_by_variant(VARIANT)["section_prompts"])
+
+
+async def create_rendered(backend, user_name: str, saju_data: dict, section_name: str) -> None:
+    """수정 전 start_section_stream 의 세션 내용"""
+    section = api_server.load_section_by_variant(VARIANT, section_name)
+    timestamp = dt.datetime.now().isoformat()
+    session = {
+        "section_name": section_name,
+        "system_prompt": section.system_prompt,
+        "system_suffix": f"[Internal timestamp: {timestamp}]",
+        "user_message": section.render_user(api_server.get_template_variables(saju_data, user_name)),
+        "cache_key": api_server.section_reading_key(section, saju_data, user_name),
+        "created_at": timestamp
+    }
+    await backend.set(os.urandom(8).hex(), session)
+
+
+async def create_inputs(store: StreamSessionStore, user_name: str, saju_data: dict, section_name: str,
+                        saju_id=None) -> None:
+    """현재 start_section_stream 의 세션 내용 (saju_id가 있으면 saju_data 대신 ID)"""
+    section = api_server.load_section_by_variant(VARIANT, section_name)
+    await store.create({
+        "variant": VARIANT,
+        "section_name": section_name,
+        "prompt_version": section.version,
+        "user_name": user_name,
+        "created_at": time.time()
+    }, None if saju_id is not None else saju_data, saju_id=saju_id)
+
+
+async def measure(mode: str, users: list, sections: list) -> tuple:
+    """세션 SESSIONS개 생성 → (세션당 메모리 바이트, 세션당 직렬화 바이트)"""
+    backend = MemoryCacheBackend(max_entries=SESSIONS, ttl=3600)
+    payload_backend = MemoryCacheBackend(max_entries=SESSIONS, ttl=3600)
+    store = StreamSessionStore(backend, payload_backend)
+    jobs = [
+        (i, user_name, saju_data, section_name)
+        for i, (user_name, saju_data) in enumerate(users) for section_name in sections
+    ]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for saju_id, user_name, saju_data, section_name in jobs:
+        saju_data = copy.deepcopy(saju_data)  # 요청 본문 파싱 (저장하지 않으면 바로 해제)
+        if mode == "rendered":
+            await create_rendered(backend, user_name, saju_data, section_name)
+        else:
+            await create_inputs(store, user_name, saju_data, section_name, saju_id if mode == "saju_id" else None)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    values = [value for _, value in backend._data.values()] + [value for _, value in payload_backend._data.values()]
+    # memory 백엔드의 saju_data는 이미 JSON 문자열 (postgres 행에는 같은 내용이 JSONB로)
+    serialized = sum(
+        len((value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)).encode("utf-8"))
+        for value in values
+    )
+    return (after - before) / len(jobs), serialized / len(jobs)
+
+
+async def main():
+    sections = section_names()
+    scenarios = [
+        (f"{len(sections)}섹션", make_users(SESSIONS // len(sections)), sections),
+        ("1섹션", make_users(SESSIONS), sections[:1]),
+    ]
+
+    # 컴파일/캐시 워밍업 (측정 제외)
+    await measure("rendered", scenarios[0][1][:1], sections)
+    await measure("inputs", scenarios[0][1][:1], sections)
+    await measure("saju_id", scenarios[0][1][:1], sections)
+
+    print("=" * 72)
+    print(f"대기 세션 {SESSIONS:,}개 메모리 ({VARIANT}, saju_data {len(json.dumps(SAJU_DATA, ensure_ascii=False))}자)")
+    print("=" * 72)
+    print(f"{'시나리오':<10}{'방식':<10}{'메모리/세션':>14}{'합계(MB)':>12}{'직렬화/세션':>14}")
+    for label, users, scenario_sections in scenarios:
+        for mode in ("rendered", "inputs", "saju_id"):
+            memory, serialized = await measure(mode, users, scenario_sections)
+            print(f"{label:<10}{mode:<10}{memory:>12,.0f} B{memory * SESSIONS / 1e6:>12.1f}{serialized:>12,.0f} B")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+"""
+토큰 합치기 벤치마크 (가짜 LLM, 네트워크 호출 없음)
+
+POST /api/v2/section-stream-v5 를 N개 동시에 ASGI로 직접 호출해서 (전송 프레임마다 시각 기록)
+- 프레임 수 / 전송 바이트 (스트림 1개)
+- 초당 프레임 (전체)
+- CPU 시간 (프로세스, 스트림 1개당)
+- TTFT: 요청 → 첫 token 프레임 (합치기 켜도 그대로여야 함)
+를 합치기 끔(TOKEN_COALESCE_WINDOW_MS=0) / 켬(40ms)으로 비교
+
+가짜 LLM: 한국어 응답 ~1,100자를 2글자 토큰으로 (토큰 간격 10ms ≈ 초당 100토큰)
+스트림마다 user_name이 달라서 동일 생성 합치기(single flight)는 일어나지 않음
+
+실행: python bench_token_coalescing.py
+"""
+
+import os
+import io
+import json
+import time
+import asyncio
+import contextlib
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench-dummy-key")
+
+import api_server
+from fake_llm import FakeLLMClient, DEFAULT_FAKE_TEXT
+from token_coalescer import TokenCoalescer
+
+SAJU_DATA = json.loads((api_server.BASE_DIR / "saju_data" / "default.json").read_text(encoding="utf-8"))
+
+TEXT = DEFAULT_FAKE_TEXT * 4
+CHUNK_SIZE = 2
+TOKEN_DELAY = 0.01
+STREAMS = 200
+SETTINGS = [("끔 (토큰마다)", 0), ("켬 40ms", 40)]
+
+
+async def one_stream(index: int) -> dict:
+    body = json.dumps({
+        "section_name": "first-impression",
+        "user_name": f"벤치{index}",
+        "saju_data": SAJU_DATA,
+    }).encode()
+    body_sent = False
+    done = asyncio.Event()
+    result = {"frames": 0, "bytes": 0, "ttft": None}
+    start = time.perf_counter()
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            if chunk.startswith(b"event: token"):
+                result["frames"] += 1
+                if result["ttft"] is None:
+                    result["ttft"] = time.perf_counter() - start
+            result["bytes"] += len(chunk)
+            if not message.get("more_body", False):
+                done.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/api/v2/section-stream-v5", "raw_path": b"/api/v2/section-stream-v5",
+        "root_path": "", "query_string": b"", "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+    await api_server.app(scope, receive, send)
+    return result
+
+
+async def run(streams: int) -> tuple:
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    results = await asyncio.gather(*(one_stream(i) for i in range(streams)))
+    return results, time.process_time() - cpu, time.perf_counter() - wall
+
+
+def main():
+    api_server.reading_cache = None  # 캐시 재생 대신 매번 LLM 스트림
+    api_server.llm_client = FakeLLMClient(TEXT, chunk_size=CHUNK_SIZE, token_delay=TOKEN_DELAY)
+    tokens = -(-len(TEXT) // CHUNK_SIZE)
+
+    print("=" * 84)
+    print(f"토큰 합치기 벤치마크 (동시 {STREAMS}개, 스트림당 {len(TEXT)}자 / {tokens}토큰, 토큰 간격 {TOKEN_DELAY * 1000:.0f}ms)")
+    print("=" * 84)
+    print(f"{'설정':<16}{'프레임/스트림':>12}{'KB/스트림':>11}{'프레임/초':>11}{'CPU ms/스트림':>15}{'TTFT p50 ms':>13}")
+
+    for label, window_ms in SETTINGS:
+        api_server.token_coalescer = TokenCoalescer(window=window_ms / 1000)
+        with contextlib.redirect_stdout(io.StringIO()):
+            asyncio.run(run(4))  # 워밍업
+            results, cpu, wall = asyncio.run(run(STREAMS))
+        frames = sum(r["frames"] for r in results)
+        ttfts = sorted(r["ttft"] for r in results)
+        print(
+            f"{label:<16}{frames / STREAMS:>12.0f}{sum(r['bytes'] for r in results) / STREAMS / 1024:>11.1f}"
+            f"{frames / wall:>11.0f}{cpu / STREAMS * 1000:>15.2f}{ttfts[len(ttfts) // 2] * 1000:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
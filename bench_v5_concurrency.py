@@ -0,0 +1,91 @@
+"""
+/api/v2/section-stream-v5 동시성 벤치마크 (가짜 LLM 사용, 네트워크 호출 없음)
+
+N개의 v5 스트림을 동시에 열고 전체 소요 시간과 스트리밍 중 /health 응답 시간을 측정
+- blocking: 수정 전 동작 재현 (동기 스트림이 이벤트 루프를 막음)
+- async:    LLMClient.astream 기반 (현재 동작)
+
+실행: python bench_v5_concurrency.py [N]
+"""
+
+import os
+import sys
+import io
+import json
+import time
+import asyncio
+import contextlib
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench-dummy-key")
+
+import httpx
+
+import api_server
+from fake_llm import FakeLLMClient, BlockingFakeLLMClient
+
+SAJU_DATA = json.loads((api_server.BASE_DIR / "saju_data" / "default.json").read_text(encoding="utf-8"))
+
+
+async def run_v5_stream(client: httpx.AsyncClient) -> float:
+    start = time.perf_counter()
+    response = await client.post(
+        "/api/v2/section-stream-v5",
+        json={"section_name": "first-impression", "user_name": "앤드류", "saju_data": SAJU_DATA},
+    )
+    assert response.status_code == 200, response.text
+    assert "event: done" in response.text
+    return time.perf_counter() - start
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, samples: list):
+    """20ms마다 /health 호출 - 한 주기(대기+응답)가 얼마나 늘어지는지 기록"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.02)
+        await client.get("/health")
+        samples.append(time.perf_counter() - start - 0.02)
+
+
+async def run_scenario(fake_client, n: int):
+    api_server.llm_client = fake_client
+    transport = httpx.ASGITransport(app=api_server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        stop = asyncio.Event()
+        health_samples: list = []
+        prober = asyncio.create_task(probe_health(client, stop, health_samples))
+        await asyncio.sleep(0)
+
+        start = time.perf_counter()
+        durations = await asyncio.gather(*(run_v5_stream(client) for _ in range(n)))
+        wall = time.perf_counter() - start
+
+        stop.set()
+        await prober
+    return wall, durations, health_samples
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    token_delay = 0.005
+
+    print("=" * 60)
+    print(f"v5 동시성 벤치마크: 동시 스트림 {n}개, 토큰 지연 {token_delay * 1000:.0f}ms")
+    print("=" * 60)
+
+    for label, fake_cls in (("blocking", BlockingFakeLLMClient), ("async", FakeLLMClient)):
+        fake = fake_cls(token_delay=token_delay)
+        single = len(range(0, len(fake.text), fake.chunk_size)) * token_delay
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            wall, durations, health = asyncio.run(run_scenario(fake, n))
+
+        worst_health = max(health) if health else float("nan")
+        print(f"\n[{label}]")
+        print(f"  - 단일 스트림 이론값: {single:.2f}s")
+        print(f"  - 전체 소요(wall):    {wall:.2f}s  (직렬화 시 ≈ {single * n:.2f}s)")
+        print(f"  - 스트림당 평균:      {sum(durations) / len(durations):.2f}s")
+        print(f"  - /health 최대 지연:  {worst_health * 1000:.0f}ms ({len(health)}회 측정, 루프 정지 시간 포함)")
+
+
+if __name__ == "__main__":
+    main()
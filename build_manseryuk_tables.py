@@ -0,0 +1,169 @@
+"""
+만세력 테이블 생성 (manseryuk_data/*.bin)
+
+로컬 만세력 엔진(manseryuk_engine.py)이 쓰는 사전 계산 테이블을 만든다.
+- solar_terms.bin:        24절기 시각 (UTC unix 초, int64) - 연도마다 소한 → 동지 순 24개
+- lunar_month_starts.bin: 음력 월 시작일 (KST 날짜 ordinal, int32)
+- lunar_month_codes.bin:  음력 월 코드 (int32, 연도*100 + 월, 윤달이면 +50)
+
+천체 위치 계산에 ephem(VSOP87)을 쓰므로 테이블을 다시 만들 때만 필요:
+    pip install ephem
+    python build_manseryuk_tables.py
+
+음력 규칙 (한국천문연구원 방식)
+- 합삭(신월)이 든 날(KST, 1912년 이전은 UTC+8)이 그 달의 1일
+- 동지가 든 달이 11월
+- 동지~다음 동지 사이에 13개월이면 중기가 없는 첫 달이 윤달
+"""
+
+import math
+import sys
+from array import array
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from manseryuk_tables import (
+    DATA_DIR,
+    KST,
+    SOLAR_TERMS_FILE,
+    LUNAR_STARTS_FILE,
+    LUNAR_CODES_FILE,
+    TABLE_START_YEAR,
+    TABLE_END_YEAR,
+    term_longitude,
+)
+
+TROPICAL_YEAR = 365.2422
+
+# 1912년 이전 음력은 동경 120도(UTC+8) 기준 (한국천문연구원 음양력 자료와 일치)
+LUNAR_TZ_BEFORE_1912 = timezone(timedelta(hours=8))
+
+
+def _ephem():
+    try:
+        import ephem
+    except ImportError:
+        sys.exit("[ERROR] ephem이 필요합니다: pip install ephem")
+    return ephem
+
+
+def _sun_longitude(ephem, date) -> float:
+    """태양 겉보기 황경 (라디안, 날짜 춘분점 기준)"""
+    sun = ephem.Sun()
+    sun.compute(date, epoch=date)
+    equatorial = ephem.Equatorial(sun.g_ra, sun.g_dec, epoch=date)
+    return float(ephem.Ecliptic(equatorial, epoch=date).lon)
+
+
+def _solar_term(ephem, longitude_deg: float, guess) -> float:
+    """태양 황경이 longitude_deg가 되는 시각 (ephem Date, 뉴턴 반복)"""
+    target = math.radians(longitude_deg)
+    date = ephem.Date(guess)
+    for _ in range(50):
+        diff = (_sun_longitude(ephem, date) - target + math.pi) % (2 * math.pi) - math.pi
+        date = ephem.Date(date - diff / (2 * math.pi) * TROPICAL_YEAR)
+        if abs(diff) < 1e-9:
+            break
+    return date
+
+
+def _unix(ephem, date) -> int:
+    return round(ephem.Date(date).datetime().replace(tzinfo=timezone.utc).timestamp())
+
+
+def _kst_ordinal(unix_seconds: int) -> int:
+    """음력 날짜 기준 시간대의 날짜 ordinal (1912년 이전은 동경 120도)"""
+    day = datetime.fromtimestamp(unix_seconds, KST)
+    if day.year < 1912:
+        day = datetime.fromtimestamp(unix_seconds, LUNAR_TZ_BEFORE_1912)
+    return day.date().toordinal()
+
+
+def build_solar_terms(ephem) -> array:
+    terms = array("q")
+    for year in range(TABLE_START_YEAR, TABLE_END_YEAR + 1):
+        for index in range(24):
+            # 소한(1월 6일 전후)부터 15일 간격
+            guess = ephem.Date(f"{year}/1/6") + index * TROPICAL_YEAR / 24
+            terms.append(_unix(ephem, _solar_term(ephem, term_longitude(index), guess)))
+    return terms
+
+
+def build_lunar_months(ephem, terms: array) -> tuple:
+    # 합삭일 (KST 날짜)
+    new_moons = []
+    date = ephem.Date(f"{TABLE_START_YEAR - 1}/11/1")
+    end = ephem.Date(f"{TABLE_END_YEAR + 1}/2/1")
+    while date < end:
+        date = ephem.next_new_moon(date)
+        new_moons.append(_kst_ordinal(_unix(ephem, date)))
+        date = ephem.Date(date + 1)
+
+    # 중기(황경 30° 배수) 날짜 → 중기가 든 달 표시, 동지 든 달 위치
+    has_principal = [False] * len(new_moons)
+    solstice_months = []
+    for i, unix_seconds in enumerate(terms):
+        if (i % 24) % 2 == 0:
+            continue  # 홀수 인덱스(대한, 우수, 춘분 ...)가 중기
+        day = _kst_ordinal(unix_seconds)
+        month = _month_index(new_moons, day)
+        if month is None:
+            continue
+        has_principal[month] = True
+        if i % 24 == 23:
+            solstice_months.append(month)
+
+    starts = array("i")
+    codes = array("i")
+    for first, second in zip(solstice_months, solstice_months[1:]):
+        lunar_year = datetime.fromordinal(new_moons[second]).year  # 다음 동지 달이 속한 해
+        leap_pending = second - first == 13
+        month = 11
+        year = lunar_year - 1
+        for index in range(first, second):
+            leap = False
+            if index != first and leap_pending and not has_principal[index]:
+                leap = True
+                leap_pending = False
+            elif index != first:
+                month = month % 12 + 1
+                if month == 1:
+                    year = lunar_year
+            starts.append(new_moons[index])
+            codes.append(year * 100 + month + (50 if leap else 0))
+    return starts, codes
+
+
+def _month_index(new_moons: list, day: int):
+    lo, hi = 0, len(new_moons) - 1
+    if day < new_moons[0] or day >= new_moons[-1]:
+        return None
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if new_moons[mid] <= day:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def main() -> None:
+    ephem = _ephem()
+    DATA_DIR.mkdir(exist_ok=True)
+
+    print(f"[INFO] 24절기 계산: {TABLE_START_YEAR}~{TABLE_END_YEAR}")
+    terms = build_solar_terms(ephem)
+    print("[INFO] 음력 월 계산")
+    starts, codes = build_lunar_months(ephem, terms)
+
+    for path, values in ((SOLAR_TERMS_FILE, terms), (LUNAR_STARTS_FILE, starts), (LUNAR_CODES_FILE, codes)):
+        if sys.byteorder != "little":
+            values = array(values.typecode, values)
+            values.byteswap()
+        with open(path, "wb") as f:
+            values.tofile(f)
+        print(f"[OK] {Path(path).name}: {len(values)}개")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+키-값 캐시 백엔드 (TTL + 최대 개수)
+- MemoryCacheBackend: 프로세스 내 OrderedDict LRU
+- PostgresCacheBackend: Supabase 테이블 (워커/재시작 간 공유)
+- TieredCacheBackend: 메모리 앞단 + Postgres 뒷단 2단 구성
+
+두 백엔드 모두 같은 async 인터페이스 (get / set / pop / delete / purge)
+값은 JSON 직렬화 가능한 객체만 저장
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import asyncpg
+
+
+class MemoryCacheBackend:
+    """프로세스 내 TTL + LRU 캐시"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()  # key → (expires_at, value)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get(self, key: str) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)  # 가장 오래 안 쓴 항목 제거
+
+    async def pop(self, key: str) -> Optional[Any]:
+        """조회 후 삭제 (1회용 값)"""
+        item = self._data.pop(key, None)
+        if item is None or item[0] <= time.monotonic():
+            return None
+        return item[1]
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def purge(self) -> int:
+        """만료 항목 정리 → 삭제 개수"""
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._data.items() if expires_at <= now]
+        for key in expired:
+            del self._data[key]
+        return len(expired)
+
+
+class PostgresCacheBackend:
+    """
+    Postgres 테이블 캐시 (cache_key TEXT PK, value JSONB, accessed_at, expires_at)
+    - 테이블은 supabase/migrations 에서 생성
+    - 풀은 서버 startup 이후에 생기므로 getter로 받음
+    - 풀에 json_codec.register_json_codecs가 등록되어 있어야 함 (값을 그대로 넘기고 그대로 받음)
+    """
+
+    name = "postgres"
+
+    def __init__(
+        self,
+        pool_getter: Callable[[], Optional[asyncpg.Pool]],
+        table: str,
+        max_entries: int = 100000,
+        ttl: float = 3600.0,
+    ):
+        self._pool_getter = pool_getter
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+    def _pool(self) -> asyncpg.Pool:
+        pool = self._pool_getter()
+        if not pool:
+            raise Exception("DB pool not initialized")
+        return pool
+
+    async def get(self, key: str) -> Optional[Any]:
+        async with self._pool().acquire() as conn:
+            row = await conn.fetchrow(
+                f"""
+                UPDATE {self.table}
+                SET accessed_at = NOW()
+                WHERE cache_key = $1 AND expires_at > NOW()
+                RETURNING value
+                """,
+                key
+            )
+        return row['value'] if row else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        async with self._pool().acquire() as conn:
+            await conn.execute(
+                f"""
+                INSERT INTO {self.table} (cache_key, value, accessed_at, expires_at)
+                VALUES ($1, $2::jsonb, NOW(), NOW() + make_interval(secs => $3))
+                ON CONFLICT (cache_key) DO UPDATE
+                SET value = EXCLUDED.value, accessed_at = NOW(), expires_at = EXCLUDED.expires_at
+                """,
+                key,
+                value,
+                float(ttl or self.ttl)
+            )
+
+    async def pop(self, key: str) -> Optional[Any]:
+        """조회 후 삭제 (여러 워커가 동시에 pop해도 1곳만 값을 받음)"""
+        async with self._pool().acquire() as conn:
+            row = await conn.fetchrow(
+                f"""
+                DELETE FROM {self.table}
+                WHERE cache_key = $1 AND expires_at > NOW()
+                RETURNING value
+                """,
+                key
+            )
+        return row['value'] if row else None
+
+    async def delete(self, key: str) -> None:
+        async with self._pool().acquire() as conn:
+            await conn.execute(f"DELETE FROM {self.table} WHERE cache_key = $1", key)
+
+    async def purge(self) -> int:
+        """만료 항목 + 최대 개수 초과분(오래 안 쓴 순) 정리 → 삭제 개수"""
+        async with self._pool().acquire() as conn:
+            expired = await conn.fetchval(
+                f"""
+                WITH deleted AS (
+                    DELETE FROM {self.table} WHERE expires_at <= NOW() RETURNING 1
+                )
+                SELECT COUNT(*) FROM deleted
+                """
+            )
+            evicted = await conn.fetchval(
+                f"""
+                WITH deleted AS (
+                    DELETE FROM {self.table}
+                    WHERE cache_key IN (
+                        SELECT cache_key FROM {self.table}
+                        ORDER BY accessed_at DESC
+                        OFFSET $1
+                    )
+                    RETURNING 1
+                )
+                SELECT COUNT(*) FROM deleted
+                """,
+                self.max_entries
+            )
+        return expired + evicted
+
+
+class TieredCacheBackend:
+    """
+    2단 캐시 (앞단 hit이면 뒷단을 건드리지 않음)
+    - get: 앞단 → 뒷단 (뒷단 hit이면 앞단에 채움)
+    - set: 앞단 먼저 저장 → 뒷단 장애가 나도 이 프로세스에서는 재사용됨
+    """
+
+    def __init__(self, front, back):
+        self.front = front
+        self.back = back
+        self.name = f"{front.name}+{back.name}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.front.get(key)
+        if value is not None:
+            return value
+        value = await self.back.get(key)
+        if value is not None:
+            await self.front.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self.front.set(key, value, ttl)
+        await self.back.set(key, value, ttl)
+
+    async def pop(self, key: str) -> Optional[Any]:
+        front_value = await self.front.pop(key)
+        back_value = await self.back.pop(key)
+        return front_value if front_value is not None else back_value
+
+    async def delete(self, key: str) -> None:
+        await self.front.delete(key)
+        await self.back.delete(key)
+
+    async def purge(self) -> int:
+        return await self.front.purge() + await self.back.purge()
+
+
+def create_cache_backend(
+    kind: str,
+    pool_getter: Callable[[], Optional[asyncpg.Pool]],
+    table: str,
+    max_entries: int,
+    ttl: float,
+    memory_max_entries: Optional[int] = None,
+):
+    """
+    환경 변수 값("memory" / "postgres" / "tiered")으로 백엔드 생성
+
+    memory_max_entries: tiered의 메모리 앞단 크기 (None이면 max_entries)
+    """
+    if kind == "postgres":
+        return PostgresCacheBackend(pool_getter, table, max_entries=max_entries, ttl=ttl)
+    if kind == "tiered":
+        return TieredCacheBackend(
+            MemoryCacheBackend(max_entries=memory_max_entries or max_entries, ttl=ttl),
+            PostgresCacheBackend(pool_getter, table, max_entries=max_entries, ttl=ttl),
+        )
+    if kind != "memory":
+        print(f"[WARN] Unknown cache backend '{kind}', falling back to memory")
+    return MemoryCacheBackend(max_entries=max_entries, ttl=ttl)
@@ -0,0 +1,108 @@
+"""
+모델 캐스케이드 (섹션 파트 0은 빠른 모델, 나머지는 메인 모델)
+
+첫 파트 지연(TTFT + 파트 0 완료 시간)이 랜딩 전환율을 좌우 → yaml generation.cascade_model이 있는 섹션은
+1. 빠른 모델(cascade_model)이 파트 0만 씀 (stop_sequences=["---"] → 첫 구분자에서 멈춤)
+2. 그동안 메인 모델 프롬프트 캐시를 미리 씀 (LLMClient.aprime, max_tokens=1)
+3. 파트 0이 끝나면 메인 모델이 "파트 0 + ---"를 assistant prefill로 받아 이어 씀
+→ 두 스트림을 이어 붙인 토큰 시퀀스 1개 (파트 파서 / 풀이 캐시 / 동일 생성 합치기는 구분하지 않음)
+
+- 빠른 모델 오류: 그때까지 나온 텍스트를 prefill로 메인 모델이 이어 씀 (나온 텍스트가 없으면 처음부터)
+- 빠른 모델이 구분자 없이 끝남 (파트 1개짜리 응답): 메인 모델 호출 없음
+- usage는 두 호출 합계
+- 스트림이 닫히면(클라이언트 끊김) 진행 중인 호출과 캐시 준비 요청도 닫음
+"""
+
+import asyncio
+from dataclasses import replace
+from typing import AsyncIterator, Optional
+
+from client import StreamUsage
+from part_parser import PART_SEPARATOR
+from prompt_template import GenerationConfig
+from sse_streams import aclosing
+
+
+class ModelCascade:
+    """캐스케이드 스트림 + 집계 (/health)"""
+
+    def __init__(self):
+        self.started = 0
+        self.continued = 0  # 파트 0 뒤를 메인 모델이 이어 씀
+        self.fast_only = 0  # 빠른 모델 응답에 구분자 없음 → 그대로 끝
+        self.fallbacks = 0  # 빠른 모델 오류 → 메인 모델
+
+    async def _prime(self, client, system_prompt: str, user_message: str, system_suffix: Optional[str],
+                     generation: GenerationConfig) -> None:
+        try:
+            await client.aprime(system_prompt, user_message, system_suffix=system_suffix, generation=generation)
+        except Exception as e:
+            print(f"[WARN] cascade prime failed: {e}")
+
+    async def stream(
+        self,
+        client,
+        system_prompt: str,
+        user_message: str,
+        system_suffix: Optional[str] = None,
+        usage: Optional[StreamUsage] = None,
+        generation: Optional[GenerationConfig] = None,
+        raise_errors: bool = False,
+    ) -> AsyncIterator[str]:
+        """빠른 모델 파트 0 → 메인 모델 이어쓰기 (generation.cascade_model 필수, raise_errors는 메인 모델 단계에 적용)"""
+        self.started += 1
+        fast = replace(generation, model=generation.cascade_model, stop_sequences=(PART_SEPARATOR,))
+        main = replace(generation, cascade_model=None)
+        fast_usage = StreamUsage()
+        main_usage = StreamUsage()
+        prime = asyncio.create_task(self._prime(client, system_prompt, user_message, system_suffix, main))
+        head = []
+
+        try:
+            try:
+                fast_tokens = client.astream(
+                    system_prompt, user_message, system_suffix=system_suffix, usage=fast_usage,
+                    generation=fast, raise_errors=True
+                )
+                async with aclosing(fast_tokens) as tokens:
+                    async for chunk in tokens:
+                        head.append(chunk)
+                        yield chunk
+                if not "".join(head).rstrip().endswith(PART_SEPARATOR):
+                    self.fast_only += 1
+                    return
+                self.continued += 1
+            except Exception as e:
+                self.fallbacks += 1
+                print(f"[WARN] cascade fast model failed after {len(head)} chunks, main model continues: {e}")
+
+            prefill = "".join(head)
+            # prefill은 끝 공백을 떼고 보내므로 이어쓰기가 공백으로 시작하면 이미 내보낸 공백과 겹침
+            skip_space = prefill != prefill.rstrip()
+            main_tokens = client.astream(
+                system_prompt, user_message, system_suffix=system_suffix, usage=main_usage,
+                generation=main, prefill=prefill or None, raise_errors=raise_errors
+            )
+            async with aclosing(main_tokens) as tokens:
+                async for chunk in tokens:
+                    if skip_space:
+                        chunk = chunk.lstrip()
+                        if not chunk:
+                            continue
+                        skip_space = False
+                    yield chunk
+        finally:
+            if not prime.done():
+                prime.cancel()
+            await asyncio.gather(prime, return_exceptions=True)
+            if usage is not None:
+                usage.add(fast_usage)
+                usage.add(main_usage)
+
+    def stats(self) -> dict:
+        return {
+            "started": self.started,
+            "continued": self.continued,
+            "fast_only": self.fast_only,
+            "fallbacks": self.fallbacks,
+        }
@@ -22,19 +22,104 @@ class LLMResponse:
     output_tokens: Optional[int] = None
 
 
+@dataclass
+class StreamUsage:
+    """스트리밍 호출 토큰 사용량 (프롬프트 캐시 포함) - 호출마다 새로 만들어 전달"""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    stop_reason: Optional[str] = None  # "end_turn" / "stop_sequence" / "max_tokens" (잘린 응답 구분용)
+
+    def update_from(self, usage) -> None:
+        """SDK usage 객체에서 값 복사 (필드가 없는 SDK 버전은 0 유지)"""
+        for name in ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"):
+            value = getattr(usage, name, None)
+            if value is not None:
+                setattr(self, name, value)
+
+    def add(self, other: "StreamUsage") -> None:
+        """다른 호출의 사용량을 더함 (한 섹션을 여러 호출로 만든 경우)"""
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.cache_creation_input_tokens += other.cache_creation_input_tokens
+        self.cache_read_input_tokens += other.cache_read_input_tokens
+        if other.stop_reason is not None:
+            self.stop_reason = other.stop_reason  # 마지막 호출 기준 (캐스케이드는 메인 모델)
+
+    def to_dict(self) -> dict:
+        return {
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_creation_input_tokens": self.cache_creation_input_tokens,
+            "cache_read_input_tokens": self.cache_read_input_tokens,
+        }
+
+
 class LLMClient:
     """Claude API 클라이언트"""
 
+    supports_prefill = True  # astream(prefill=...) 이어쓰기 (provider_router가 확인)
+
     def __init__(self, api_key: str = None):
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         self.client = anthropic.Anthropic(api_key=self.api_key)
+        self.async_client = anthropic.AsyncAnthropic(api_key=self.api_key)
         self.model = "claude-sonnet-4-20250514"
         self.max_tokens = 64000
+        # system_prompt(공통 / 섹션 시스템 블록)를 프롬프트 캐시 대상으로 표시
+        self.prompt_cache = os.getenv("ANTHROPIC_PROMPT_CACHE", "1") != "0"
         self.last_response_time = 0.0
         self.last_input_tokens = 0
         self.last_output_tokens = 0
 
-    def call(self, system_prompt: str, user_message: str, conversation_history: list = None) -> str:
+    def _system(self, system_prompt, system_suffix: Optional[str] = None):
+        """
+        system 파라미터 구성
+
+        system_prompt: 문자열 또는 고정 블록 튜플 (CompiledSection.system_blocks: 공통 system, 섹션 system)
+        고정 블록마다 cache_control breakpoint → 공통 system은 모든 섹션이 같은 캐시 항목을 읽음
+        (breakpoint는 요청당 최대 4개: 공통 + 섹션 + prefill 이어쓰기의 user 메시지 = 3개)
+        타임스탬프 같은 요청별 텍스트(system_suffix)는 breakpoint 뒤 블록으로 분리
+        """
+        parts = [system_prompt] if isinstance(system_prompt, str) else [part for part in system_prompt if part]
+        if not self.prompt_cache:
+            text = "".join(parts)
+            return f"{text}\n\n{system_suffix}" if system_suffix else text
+
+        blocks = [{"type": "text", "text": part, "cache_control": {"type": "ephemeral"}} for part in parts]
+        if system_suffix:
+            blocks.append({"type": "text", "text": system_suffix})
+        return blocks
+
+    def _params(self, generation=None) -> dict:
+        """
+        model / max_tokens / temperature / stop_sequences
+
+        generation: prompt_template.GenerationConfig (섹션별 설정, 없는 값은 클라이언트 기본값)
+        """
+        params = {"model": self.model, "max_tokens": self.max_tokens}
+        if generation is None:
+            return params
+        if generation.model:
+            params["model"] = generation.model
+        if generation.max_tokens:
+            params["max_tokens"] = generation.max_tokens
+        if generation.temperature is not None:
+            params["temperature"] = generation.temperature
+        if generation.stop_sequences:
+            params["stop_sequences"] = list(generation.stop_sequences)
+        return params
+
+    @staticmethod
+    def _stop_text(message) -> str:
+        """stop_sequences로 멈췄으면 그 텍스트 (API 출력에서 빠지므로 다시 붙임 → [/CARDS] 등 마커 유지)"""
+        if getattr(message, "stop_reason", None) == "stop_sequence":
+            return message.stop_sequence or ""
+        return ""
+
+    def call(self, system_prompt: str, user_message: str, conversation_history: list = None,
+             system_suffix: str = None, generation=None) -> str:
         """일반 API 호출"""
         messages = []
         if conversation_history:
@@ -44,9 +129,8 @@ class LLMClient:
         try:
             start_time = time.time()
             response = self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                system=system_prompt,
+                **self._params(generation),
+                system=self._system(system_prompt, system_suffix),
                 messages=messages
             )
             end_time = time.time()
@@ -55,11 +139,12 @@ class LLMClient:
             self.last_input_tokens = response.usage.input_tokens
             self.last_output_tokens = response.usage.output_tokens
 
-            return response.content[0].text
+            return response.content[0].text + self._stop_text(response)
         except Exception as e:
             return f"오류 발생: {str(e)}"
 
-    def stream(self, system_prompt: str, user_message: str, conversation_history: list = None):
+    def stream(self, system_prompt: str, user_message: str, conversation_history: list = None,
+               system_suffix: str = None, generation=None):
         """스트리밍 API 호출 (generator)"""
         messages = []
         if conversation_history:
@@ -68,12 +153,86 @@ class LLMClient:
 
         try:
             with self.client.messages.stream(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                system=system_prompt,
+                **self._params(generation),
+                system=self._system(system_prompt, system_suffix),
                 messages=messages
             ) as stream:
                 for text in stream.text_stream:
                     yield text
+
+                stop_text = self._stop_text(stream.get_final_message())
+                if stop_text:
+                    yield stop_text
+        except Exception as e:
+            yield f"오류 발생: {str(e)}"
+
+    def _messages(self, user_message: str, conversation_history: list = None,
+                  prefill: Optional[str] = None, cache_user: bool = False) -> list:
+        """
+        messages 파라미터 구성
+
+        cache_user: user 메시지에도 cache breakpoint (aprime으로 미리 쓴 캐시를 prefill 이어쓰기 요청이 읽음)
+        prefill: assistant 메시지로 붙여서 모델이 그 뒤부터 이어 쓰게 함 (끝 공백은 API가 거부해서 제거)
+        """
+        messages = []
+        if conversation_history:
+            messages.extend(conversation_history)
+        if cache_user and self.prompt_cache:
+            messages.append({"role": "user", "content": [
+                {"type": "text", "text": user_message, "cache_control": {"type": "ephemeral"}}
+            ]})
+        else:
+            messages.append({"role": "user", "content": user_message})
+        if prefill:
+            messages.append({"role": "assistant", "content": prefill.rstrip()})
+        return messages
+
+    async def aprime(self, system_prompt: str, user_message: str, system_suffix: str = None,
+                     generation=None) -> None:
+        """system + user 프롬프트 캐시를 미리 씀 (max_tokens=1, 이후 prefill 이어쓰기 요청의 TTFT 단축)"""
+        if not self.prompt_cache:
+            return
+        params = self._params(generation)
+        params["max_tokens"] = 1
+        params.pop("stop_sequences", None)
+        await self.async_client.messages.create(
+            **params,
+            system=self._system(system_prompt, system_suffix),
+            messages=self._messages(user_message, cache_user=True)
+        )
+
+    async def astream(self, system_prompt: str, user_message: str, conversation_history: list = None,
+                      system_suffix: str = None, usage: Optional[StreamUsage] = None, generation=None,
+                      prefill: Optional[str] = None, raise_errors: bool = False):
+        """
+        비동기 스트리밍 API 호출 (async generator, 이벤트 루프를 막지 않음)
+
+        Args:
+            system_suffix: 캐시 breakpoint 뒤에 붙는 요청별 system 텍스트 (타임스탬프 등)
+            usage: 전달하면 스트림 종료 후 토큰/캐시 사용량과 stop_reason을 채워줌
+            generation: 섹션별 max_tokens / stop_sequences / temperature / model (GenerationConfig)
+            prefill: 이미 나온 응답 앞부분 - 모델이 그 뒤부터 이어 씀 (prefill 자체는 다시 내보내지 않음)
+            raise_errors: True면 API 오류를 "오류 발생" 텍스트 대신 예외로 (호출하는 쪽이 대체 경로를 고를 때)
+        """
+        messages = self._messages(user_message, conversation_history, prefill, cache_user=prefill is not None)
+
+        try:
+            async with self.async_client.messages.stream(
+                **self._params(generation),
+                system=self._system(system_prompt, system_suffix),
+                messages=messages
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+
+                final_message = await stream.get_final_message()
+                stop_text = self._stop_text(final_message)
+                if stop_text:
+                    yield stop_text
+                if usage is not None:
+                    usage.update_from(final_message.usage)
+                    usage.stop_reason = getattr(final_message, "stop_reason", None)
         except Exception as e:
+            if raise_errors:
+                raise
             yield f"오류 발생: {str(e)}"
@@ -9,6 +9,8 @@ from dotenv import load_dotenv
 from dataclasses import dataclass
 from typing import Optional
 
+from prompt_template import system_text
+
 load_dotenv()
 
 
@@ -22,6 +24,30 @@ class LLMResponse:
     output_tokens: Optional[int] = None
 
 
+class StopScanner:
+    """
+    stop_sequences 검사 (클라이언트 측)
+
+    Gemini API에 stop_sequences를 넘기면 stop 텍스트가 출력에서 빠지고 어떤 stop에서 멈췄는지도
+    알 수 없음 → 직접 찾아서 stop 텍스트까지 내보내고 멈춤 (Claude 클라이언트와 같은 출력)
+    """
+
+    def __init__(self, stop_sequences):
+        self.stop_sequences = tuple(stop for stop in stop_sequences if stop)
+        self.keep = max((len(stop) for stop in self.stop_sequences), default=1) - 1
+        self.tail = ""  # 직전 청크 끝 (청크 경계에 걸친 stop 검사용)
+
+    def feed(self, text: str) -> Optional[str]:
+        """stop이 나오면 stop 텍스트까지 자른 text, 아니면 None"""
+        window = self.tail + text
+        hits = [(window.find(stop), stop) for stop in self.stop_sequences if stop in window]
+        if hits:
+            start, stop = min(hits)
+            return text[:start + len(stop) - len(self.tail)]
+        self.tail = window[-self.keep:] if self.keep else ""
+        return None
+
+
 class LLMClient:
     """Gemini API 클라이언트"""
 
@@ -34,18 +60,38 @@ class LLMClient:
         self.last_input_tokens = 0
         self.last_output_tokens = 0
 
-    def call(self, system_prompt: str, user_message: str, conversation_history: list = None) -> str:
+    @staticmethod
+    def _system(system_prompt, system_suffix: Optional[str] = None) -> str:
+        """요청별 텍스트는 항상 고정 system 뒤에 붙임 (암묵적 prefix 캐시 유지, 블록 튜플은 이어 붙임)"""
+        system_prompt = system_text(system_prompt)
+        return f"{system_prompt}\n\n{system_suffix}" if system_suffix else system_prompt
+
+    def _model(self, system_prompt: str, system_suffix: Optional[str] = None, generation=None):
+        """generation: prompt_template.GenerationConfig (gemini_model, 없으면 기본 모델)"""
+        return genai.GenerativeModel(
+            model_name=(generation and generation.gemini_model) or self.model_name,
+            system_instruction=self._system(system_prompt, system_suffix)
+        )
+
+    def _generation_config(self, generation=None):
+        """max_tokens / temperature (stop_sequences는 StopScanner로 직접 검사)"""
+        max_output_tokens = self.max_output_tokens
+        temperature = 1.0
+        if generation is not None:
+            max_output_tokens = generation.max_tokens or max_output_tokens
+            if generation.temperature is not None:
+                temperature = generation.temperature
+        return genai.types.GenerationConfig(
+            max_output_tokens=max_output_tokens,
+            temperature=temperature
+        )
+
+    def call(self, system_prompt: str, user_message: str, conversation_history: list = None,
+             system_suffix: str = None, generation=None) -> str:
         """일반 API 호출"""
         try:
-            model = genai.GenerativeModel(
-                model_name=self.model_name,
-                system_instruction=system_prompt
-            )
-
-            generation_config = genai.types.GenerationConfig(
-                max_output_tokens=self.max_output_tokens,
-                temperature=1.0
-            )
+            model = self._model(system_prompt, system_suffix, generation)
+            generation_config = self._generation_config(generation)
 
             start_time = time.time()
             response = model.generate_content(
@@ -59,23 +105,20 @@ class LLMClient:
                 self.last_input_tokens = response.usage_metadata.prompt_token_count
                 self.last_output_tokens = response.usage_metadata.candidates_token_count
 
+            if generation is not None and generation.stop_sequences:
+                return StopScanner(generation.stop_sequences).feed(response.text) or response.text
             return response.text
 
         except Exception as e:
             return f"오류 발생: {str(e)}"
 
-    def stream(self, system_prompt: str, user_message: str, conversation_history: list = None):
+    def stream(self, system_prompt: str, user_message: str, conversation_history: list = None,
+               system_suffix: str = None, generation=None):
         """스트리밍 API 호출 (generator)"""
         try:
-            model = genai.GenerativeModel(
-                model_name=self.model_name,
-                system_instruction=system_prompt
-            )
-
-            generation_config = genai.types.GenerationConfig(
-                max_output_tokens=self.max_output_tokens,
-                temperature=1.0
-            )
+            model = self._model(system_prompt, system_suffix, generation)
+            generation_config = self._generation_config(generation)
+            scanner = StopScanner(generation.stop_sequences) if generation and generation.stop_sequences else None
 
             response = model.generate_content(
                 user_message,
@@ -85,7 +128,59 @@ class LLMClient:
 
             for chunk in response:
                 if hasattr(chunk, 'text') and chunk.text:
+                    stopped = scanner.feed(chunk.text) if scanner else None
+                    if stopped is not None:
+                        yield stopped
+                        break
+                    yield chunk.text
+
+        except Exception as e:
+            yield f"오류 발생: {str(e)}"
+
+    async def astream(self, system_prompt: str, user_message: str, conversation_history: list = None,
+                      system_suffix: str = None, usage=None, generation=None, raise_errors: bool = False):
+        """
+        비동기 스트리밍 API 호출 (async generator, 이벤트 루프를 막지 않음)
+
+        Args:
+            system_suffix: system 뒤에 붙는 요청별 텍스트 (Gemini는 명시적 캐시 breakpoint 없음)
+            usage: client.StreamUsage 호환 객체를 전달하면 스트림 종료 후 토큰 사용량을 채워줌
+            generation: 섹션별 max_tokens / stop_sequences / temperature / gemini_model (GenerationConfig)
+            raise_errors: True면 API 오류를 "오류 발생" 텍스트 대신 예외로 (provider_router 장애 전환)
+        """
+        try:
+            model = self._model(system_prompt, system_suffix, generation)
+            generation_config = self._generation_config(generation)
+            scanner = StopScanner(generation.stop_sequences) if generation and generation.stop_sequences else None
+
+            response = await model.generate_content_async(
+                user_message,
+                generation_config=generation_config,
+                stream=True
+            )
+
+            usage_metadata = None
+            finish_reason = None
+            async for chunk in response:
+                if getattr(chunk, 'usage_metadata', None):
+                    usage_metadata = chunk.usage_metadata
+                if getattr(chunk, 'candidates', None):
+                    finish_reason = getattr(chunk.candidates[0], 'finish_reason', None) or finish_reason
+                if hasattr(chunk, 'text') and chunk.text:
+                    stopped = scanner.feed(chunk.text) if scanner else None
+                    if stopped is not None:
+                        yield stopped
+                        break
                     yield chunk.text
 
+            if usage is not None and getattr(finish_reason, 'name', finish_reason) == "MAX_TOKENS":
+                usage.stop_reason = "max_tokens"  # Claude와 같은 이름 (잘린 풀이는 캐시하지 않음)
+            if usage is not None and usage_metadata is not None:
+                usage.input_tokens = usage_metadata.prompt_token_count or 0
+                usage.output_tokens = usage_metadata.candidates_token_count or 0
+                usage.cache_read_input_tokens = getattr(usage_metadata, 'cached_content_token_count', 0) or 0
+
         except Exception as e:
+            if raise_errors:
+                raise
             yield f"오류 발생: {str(e)}"
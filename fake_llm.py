@@ -0,0 +1,127 @@
+"""
+벤치마크/테스트용 가짜 LLM 클라이언트 (네트워크 호출 없음)
+- client.LLMClient와 같은 인터페이스 (call / stream / astream)
+- 토큰 간 지연을 흉내내서 스트리밍 동작을 재현
+"""
+
+import time
+import asyncio
+
+from prompt_template import system_text
+
+
+DEFAULT_FAKE_TEXT = (
+    "앤드류군...\n\n자네 사주를 펼치자마자 한숨이 나왔어.\n\n아깝다는 한숨이야.\n\n[BUTTON: 왜요?]\n---\n"
+    "자네는 무자(戊子) 일주야.\n겉은 단단한 산인데 속은 깊은 물이지.\n\n[BUTTON: 어떻게 알았어요?]\n---\n"
+    "나와 대화를 통해, 자네가 타고난 잠재력을 알게될걸세.\n\n[BUTTON: 알려주세요]\n---\n"
+    "자, 이제 자네 사주 팔자의 다른 점도 살펴볼까?\n\n"
+    "[CARDS]\nyearly|📅 신년운세|2026년 월별 운세\nwealth|💰 재물운|돈 새는 구멍 찾기\n[/CARDS]\n"
+)
+
+
+class FakeLLMClient:
+    """가짜 LLM 클라이언트 (토큰 지연 시뮬레이션)"""
+
+    supports_prefill = True
+
+    def __init__(
+        self,
+        text: str = DEFAULT_FAKE_TEXT,
+        chunk_size: int = 3,
+        token_delay: float = 0.01,
+        first_token_delay: float = 0.0,
+        model_delays: dict = None,
+    ):
+        """
+        Args:
+            model_delays: 모델별 (first_token_delay, token_delay) - GenerationConfig.model로 고른 모델 흉내 (캐스케이드 등)
+        """
+        self.text = text
+        self.chunk_size = chunk_size
+        self.token_delay = token_delay
+        self.first_token_delay = first_token_delay
+        self.model = "fake-llm"
+        self.model_delays = model_delays or {}
+        self.calls = 0
+        self.primes = 0
+        self.last_generation = None  # 마지막 astream의 GenerationConfig (섹션 설정 전달 확인용)
+
+    def _delays(self, generation=None) -> tuple:
+        model = generation.model if generation is not None else None
+        return self.model_delays.get(model, (self.first_token_delay, self.token_delay))
+
+    def _reply(self, generation=None, prefill=None) -> tuple:
+        """
+        (보낼 텍스트, stop_reason)
+        generation(GenerationConfig)이 있으면 stop_sequences(포함)에서 자르고 max_tokens(청크 수)까지만
+        prefill이 text의 앞부분이면 그 뒤부터 (이어쓰기)
+        """
+        text = self.text
+        stop_reason = "end_turn"
+        if prefill and text.startswith(prefill.rstrip()):
+            text = text[len(prefill.rstrip()):]
+        if generation is not None:
+            hits = [(text.find(stop), stop) for stop in generation.stop_sequences if stop in text]
+            if hits:
+                start, stop = min(hits)
+                text = text[:start + len(stop)]
+                stop_reason = "stop_sequence"
+            limit = generation.max_tokens
+            if limit is not None and len(text) > limit * self.chunk_size:
+                text = text[:limit * self.chunk_size]
+                stop_reason = "max_tokens"
+        return text, stop_reason
+
+    def _chunks(self, generation=None, prefill=None):
+        text, _ = self._reply(generation, prefill)
+        for i in range(0, len(text), self.chunk_size):
+            yield text[i:i + self.chunk_size]
+
+    def call(self, system_prompt: str, user_message: str, conversation_history: list = None,
+             system_suffix: str = None) -> str:
+        """일반 호출 (전체 텍스트 반환)"""
+        self.calls += 1
+        return self.text
+
+    def stream(self, system_prompt: str, user_message: str, conversation_history: list = None,
+               system_suffix: str = None):
+        """동기 스트리밍 (time.sleep → 호출한 스레드를 막음)"""
+        self.calls += 1
+        if self.first_token_delay:
+            time.sleep(self.first_token_delay)
+        for chunk in self._chunks():
+            time.sleep(self.token_delay)
+            yield chunk
+
+    async def aprime(self, system_prompt: str, user_message: str, system_suffix: str = None,
+                     generation=None) -> None:
+        """프롬프트 캐시 준비 흉내 (첫 토큰 지연만큼 대기)"""
+        self.primes += 1
+        await asyncio.sleep(self._delays(generation)[0])
+
+    async def astream(self, system_prompt: str, user_message: str, conversation_history: list = None,
+                      system_suffix: str = None, usage=None, generation=None, prefill=None, raise_errors=False):
+        """비동기 스트리밍 (asyncio.sleep → 이벤트 루프를 막지 않음)"""
+        self.calls += 1
+        self.last_generation = generation
+        first_token_delay, token_delay = self._delays(generation)
+        if first_token_delay:
+            await asyncio.sleep(first_token_delay)
+        for chunk in self._chunks(generation, prefill):
+            await asyncio.sleep(token_delay)
+            yield chunk
+        if usage is not None:
+            # 고정 prefix는 캐시 읽기, 요청별 부분은 일반 입력으로 집계 (글자 수 기준 근사치)
+            usage.cache_read_input_tokens = len(system_text(system_prompt))
+            usage.input_tokens = len(user_message) + len(system_suffix or "")
+            usage.output_tokens = len(self.text)
+            usage.stop_reason = self._reply(generation, prefill)[1]
+
+
+class BlockingFakeLLMClient(FakeLLMClient):
+    """astream 내부에서 동기 sleep을 쓰는 가짜 클라이언트 (수정 전 동작 재현용)"""
+
+    async def astream(self, system_prompt: str, user_message: str, conversation_history: list = None,
+                      system_suffix: str = None, usage=None, generation=None, prefill=None, raise_errors=False):
+        for chunk in self.stream(system_prompt, user_message, conversation_history, system_suffix):
+            yield chunk
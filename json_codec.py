@@ -0,0 +1,61 @@
+"""
+JSON 직렬화 (SSE 프레임, 프롬프트용 saju_data, DB JSONB)
+
+- orjson이 있으면 사용 (표준 json보다 수 배 빠름), 없으면 표준 json
+  JSON_BACKEND=auto(기본) / orjson / json
+- dumps: 공백 없는 JSON, 한글 그대로 (SSE data, JSONB 값)
+- dumps_pretty: json.dumps(ensure_ascii=False, indent=2)와 같은 출력 (프롬프트에 들어가는 saju_data)
+- orjson이 못 다루는 값(64비트 넘는 정수 등)은 표준 json으로 다시 직렬화
+- register_json_codecs: asyncpg 연결에 json/jsonb 코덱 등록 → 쿼리에 dict를 그대로 넘기고 dict로 받음
+  (asyncpg.create_pool(init=register_json_codecs))
+"""
+
+import os
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # requirements.txt에 있지만 없어도 동작
+    orjson = None
+
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")
+if JSON_BACKEND == "orjson" and orjson is None:
+    print("[WARN] JSON_BACKEND=orjson but orjson is not installed, using json")
+USE_ORJSON = orjson is not None and JSON_BACKEND != "json"
+BACKEND = "orjson" if USE_ORJSON else "json"
+
+if USE_ORJSON:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+    _PRETTY_OPTIONS = _OPTIONS | orjson.OPT_INDENT_2
+
+    def dumps(obj: Any) -> str:
+        try:
+            return orjson.dumps(obj, option=_OPTIONS).decode()
+        except TypeError:
+            return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    def dumps_pretty(obj: Any) -> str:
+        try:
+            return orjson.dumps(obj, option=_PRETTY_OPTIONS).decode()
+        except TypeError:
+            return json.dumps(obj, ensure_ascii=False, indent=2)
+
+    loads = orjson.loads
+else:
+    def dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    def dumps_pretty(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+
+    loads = json.loads
+
+dumps.__doc__ = "객체 → 공백 없는 JSON 문자열 (한글 그대로)"
+dumps_pretty.__doc__ = "객체 → 들여쓰기 2칸 JSON 문자열 (json.dumps(ensure_ascii=False, indent=2)와 동일)"
+
+
+async def register_json_codecs(conn) -> None:
+    """asyncpg 연결의 json/jsonb를 dict ↔ JSON으로 자동 변환 (create_pool의 init)"""
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(type_name, encoder=dumps, decoder=loads, schema="pg_catalog")
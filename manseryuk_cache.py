@@ -0,0 +1,128 @@
+"""
+만세력 계산 결과 메모이제이션
+- 만세력은 출생 입력(생년월일시, 성별, 양/음력, 출생지, MBTI)의 순수 함수
+- 재방문/중복 제출이면 원격 API를 다시 호출하지 않고 저장된 결과를 사용
+
+주의:
+- 응답의 meta.현재나이 / meta.기준년도는 호출 연도에 따라 달라지므로 기준 연도(KST)를 키에 포함
+- 이름은 meta.이름에만 들어가므로 키에서 제외하고, 캐시 hit 시 요청 이름으로 덮어씀
+"""
+
+import copy
+import json
+import asyncio
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+KST = timezone(timedelta(hours=9))
+
+
+def normalize_birth_input(
+    year: int,
+    month: int,
+    day: int,
+    hour: Optional[int],
+    minute: Optional[int],
+    gender: str,
+    is_lunar: bool,
+    birth_place: Optional[str],
+    mbti: Optional[str],
+) -> dict:
+    """같은 출생 정보면 같은 dict (대소문자/공백/빈 값 차이 제거)"""
+    return {
+        "year": int(year),
+        "month": int(month),
+        "day": int(day),
+        "hour": int(hour) if hour is not None else None,
+        # 시간을 모르면 분은 의미 없음
+        "minute": int(minute) if hour is not None and minute is not None else None,
+        "gender": (gender or "").strip().lower(),
+        "is_lunar": bool(is_lunar),
+        "birth_place": (birth_place or "").strip() or "미상",
+        "mbti": (mbti or "").strip().upper() or None,
+    }
+
+
+def manseryuk_cache_key(birth_input: dict, base_year: Optional[int] = None) -> str:
+    """정규화된 출생 입력 + 기준 연도의 sha256"""
+    if base_year is None:
+        base_year = datetime.now(KST).year
+    canonical = json.dumps(birth_input, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{base_year}\x1f{canonical}".encode("utf-8")).hexdigest()
+
+
+def with_name(response: dict, name: str) -> dict:
+    """캐시된 응답 복사본에 요청 이름 반영 (enrichment.meta.이름)"""
+    response = copy.deepcopy(response)
+    meta = (response.get("enrichment") or {}).get("meta")
+    if isinstance(meta, dict):
+        meta["이름"] = name
+    return response
+
+
+class ManseryukMemo:
+    """
+    만세력 응답 메모 (백엔드: cache_backends의 Memory/Postgres/Tiered)
+    - 같은 키로 동시에 들어온 요청(중복 제출)은 원격 호출 1번을 공유
+    - 캐시 장애 시에는 원격 호출로 진행 (메모는 최적화일 뿐)
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self._inflight: dict = {}  # key → asyncio.Future (진행 중인 원격 호출)
+
+    async def get_or_call(
+        self,
+        key: str,
+        name: str,
+        call: Callable[[], Awaitable[dict]],
+    ) -> tuple:
+        """→ (응답, 캐시 사용 여부)"""
+        try:
+            cached = await self.backend.get(key)
+        except Exception as e:
+            print(f"[WARN] manseryuk cache get failed: {e}")
+            cached = None
+        if cached is not None:
+            self.hits += 1
+            return with_name(cached, name), True
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.shared += 1
+            return with_name(await asyncio.shield(inflight), name), True
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # 기다리는 쪽이 없어도 경고가 나지 않도록
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(response)
+        if response.get("enrichment"):
+            try:
+                await self.backend.set(key, response)
+            except Exception as e:
+                print(f"[WARN] manseryuk cache set failed: {e}")
+        return response, False
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+        }
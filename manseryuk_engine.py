@@ -0,0 +1,566 @@
+"""
+로컬 만세력 엔진 (사주팔자 + enrichment 계산)
+
+원격 만세력 API(calculate-enriched)와 같은 enrichment 구조를 프로세스 안에서 계산
+- 24절기/음력 변환은 manseryuk_tables (사전 계산 테이블, 1번만 로드)
+- 시각: 한국 표준시(서머타임/UTC+8:30 시기 포함)를 UTC로 바꿔 절기와 비교
+- 시주/일주 경계: 출생지 경도 기준 지방평균시, 자시(23시)부터 다음 날
+
+결과 형식은 기록된 원격 응답(saju_data/default.json)과 맞춤
+(대운/세운 십성의 '칠살', 소인띠의 '띠' 생략 등 원격 표기 그대로)
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+
+from manseryuk_tables import IPCHUN_INDEX, KST, get_tables
+
+try:
+    from zoneinfo import ZoneInfo
+    KOREA_TZ = ZoneInfo("Asia/Seoul")  # 1954~1961 UTC+8:30, 1948~1960/1987~1988 서머타임 포함
+except Exception:
+    print("[WARN] Asia/Seoul tzdata not found - manseryuk uses fixed UTC+9")
+    KOREA_TZ = KST
+
+STEMS = "甲乙丙丁戊己庚辛壬癸"
+BRANCHES = "子丑寅卯辰巳午未申酉戌亥"
+ELEMENTS = "木火土金水"
+ELEMENT_KOREAN = {"木": "목", "火": "화", "土": "토", "金": "금", "水": "수"}
+STEM_ELEMENT = "木木火火土土金金水水"
+BRANCH_ELEMENT = "水土木木土火火土金金土水"
+ANIMALS = ["쥐", "소", "호랑이", "토끼", "용", "뱀", "말", "양", "원숭이", "닭", "개", "돼지"]
+
+# 지장간 (정기 먼저)
+HIDDEN_STEMS = {
+    "子": "癸", "丑": "己癸辛", "寅": "甲丙戊", "卯": "乙", "辰": "戊乙癸", "巳": "丙庚戊",
+    "午": "丁己", "未": "己丁乙", "申": "庚壬戊", "酉": "辛", "戌": "戊辛丁", "亥": "壬甲",
+}
+
+TEN_GODS = ["비견", "겁재", "식신", "상관", "편재", "정재", "편관", "정관", "편인", "정인"]
+TEN_GOD_GROUPS = {"비겁": ("비견", "겁재"), "식상": ("식신", "상관"), "재성": ("편재", "정재"),
+                  "관성": ("편관", "정관"), "인성": ("편인", "정인")}
+
+TWELVE_STAGES = ["장생", "목욕", "관대", "건록", "제왕", "쇠", "병", "사", "묘", "절", "태", "양"]
+STRONG_STAGES = {"장생", "목욕", "관대", "건록", "제왕"}
+# 일간별 장생 지지 (양간 순행, 음간 역행)
+GROWTH_BRANCH = {"甲": "亥", "乙": "午", "丙": "寅", "丁": "酉", "戊": "寅",
+                 "己": "酉", "庚": "巳", "辛": "子", "壬": "申", "癸": "卯"}
+
+# 12신살 (삼합 생지부터)
+TWELVE_SINSAL = ["지살", "년살", "월살", "망신살", "장성살", "반안살",
+                 "역마살", "육해살", "화개살", "겁살", "재살", "천살"]
+SAMHAP_GROUPS = [("申子辰", "수국"), ("亥卯未", "목국"), ("寅午戌", "화국"), ("巳酉丑", "금국")]
+
+STEM_COMBINATIONS = [("甲己", "土"), ("乙庚", "金"), ("丙辛", "水"), ("丁壬", "木"), ("戊癸", "火")]
+BRANCH_COMBINATIONS = [("子丑", "土"), ("寅亥", "木"), ("卯戌", "火"), ("辰酉", "金"), ("巳申", "水"), ("午未", "火")]
+CLASHES = ["子午", "丑未", "寅申", "卯酉", "辰戌", "巳亥"]
+PUNISHMENTS = ["寅巳", "巳申", "申寅", "丑戌", "戌未", "未丑", "子卯"]
+SELF_PUNISHMENTS = "辰午酉亥"
+HARMS = ["子未", "丑午", "寅巳", "卯辰", "申亥", "酉戌"]
+BREAKS = ["子酉", "丑辰", "寅亥", "卯午", "巳申", "未戌"]
+
+SEASONS = {"寅": "봄", "卯": "봄", "辰": "봄", "巳": "여름", "午": "여름", "未": "여름",
+           "申": "가을", "酉": "가을", "戌": "가을", "亥": "겨울", "子": "겨울", "丑": "겨울"}
+
+# 지방평균시 보정용 출생지 경도 (출생지 미상이면 동경 127.5도 = 표준시 -30분)
+DEFAULT_LONGITUDE = 127.5
+CITY_LONGITUDES = {
+    "서울": 126.98, "인천": 126.70, "수원": 127.03, "춘천": 127.73, "강릉": 128.88,
+    "대전": 127.38, "세종": 127.29, "청주": 127.49, "전주": 127.15, "광주": 126.85,
+    "대구": 128.60, "포항": 129.37, "울산": 129.31, "부산": 129.08, "창원": 128.68,
+    "제주": 126.53,
+}
+
+PILLAR_NAMES = ["년주", "월주", "일주", "시주"]
+
+# 2000-01-01 = 戊午(54)
+DAY_PILLAR_OFFSET = (54 - date(2000, 1, 1).toordinal()) % 60
+
+
+def ganji(index: int) -> str:
+    """60갑자 인덱스 → 간지 문자열"""
+    return STEMS[index % 10] + BRANCHES[index % 12]
+
+
+def ten_god(day_stem: str, other_stem: str) -> str:
+    """일간 기준 십성"""
+    day_index, other_index = STEMS.index(day_stem), STEMS.index(other_stem)
+    day_element = ELEMENTS.index(STEM_ELEMENT[day_index])
+    other_element = ELEMENTS.index(STEM_ELEMENT[other_index])
+    relation = (other_element - day_element) % 5  # 0 같음, 1 내가 생, 2 내가 극, 3 나를 극, 4 나를 생
+    different_polarity = (day_index + other_index) % 2
+    return TEN_GODS[relation * 2 + different_polarity]
+
+
+def branch_ten_god(day_stem: str, branch: str) -> str:
+    """지지 십성 (정기 기준)"""
+    return ten_god(day_stem, HIDDEN_STEMS[branch][0])
+
+
+def twelve_stage(day_stem: str, branch: str) -> str:
+    start = BRANCHES.index(GROWTH_BRANCH[day_stem])
+    offset = BRANCHES.index(branch) - start
+    if STEMS.index(day_stem) % 2:
+        offset = -offset
+    return TWELVE_STAGES[offset % 12]
+
+
+def samhap_group(branch: str) -> str:
+    return next(group for group, _ in SAMHAP_GROUPS if branch in group)
+
+
+def birth_longitude(birth_place: Optional[str]) -> float:
+    for city, longitude in CITY_LONGITUDES.items():
+        if birth_place and city in birth_place:
+            return longitude
+    return DEFAULT_LONGITUDE
+
+
+# ============ 사주팔자 ============
+
+def calculate_pillars(
+    year: int,
+    month: int,
+    day: int,
+    hour: Optional[int],
+    minute: Optional[int],
+    gender: str,
+    is_lunar: bool = False,
+    is_leap_month: bool = False,
+    longitude: float = DEFAULT_LONGITUDE,
+) -> dict:
+    """
+    사주팔자 + 대운 기준값 계산
+
+    Returns:
+        {"pillars": [년, 월, 일, 시 60갑자 인덱스 (시간 미상이면 시주 None)],
+         "solar_date": 양력 출생일, "daewoon_number": 대운수, "forward": 순행 여부}
+    """
+    tables = get_tables()
+    solar_date = tables.lunar_to_solar(year, month, day, is_leap_month) if is_lunar else date(year, month, day)
+
+    # 출생 시각(한국 시) → UTC, 시간 미상이면 정오 기준
+    civil = datetime(solar_date.year, solar_date.month, solar_date.day,
+                     hour if hour is not None else 12, minute or 0, tzinfo=KOREA_TZ)
+    utc = civil.astimezone(timezone.utc)
+    timestamp = utc.timestamp()
+
+    # 년주/월주: 직전 절(節) 기준
+    position = tables.term_position(timestamp)
+    term_year, term_index, _ = tables.term_at(position)
+    jeol_position = position - (term_index % 2)
+    jeol_index = term_index - (term_index % 2)
+    saju_year = term_year if term_index >= IPCHUN_INDEX else term_year - 1
+    month_offset = (jeol_index // 2 - 1) % 12  # 寅월 = 0
+    year_index = (saju_year - 4) % 60
+    month_index = (14 + (saju_year - 1900) * 12 + month_offset) % 60
+
+    # 일주/시주: 지방평균시, 자시(23시)부터 다음 날
+    if hour is None:
+        day_index = (solar_date.toordinal() + DAY_PILLAR_OFFSET) % 60
+        hour_index = None
+    else:
+        local_mean = utc.replace(tzinfo=None) + timedelta(minutes=longitude * 4)
+        day_index = ((local_mean + timedelta(hours=1)).date().toordinal() + DAY_PILLAR_OFFSET) % 60
+        hour_branch = ((local_mean.hour * 60 + local_mean.minute + 60) // 120) % 12
+        hour_index = ((day_index % 5) * 12 + hour_branch) % 60
+
+    # 대운: 양남음녀 순행, 음남양녀 역행 / 절기까지 3일 = 1년
+    male = gender.strip().lower() in ("male", "m", "남", "남자")
+    forward = (year_index % 2 == 0) == male
+    if forward:
+        _, _, boundary = tables.term_at(jeol_position + 2)
+        days = (boundary - timestamp) / 86400
+    else:
+        _, _, boundary = tables.term_at(jeol_position)
+        days = (timestamp - boundary) / 86400
+
+    return {
+        "pillars": [year_index, month_index, day_index, hour_index],
+        "solar_date": solar_date,
+        "daewoon_number": max(1, round(days / 3)),
+        "forward": forward,
+    }
+
+
+# ============ enrichment ============
+
+def _ohang(stems: List[str], branches: List[str]) -> dict:
+    counts = {element: 0 for element in ELEMENTS}
+    for stem in stems:
+        counts[STEM_ELEMENT[STEMS.index(stem)]] += 1
+    for branch in branches:
+        counts[BRANCH_ELEMENT[BRANCHES.index(branch)]] += 1
+
+    present = [element for element in ELEMENTS if counts[element]]
+    generates, controls = [], []
+    for element in present:
+        i = ELEMENTS.index(element)
+        if counts[ELEMENTS[(i + 1) % 5]]:
+            generates.append(f"{element}→{ELEMENTS[(i + 1) % 5]}")
+        if counts[ELEMENTS[(i + 2) % 5]]:
+            controls.append(f"{element}→{ELEMENTS[(i + 2) % 5]}")
+
+    return {
+        "분포": counts,
+        "과다": [element for element in ELEMENTS if counts[element] >= 3],
+        "결핍": [element for element in ELEMENTS if counts[element] == 0],
+        "생극": {"생하는_관계": generates, "극하는_관계": controls},
+    }
+
+
+def _sipsung(day_stem: str, pillars: dict) -> dict:
+    result = {}
+    counts = {}
+    for name, (stem, branch) in pillars.items():
+        gods = [] if name == "일주" else [ten_god(day_stem, stem)]
+        gods += [ten_god(day_stem, hidden) for hidden in HIDDEN_STEMS[branch]]
+        result[name] = gods
+        for god in gods:
+            counts[god] = counts.get(god, 0) + 1
+
+    group = {key: sum(counts.get(god, 0) for god in gods) for key, gods in TEN_GOD_GROUPS.items()}
+    if counts.get("식신", 0) >= 2 and group["재성"] >= 2:
+        special = "식신생재격"
+    elif counts.get("상관", 0) >= 2 and group["재성"] >= 2:
+        special = "상관생재격"
+    elif group["관성"] >= 2 and group["인성"] >= 2:
+        special = "관인상생격"
+    elif counts.get("편관", 0) >= 2 and counts.get("식신", 0) >= 1:
+        special = "식신제살격"
+    else:
+        special = None
+
+    result["과다"] = [god for god, count in counts.items() if count >= 2]
+    result["결핍"] = [god for god in TEN_GODS if not counts.get(god)]
+    result["특수격국"] = special
+    return result
+
+
+def _twelve_stages(day_stem: str, pillars: dict) -> dict:
+    result = {name: twelve_stage(day_stem, branch) for name, (_, branch) in pillars.items()}
+    strong = sum(stage in STRONG_STAGES for stage in result.values())
+    weak = len(result) - strong
+    if strong > weak:
+        result["특징"] = f"강{strong}"
+    elif weak > strong:
+        result["특징"] = f"약{weak}"
+    else:
+        result["특징"] = "균형"
+    return result
+
+
+def _sinsal(pillars: dict) -> dict:
+    branches = [branch for _, branch in pillars.values()]
+    found = {}
+    # 년지, 월지 기준 12신살
+    for base in (pillars["년주"][1], pillars["월주"][1]):
+        start = BRANCHES.index(samhap_group(base)[0])
+        for branch in branches:
+            name = TWELVE_SINSAL[(BRANCHES.index(branch) - start) % 12]
+            found.setdefault(name, [])
+            if branch not in found[name]:
+                found[name].append(branch)
+
+    names = list(found)
+    noble = sum(name.endswith("귀인") for name in names)
+    evil = len(names) - noble
+    return {
+        "전체": names,
+        "중요신살": found,
+        "특수": {"역마살": "역마살" in found, "도화살": "년살" in found, "화개살": "화개살" in found},
+        "균형": {
+            "귀인": noble,
+            "살": evil,
+            "평가": "살우세" if evil > noble else ("귀인우세" if noble > evil else "균형"),
+        },
+    }
+
+
+def _pairs(branches: List[str], table: List[str], suffix: str) -> List[str]:
+    found = []
+    for pair in table:
+        if pair[0] in branches and pair[1] in branches and f"{pair}{suffix}" not in found:
+            found.append(f"{pair}{suffix}")
+    return found
+
+
+def _hapchung(stems: List[str], branches: List[str]) -> dict:
+    stem_combinations = [f"{pair}合{element}" for pair, element in STEM_COMBINATIONS
+                         if pair[0] in stems and pair[1] in stems]
+    branch_combinations = [f"{pair}합{element}" for pair, element in BRANCH_COMBINATIONS
+                           if pair[0] in branches and pair[1] in branches]
+    for group, name in SAMHAP_GROUPS:
+        # 왕지(가운데) 포함 2글자 이상이면 (반)삼합
+        if group[1] in branches and sum(branch in branches for branch in group) >= 2:
+            branch_combinations.append(f"{group} {name}")
+
+    punishments = _pairs(branches, PUNISHMENTS, "형")
+    punishments += [f"{branch}{branch}형" for branch in SELF_PUNISHMENTS if branches.count(branch) >= 2]
+    return {
+        "천간합": stem_combinations,
+        "지지합": branch_combinations,
+        "충": _pairs(branches, CLASHES, "충"),
+        "형": punishments,
+        "해": _pairs(branches, HARMS, "해"),
+        "파": _pairs(branches, BREAKS, "파"),
+    }
+
+
+def _luck_gods(day_stem: str, index: int) -> dict:
+    """대운/세운 십성 (원격 응답 표기: 편관 → 칠살)"""
+    def name(god: str) -> str:
+        return "칠살" if god == "편관" else god
+
+    return {
+        "천간": name(ten_god(day_stem, STEMS[index % 10])),
+        "지지": name(branch_ten_god(day_stem, BRANCHES[index % 12])),
+    }
+
+
+def _daewoon(day_stem: str, month_index: int, number: int, forward: bool, age: int) -> dict:
+    entries = []
+    for i in range(1, 10):
+        start = number + 1 + (i - 1) * 10  # 한국 나이
+        index = (month_index + (i if forward else -i)) % 60
+        entries.append({
+            "나이": f"{start}-{start + 9}",
+            "간지": ganji(index),
+            "십성": _luck_gods(day_stem, index),
+            "현재": start <= age <= start + 9,
+        })
+
+    def summary(i: int) -> Optional[dict]:
+        if not 0 <= i < len(entries):
+            return None
+        entry = entries[i]
+        return {"간지": entry["간지"], "나이": f"{entry['나이']}세", "십성": entry["십성"]}
+
+    current = next((i for i, entry in enumerate(entries) if entry["현재"]), None)
+    if current is None:
+        current = -1 if age < number + 1 else len(entries)
+    return {
+        "대운수": number,
+        "방향": "순행" if forward else "역행",
+        "현재": summary(current),
+        "이전": summary(current - 1),
+        "다음": summary(current + 1),
+        "전체": entries,
+    }
+
+
+def _sewoon(day_stem: str, birth_year: int, base_year: int) -> dict:
+    def year_entry(year: int) -> dict:
+        index = (year - 4) % 60
+        return {"년도": year, "나이": year - birth_year + 1, "간지": ganji(index),
+                "십성": _luck_gods(day_stem, index)}
+
+    return {
+        "현재": year_entry(base_year),
+        "분석대상": {**year_entry(base_year + 1), "이유": "신년운세"},
+        "전후": [year_entry(base_year - 1), year_entry(base_year + 2)],
+    }
+
+
+def _yongsin(day_stem: str, month_branch: str, strength: str, counts: dict) -> tuple:
+    """억부 용신 + 조후 → (용신, 기신)"""
+    day = ELEMENTS.index(STEM_ELEMENT[STEMS.index(day_stem)])
+
+    def element(offset: int) -> str:
+        return ELEMENTS[(day + offset) % 5]
+
+    # 비겁 0, 식상 1, 재성 2, 관성 3, 인성 4
+    if strength == "신약":
+        drain = counts[element(1)] + counts[element(2)]
+        if counts[element(3)] > drain:
+            yong = ([element(4)], ["인성"])
+            gi = ([element(2), element(3)], ["재성", "관성"])
+        else:
+            yong = ([element(0)], ["비겁"])
+            gi = ([element(2), element(1)], ["식상", "재성"])
+    else:
+        yong = ([element(1)], ["식상"])
+        gi = ([element(4), element(0)], ["비겁", "인성"])
+
+    season = SEASONS[month_branch]
+    if season == "겨울":
+        johu = "火"
+        reason = f"{month_branch}월로 겨울 계절, 차가운 기운이 강하여 따뜻한 火의 기운 필요"
+    elif season == "여름":
+        johu = "水"
+        reason = f"{month_branch}월로 여름 계절, 뜨거운 기운이 강하여 시원한 水의 기운 필요"
+    else:
+        johu = None
+        reason = f"{month_branch}월로 {season} 계절, 한난이 고르므로 {strength} 기준으로 {yong[0][0]}의 기운 필요"
+
+    return (
+        {"오행": yong[0], "십성": yong[1], "조후": johu, "이유": reason},
+        {"오행": gi[0], "십성": gi[1]},
+    )
+
+
+def _strength(day_stem: str, stems: List[str], branches: List[str]) -> str:
+    """신강약: 비겁 + 인성 오행 비중 (월지 2배)"""
+    day = ELEMENTS.index(STEM_ELEMENT[STEMS.index(day_stem)])
+    support = {ELEMENTS[day], ELEMENTS[(day + 4) % 5]}
+    weights = [(STEM_ELEMENT[STEMS.index(stem)], 1) for stem in stems]
+    weights += [(BRANCH_ELEMENT[BRANCHES.index(branch)], 2 if i == 1 else 1) for i, branch in enumerate(branches)]
+    total = sum(weight for _, weight in weights)
+    helped = sum(weight for element, weight in weights if element in support)
+    if helped * 2 > total:
+        return "신강"
+    if helped * 2 < total:
+        return "신약"
+    return "중화"
+
+
+def _gongmang(day_index: int, day_stem: str, pillars: dict) -> dict:
+    xun_start = day_index - day_index % 10
+    void = [BRANCHES[(xun_start + 10) % 12], BRANCHES[(xun_start + 11) % 12]]
+    affected = [name for name, (_, branch) in pillars.items() if name != "일주" and branch in void]
+    return {
+        "지지": void,
+        "영향위치": ", ".join(affected),
+        "영향십성": ", ".join(branch_ten_god(day_stem, pillars[name][1]) for name in affected),
+    }
+
+
+def _zodiac_relations(pillars: dict) -> tuple:
+    """귀인띠: 일지와 합(육합/삼합)하는 지지 / 소인띠: 일지와 파(破)하는 지지"""
+    day_branch = pillars["일주"][1]
+    helpers = []
+    for name, (_, branch) in pillars.items():
+        if name == "일주" or branch == day_branch:
+            continue
+        combined = any(set(pair) == {branch, day_branch} for pair, _ in BRANCH_COMBINATIONS)
+        if combined or samhap_group(branch) == samhap_group(day_branch):
+            animal = f"{ANIMALS[BRANCHES.index(branch)]}띠"
+            if animal not in helpers:
+                helpers.append(animal)
+
+    breaker = next(pair.replace(day_branch, "") for pair in BREAKS if day_branch in pair)
+    return helpers, [ANIMALS[BRANCHES.index(breaker)]]
+
+
+def calculate_enrichment(
+    name: str,
+    year: int,
+    month: int,
+    day: int,
+    hour: Optional[int],
+    minute: Optional[int],
+    gender: str,
+    is_lunar: bool = False,
+    mbti: Optional[str] = None,
+    birth_place: Optional[str] = None,
+    is_leap_month: bool = False,
+    base_year: Optional[int] = None,
+) -> dict:
+    """
+    원격 calculate-enriched 응답의 enrichment와 같은 구조 계산
+
+    Raises:
+        ValueError: 테이블 범위 밖 날짜, 존재하지 않는 음력 날짜 등
+    """
+    if base_year is None:
+        base_year = datetime.now(KST).year
+
+    result = calculate_pillars(
+        year, month, day, hour, minute, gender, is_lunar, is_leap_month,
+        longitude=birth_longitude(birth_place),
+    )
+    year_index, month_index, day_index, hour_index = result["pillars"]
+    pillars = {}
+    for pillar_name, index in zip(PILLAR_NAMES, result["pillars"]):
+        if index is not None:
+            pillars[pillar_name] = (STEMS[index % 10], BRANCHES[index % 12])
+
+    stems = [stem for stem, _ in pillars.values()]
+    branches = [branch for _, branch in pillars.values()]
+    day_stem = pillars["일주"][0]
+    birth_year = result["solar_date"].year
+    age = base_year - birth_year + 1
+
+    ohang = _ohang(stems, branches)
+    strength = _strength(day_stem, stems, branches)
+    yongsin, gisin = _yongsin(day_stem, pillars["월주"][1], strength, ohang["분포"])
+    helpers, breakers = _zodiac_relations(pillars)
+
+    birth_text = f"{year:04d}-{month:02d}-{day:02d}"
+    if hour is not None:
+        birth_text += f" {hour:02d}:{minute or 0:02d}"
+    birth_text += f" ({'음력' if is_lunar else '양력'})"
+
+    return {
+        "meta": {
+            "이름": name,
+            "성별": "남자" if gender.strip().lower() in ("male", "m", "남", "남자") else "여자",
+            "MBTI": (mbti or "").strip().upper() or None,
+            "생년월일": birth_text,
+            "출생지": (birth_place or "").strip() or "미상",
+            "현재나이": age,
+            "기준년도": base_year,
+        },
+        "사주팔자": {
+            pillar_name: {"천간": pillars[pillar_name][0], "지지": pillars[pillar_name][1]}
+            if pillar_name in pillars else None
+            for pillar_name in PILLAR_NAMES
+        },
+        "핵심요소": {
+            "일간": day_stem,
+            "일간_오행": ELEMENT_KOREAN[STEM_ELEMENT[STEMS.index(day_stem)]],
+            "일주": ganji(day_index),
+            "신강약": strength,
+        },
+        "오행": ohang,
+        "십성": _sipsung(day_stem, pillars),
+        "십이운성": _twelve_stages(day_stem, pillars),
+        "신살": _sinsal(pillars),
+        "합충": _hapchung(stems, branches),
+        "대운": _daewoon(day_stem, month_index, result["daewoon_number"], result["forward"], age),
+        "세운": _sewoon(day_stem, birth_year, base_year),
+        "용신": yongsin,
+        "기신": gisin,
+        "공망": _gongmang(day_index, day_stem, pillars),
+        "귀인띠": helpers,
+        "소인띠": breakers,
+    }
+
+
+def calculate_batch(items: List[dict], base_year: Optional[int] = None) -> List[dict]:
+    """
+    여러 명 한 번에 계산 (테이블은 공유, 항목별 실패는 해당 항목만 에러)
+
+    items: calculate_enrichment 인자 dict 목록
+    """
+    results = []
+    for item in items:
+        params = {"base_year": base_year, **item}
+        try:
+            enrichment = calculate_enrichment(**params)
+            results.append({"success": True, "enrichment": enrichment})
+        except (ValueError, TypeError, KeyError) as e:
+            results.append({"success": False, "error": str(e)})
+    return results
+
+
+def diff_enrichment(local, remote, path: str = "") -> List[str]:
+    """
+    로컬 계산과 원격 응답 enrichment의 다른 위치 목록 (섀도 비교용, 같으면 빈 목록)
+    예: ["신살.도화살", "대운.목록[3].십성"]
+    """
+    if isinstance(local, dict) and isinstance(remote, dict):
+        diffs = []
+        for key in sorted(set(local) | set(remote), key=str):
+            child = f"{path}.{key}" if path else str(key)
+            if key not in local or key not in remote:
+                diffs.append(child)
+            else:
+                diffs.extend(diff_enrichment(local[key], remote[key], child))
+        return diffs
+    if isinstance(local, list) and isinstance(remote, list) and len(local) == len(remote):
+        diffs = []
+        for i, (a, b) in enumerate(zip(local, remote)):
+            diffs.extend(diff_enrichment(a, b, f"{path}[{i}]"))
+        return diffs
+    return [] if local == remote else [path or "(root)"]
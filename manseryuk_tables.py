@@ -0,0 +1,115 @@
+"""
+만세력 사전 계산 테이블 (24절기 / 음력 월)
+- manseryuk_data/*.bin 을 프로세스당 1번만 읽어서 array로 보관 (build_manseryuk_tables.py 로 생성)
+- 조회는 전부 bisect (테이블 범위: TABLE_START_YEAR ~ TABLE_END_YEAR)
+"""
+
+import sys
+from array import array
+from bisect import bisect_right
+from datetime import date, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+DATA_DIR = Path(__file__).parent / "manseryuk_data"
+SOLAR_TERMS_FILE = DATA_DIR / "solar_terms.bin"
+LUNAR_STARTS_FILE = DATA_DIR / "lunar_month_starts.bin"
+LUNAR_CODES_FILE = DATA_DIR / "lunar_month_codes.bin"
+
+TABLE_START_YEAR = 1899
+TABLE_END_YEAR = 2101
+
+# 음력 날짜/월 경계는 표준시(동경 135도) 기준 (1912년 이전 구간은 build_manseryuk_tables.py 참고)
+KST = timezone(timedelta(hours=9))
+
+# 연도 안의 절기 순서 (소한 → 동지), 짝수 인덱스 = 절(節, 월 경계), 홀수 = 중기(中氣)
+SOLAR_TERM_NAMES = [
+    "소한", "대한", "입춘", "우수", "경칩", "춘분", "청명", "곡우", "입하", "소만", "망종", "하지",
+    "소서", "대서", "입추", "처서", "백로", "추분", "한로", "상강", "입동", "소설", "대설", "동지",
+]
+IPCHUN_INDEX = 2
+
+
+def term_longitude(index: int) -> float:
+    """절기 인덱스(0=소한) → 태양 황경 (도)"""
+    return (285 + 15 * index) % 360
+
+
+class ManseryukTables:
+    """24절기 / 음력 월 테이블"""
+
+    def __init__(self, data_dir: Path = DATA_DIR):
+        self.solar_terms = self._load(data_dir / SOLAR_TERMS_FILE.name, "q")
+        self.lunar_starts = self._load(data_dir / LUNAR_STARTS_FILE.name, "i")
+        self.lunar_codes = self._load(data_dir / LUNAR_CODES_FILE.name, "i")
+        self.lunar_index = {code: i for i, code in enumerate(self.lunar_codes)}
+
+    @staticmethod
+    def _load(path: Path, typecode: str) -> array:
+        values = array(typecode)
+        with open(path, "rb") as f:
+            values.frombytes(f.read())
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values
+
+    # ---------- 24절기 ----------
+
+    def term_time(self, year: int, index: int) -> int:
+        """year년 index번째 절기 시각 (UTC unix 초)"""
+        if not TABLE_START_YEAR <= year <= TABLE_END_YEAR:
+            raise ValueError(f"만세력 테이블 범위({TABLE_START_YEAR}~{TABLE_END_YEAR}) 밖의 연도: {year}")
+        return self.solar_terms[(year - TABLE_START_YEAR) * 24 + index]
+
+    def term_position(self, unix_seconds: float) -> int:
+        """시각 직전(같은 시각 포함)에 들어온 절기의 전체 인덱스 ((연도-시작연도)*24 + 절기)"""
+        position = bisect_right(self.solar_terms, unix_seconds) - 1
+        if position < 0 or position >= len(self.solar_terms) - 1:
+            raise ValueError("만세력 테이블 범위 밖의 시각")
+        return position
+
+    def term_at(self, position: int) -> tuple:
+        """전체 인덱스 → (연도, 절기 인덱스, UTC unix 초)"""
+        year, index = divmod(position, 24)
+        return TABLE_START_YEAR + year, index, self.solar_terms[position]
+
+    # ---------- 음력 ----------
+
+    def solar_to_lunar(self, day: date) -> tuple:
+        """양력 날짜 → (음력 연, 월, 일, 윤달 여부)"""
+        ordinal = day.toordinal()
+        i = bisect_right(self.lunar_starts, ordinal) - 1
+        if i < 0 or i >= len(self.lunar_starts) - 1:
+            raise ValueError(f"음력 테이블 범위 밖의 날짜: {day}")
+        year, rest = divmod(self.lunar_codes[i], 100)
+        return year, rest % 50, ordinal - self.lunar_starts[i] + 1, rest > 50
+
+    def lunar_to_solar(self, year: int, month: int, day: int, is_leap_month: bool = False) -> date:
+        """음력 날짜 → 양력 날짜 (존재하지 않는 윤달/날짜면 ValueError)"""
+        code = year * 100 + month + (50 if is_leap_month else 0)
+        i = self.lunar_index.get(code)
+        if i is None or i >= len(self.lunar_starts) - 1:
+            kind = "윤" if is_leap_month else ""
+            raise ValueError(f"음력 {year}년 {kind}{month}월이 없습니다")
+        month_days = self.lunar_starts[i + 1] - self.lunar_starts[i]
+        if not 1 <= day <= month_days:
+            raise ValueError(f"음력 {year}년 {month}월은 {month_days}일까지 있습니다")
+        return date.fromordinal(self.lunar_starts[i] + day - 1)
+
+    def leap_month(self, year: int) -> Optional[int]:
+        """year년 윤달 (없으면 None)"""
+        for month in range(1, 13):
+            if year * 100 + month + 50 in self.lunar_index:
+                return month
+        return None
+
+
+_tables: Optional[ManseryukTables] = None
+
+
+def get_tables() -> ManseryukTables:
+    """프로세스 공용 테이블 (첫 호출 시 1번만 로드)"""
+    global _tables
+    if _tables is None:
+        _tables = ManseryukTables()
+    return _tables
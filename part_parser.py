@@ -0,0 +1,248 @@
+"""
+하이브리드 파트 스트림 파서 (토큰 단위 입력 → 파트 이벤트)
+
+응답 형식:
+    파트 본문 ... [BUTTON: 버튼 문구]
+    ---
+    다음 파트 ... [블러: 가릴 내용] ...
+    ---
+    마지막 파트 [CARDS]
+    카드ID|제목|설명
+    [/CARDS]
+
+- 새로 들어온 글자만 훑음 (이미 본 버퍼를 토큰마다 다시 검색하지 않음 → 전체 O(응답 길이))
+- '---', '[BUTTON:', '[CARDS]' 등이 토큰 경계에 걸치면 앞부분만 보류했다가 다음 토큰과 이어서 판단
+- 마커 해석은 기존 정규식 방식(split("---") 후 BUTTON → CARDS → 블러 순 치환)과 같은 결과
+  (닫히지 않은 마커, [PART ...] 같은 다른 대괄호, CARDS 안의 BUTTON 포함 - bench_part_parser.py가 무작위 비교)
+  예외: 다른 마커와 겹치는 BUTTON (한 번 훑는 방식이라 먼저 열린 마커가 이김)
+  - 블러 안의 BUTTON "[블러: [BUTTON: 예]]"
+    기존: BUTTON을 먼저 지워서 버튼 '예', 본문 '???' / 파서: 블러가 첫 ']'에서 닫혀 본문 '???]', 버튼 없음
+  - ']' 전에 [/CARDS]를 지나는 BUTTON "[CARDS]...[BUTTON: 예[/CARDS]"
+    기존: 버튼 '예[/CARDS', 닫는 태그가 사라져 CARDS가 본문에 남음 / 파서: CARDS 블록으로 처리, 버튼 없음
+- [/CARDS]가 닫히는 즉시 cards 이벤트 (파트 완료를 기다리지 않음), 블러는 part의 blurs 범위로 전달
+"""
+
+import re
+from typing import List, Optional
+
+PART_SEPARATOR = "---"
+DEFAULT_BUTTON = "다음"
+
+BUTTON_OPEN = "[BUTTON:"
+BLUR_OPEN = "[블러:"
+CARDS_OPEN = "[CARDS]"
+CARDS_CLOSE = "[/CARDS]"
+
+# 평문 구간에서 다음으로 봐야 할 위치: 구분자 또는 마커 시작
+_NEXT = re.compile(r"---|\[")
+_BUTTON = re.compile(r"\[BUTTON:\s*([^\]]+)\]")
+_OPENERS = (BUTTON_OPEN, BLUR_OPEN, CARDS_OPEN)
+_OPENER_BY_CHAR = {opener[1]: opener for opener in _OPENERS}  # '[' 다음 글자 → 마커
+
+
+def parse_cards(body: str) -> List[dict]:
+    """[CARDS] 블록 본문 → 카드 목록 (한 줄에 "id|제목|설명", 빠진 칸은 빈 문자열)"""
+    cards = []
+    for line in body.split("\n"):
+        line = line.strip()
+        if line:
+            fields = [field.strip() for field in line.split("|", 2)] + ["", ""]
+            cards.append({"id": fields[0], "title": fields[1], "description": fields[2]})
+    return cards
+
+
+def _marker_value(inner: str) -> Optional[str]:
+    """'[BUTTON:' 뒤 ~ ']' 앞 → 값 (정규식 \\s*([^\\]]+) 와 같은 규칙, 비어 있으면 마커 아님)"""
+    if not inner:
+        return None
+    return inner.lstrip() or inner[-1]
+
+
+class PartStreamParser:
+    """
+    토큰을 feed()로 넣으면 완성된 파트 이벤트를 돌려줌 (close()로 마지막 파트)
+
+    이벤트:
+    - ("part", {"index", "content", "button", "blurs"})
+      - content: 마커 제거 (BUTTON 삭제, CARDS 블록 삭제, 블러 → '???')
+      - button: 파트의 첫 [BUTTON: ...] (없으면 "다음")
+      - blurs: [{"start", "end", "text"}] - content[start:end]가 '???' 자리, text는 가린 내용
+        (위치는 문자(코드 포인트) 기준)
+    - ("cards", {"part_index", "cards": [{"id", "title", "description"}]}): [/CARDS] 도달 즉시
+      (블록만 있는 마지막 파트는 본문이 비어 part 이벤트 없이 cards만 갈 수 있음)
+    """
+
+    def __init__(self):
+        self.index = 0
+        self._pending = ""    # 아직 판단하지 못한 꼬리 (구분자/마커의 앞부분, 닫히지 않은 마커)
+        self._searched = 0    # _pending 중 종료 기호가 없다고 이미 확인한 길이 (다시 훑지 않음)
+        self._reset_part()
+
+    def _reset_part(self) -> None:
+        self._content: List[str] = []
+        self._length = 0        # _content 글자 수 (블러 위치 계산용)
+        self._blurs: List[tuple] = []  # (start, end, text) - strip 전 위치
+        self._button: Optional[str] = None
+        self._has_text = False  # 파트에 공백 아닌 글자/마커가 있었는지 (빈 파트는 건너뜀)
+
+    # ---------- 입력 ----------
+
+    def feed(self, chunk: str) -> list:
+        """토큰 1개 → 이번 토큰으로 완성된 이벤트 목록"""
+        if "-" not in chunk and "]" not in chunk:
+            if not self._pending:
+                if "[" not in chunk:
+                    # 대부분의 토큰: 구분자/마커 후보가 없으면 본문에 붙이기만 함
+                    self._content.append(chunk)
+                    self._length += len(chunk)
+                    if not self._has_text:
+                        self._has_text = not chunk.isspace()
+                    return []
+            elif self._pending.startswith(_OPENERS):
+                # 열린 마커 안: 닫는 ']'나 구분자가 올 때까지 보류만
+                self._pending += chunk
+                self._searched = len(self._pending)
+                return []
+        events: list = []
+        self._scan(self._pending + chunk, events, final=False)
+        return events
+
+    def close(self) -> list:
+        """스트림 끝 → 보류 중인 꼬리를 평문으로 확정하고 마지막 파트 이벤트"""
+        events: list = []
+        pending, self._pending, self._searched = self._pending, "", 0
+        if pending:
+            self._scan(pending, events, final=True)
+        raw = "".join(self._content)
+        if raw.strip():
+            events.append(self._part_event(raw))
+        self._reset_part()
+        return events
+
+    # ---------- 파트 조립 ----------
+
+    def _literal(self, text: str) -> None:
+        if text:
+            self._content.append(text)
+            self._length += len(text)
+            if not self._has_text and not text.isspace():
+                self._has_text = True
+
+    def _part_event(self, raw: str) -> tuple:
+        """조립된 파트 본문 → part 이벤트 (앞뒤 공백 제거만큼 블러 위치 보정)"""
+        content = raw.lstrip()
+        shift = len(raw) - len(content)
+        content = content.rstrip()
+        button = self._button if self._button is not None else DEFAULT_BUTTON
+        blurs = [{"start": start - shift, "end": end - shift, "text": text} for start, end, text in self._blurs]
+        event = ("part", {"index": self.index, "content": content, "button": button, "blurs": blurs})
+        self.index += 1
+        return event
+
+    def _end_part(self, events: list) -> None:
+        """'---' 도달 → 내용이 있던 파트면 이벤트"""
+        if self._has_text:
+            events.append(self._part_event("".join(self._content)))
+        self._reset_part()
+
+    def _set_button(self, value: str) -> None:
+        if self._button is None:
+            self._button = value
+
+    # ---------- 스캔 ----------
+
+    def _scan(self, text: str, events: list, final: bool) -> None:
+        """
+        text를 앞에서부터 한 번만 훑음
+        final=False면 판단에 글자가 더 필요한 꼬리는 _pending으로 보류
+        """
+        pos = 0
+        searched = self._searched
+        self._searched = 0
+        length = len(text)
+
+        while pos < length:
+            match = _NEXT.search(text, pos)
+            if match is None:
+                # 끝의 '-' 1~2개는 다음 토큰과 합쳐 '---'가 될 수 있음
+                keep = 0 if final else min(2, length - pos, len(text) - len(text.rstrip("-")))
+                self._literal(text[pos:length - keep])
+                pos = length - keep
+                break
+
+            start = match.start()
+            self._literal(text[pos:start])
+            if match.group() == PART_SEPARATOR:
+                self._end_part(events)
+                pos = match.end()
+                continue
+
+            end = self._marker(text, start, searched - start, final, events)
+            searched = 0
+            if end is None:
+                # 마커가 아직 닫히지 않음 → '['부터 보류
+                self._pending = text[start:]
+                self._searched = len(self._pending)
+                return
+            pos = end
+
+        self._pending = text[pos:]
+
+    def _marker(self, text: str, start: int, searched: int, final: bool, events: list) -> Optional[int]:
+        """
+        text[start] == '[' 에서 마커 처리 → 다음 스캔 위치
+        글자가 더 필요하면 None (final이면 '['를 평문으로 처리)
+        searched: text[start:]에서 종료 기호가 없다고 확인된 길이 (재스캔 생략)
+        """
+        if start + 1 == len(text):
+            if final:
+                self._literal("[")
+                return start + 1
+            return None  # '[' 에서 토큰이 끊김
+        opener = _OPENER_BY_CHAR.get(text[start + 1])
+        if opener is None or not text.startswith(opener, start):
+            if not final and opener is not None and opener.startswith(text[start:]):
+                return None  # '[BUT' 처럼 마커 앞부분에서 토큰이 끊김
+            self._literal("[")
+            return start + 1
+
+        body = start + len(opener)
+        closer = CARDS_CLOSE if opener == CARDS_OPEN else "]"
+        # 이미 훑은 구간은 건너뜀 (종료 기호가 걸쳐 있을 수 있으므로 겹치게)
+        resume = max(body, start + searched - len(CARDS_CLOSE) + 1)
+        close = text.find(closer, resume)
+        separator = text.find(PART_SEPARATOR, resume)
+
+        if separator != -1 and (close == -1 or separator < close):
+            # 마커가 닫히기 전에 파트가 끝남 → 마커 아님 (split("---")이 먼저 적용되던 것과 동일)
+            self._literal("[")
+            return start + 1
+        if close == -1:
+            if final:
+                self._literal("[")
+                return start + 1
+            return None
+
+        inner = text[body:close]
+        if opener == CARDS_OPEN:
+            # CARDS 블록 안의 BUTTON도 버튼으로 인정 (기존 치환 순서와 동일)
+            button = _BUTTON.search(inner)
+            if button:
+                self._set_button(button.group(1))
+            self._has_text = True
+            events.append(("cards", {"part_index": self.index, "cards": parse_cards(inner)}))
+            return close + len(CARDS_CLOSE)
+
+        value = _marker_value(inner)
+        if value is None:
+            # '[BUTTON:]' 처럼 값이 없으면 마커 아님
+            self._literal("[")
+            return start + 1
+        self._has_text = True
+        if opener == BUTTON_OPEN:
+            self._set_button(value)
+        else:
+            self._blurs.append((self._length, self._length + 3, value))
+            self._literal("???")
+        return close + 1
+
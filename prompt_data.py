@@ -0,0 +1,125 @@
+"""
+프롬프트에 넣는 saju_data 직렬화 (프롬프트 버전마다 선택)
+
+yaml 최상위 saju_data_format으로 고름 (없으면 pretty = 기존 출력 그대로):
+
+    saju_data_format:
+      style: compact          # pretty(기본) / compact
+      drop: [meta.이름, 신살]  # compact에서 뺄 필드 (점으로 구분한 경로)
+
+- pretty: json.dumps(ensure_ascii=False, indent=2), 목록 변수는 str(list) ("['金', '水']")
+- compact: 들여쓰기/공백 없는 JSON, 목록 변수는 "金, 水"
+  - drop에 적은 필드 제외 ([필수 정보]에 따로 들어가는 값 등)
+  - 빈 값("", [], {}, null) 제외 (0, false는 의미가 있으므로 유지)
+  - 최상위 키는 KEY_ORDER 순서 고정 (클라이언트 JSON 키 순서가 달라도 같은 프롬프트)
+
+saju_data_format도 yaml 내용이므로 바꾸면 프롬프트 버전(내용 해시)이 바뀌어 풀이 캐시도 따로 쌓임
+"""
+
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any
+
+import json_codec
+
+STYLES = ("pretty", "compact")
+
+# 만세력 엔진 출력 순서 (여기 없는 키는 원래 순서대로 뒤에)
+KEY_ORDER = (
+    "meta", "사주팔자", "핵심요소", "오행", "십성", "십이운성", "신살", "합충",
+    "대운", "세운", "용신", "기신", "공망", "귀인띠", "소인띠",
+)
+
+
+def _drop_tree(paths) -> dict:
+    """["meta.이름", "신살"] → {"meta": {"이름": None}, "신살": None} (None = 통째로 제외)"""
+    tree: dict = {}
+    for path in paths:
+        node = tree
+        keys = str(path).split(".")
+        for key in keys[:-1]:
+            child = node.get(key, {})
+            if child is None:  # 상위 필드가 이미 통째로 제외됨
+                break
+            node = node.setdefault(key, child)
+        else:
+            node[keys[-1]] = None
+    return tree
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or (isinstance(value, (str, list, dict)) and not value)
+
+
+def _prune(value: Any, drop: dict) -> Any:
+    """drop 필드와 빈 값을 뺀 사본"""
+    if isinstance(value, dict):
+        out = {}
+        for key, item in value.items():
+            sub = drop.get(key, {})
+            if sub is None:
+                continue
+            item = _prune(item, sub)
+            if not _is_empty(item):
+                out[key] = item
+        return out
+    if isinstance(value, list):
+        items = (_prune(item, {}) for item in value)
+        return [item for item in items if not _is_empty(item)]
+    return value
+
+
+def _ordered(saju_data: dict) -> dict:
+    ordered = {key: saju_data[key] for key in KEY_ORDER if key in saju_data}
+    for key, value in saju_data.items():
+        if key not in ordered:
+            ordered[key] = value
+    return ordered
+
+
+@dataclass(frozen=True)
+class SajuDataFormat:
+    """saju_data 및 목록 변수의 프롬프트 표기 방식"""
+    style: str = "pretty"
+    drop: tuple = ()
+
+    @classmethod
+    def from_prompts(cls, prompts: dict) -> "SajuDataFormat":
+        """yaml 최상위 saju_data_format → 설정 (없거나 잘못되면 pretty)"""
+        config = prompts.get("saju_data_format") or {}
+        if isinstance(config, str):
+            config = {"style": config}
+        style = config.get("style", "pretty")
+        if style not in STYLES:
+            print(f"[WARN] unknown saju_data_format style '{style}', using pretty")
+            return cls()
+        return cls(style=style, drop=tuple(config.get("drop") or ()))
+
+    @property
+    def compact(self) -> bool:
+        return self.style == "compact"
+
+    @cached_property
+    def _drop(self) -> dict:
+        return _drop_tree(self.drop)
+
+    def encode(self, saju_data: dict) -> str:
+        """saju_data 전체 → {saju_data} 변수 값"""
+        if not self.compact:
+            return json_codec.dumps_pretty(saju_data)
+        return json_codec.dumps(_prune(_ordered(saju_data), self._drop))
+
+    def format_value(self, value: Any) -> str:
+        """dict 변수 ({sinsal} 등)"""
+        if not self.compact:
+            return str(value)
+        return json_codec.dumps(_prune(value, {}))
+
+    def format_list(self, values: Any) -> str:
+        """목록 변수 ({ohang_gwada} 등): ['金', '水'] → 金, 水"""
+        if not self.compact or not isinstance(values, list):
+            return str(values)
+        return ", ".join(str(value) for value in values) or "없음"
+
+
+PRETTY = SajuDataFormat()
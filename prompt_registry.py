@@ -0,0 +1,136 @@
+"""
+프롬프트 레지스트리 - prompts/*.yaml 메모리 캐시
+- 파일마다 한 번만 파싱하고, mtime/크기가 바뀌면 내용 해시를 비교해서 바뀐 경우에만 다시 파싱
+- yaml 수정 즉시 반영되는 워크플로우는 그대로 유지 (요청마다 os.stat 1회)
+"""
+
+import os
+import hashlib
+import datetime
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import yaml
+
+from prompt_template import CompiledSection, compile_section
+
+
+# variant → 프롬프트 파일 (None 또는 기타 값이면 기본 v4.0.1)
+VARIANT_FILES = {
+    "v4.0": "v10.0_v4.0.yaml",      # 소프트 유도
+    "v4.0.1": "v10.0_v4.0.1.yaml",  # 채팅 UX 최적화
+    "v4.1": "v10.0_v4.1.yaml",      # 빠른 후킹
+}
+DEFAULT_VARIANT = "v4.0.1"
+
+
+@dataclass
+class PromptEntry:
+    """파싱된 프롬프트 파일 1개"""
+    path: Path
+    data: dict
+    mtime_ns: int
+    size: int
+    sha256: str
+    loaded_at: datetime.datetime
+    sections: dict = field(default_factory=dict)  # 섹션명 → CompiledSection (이 버전 전용)
+
+    @property
+    def version(self) -> str:
+        """내용 해시 기반 버전 (파일 내용이 같으면 항상 같은 값)"""
+        return self.sha256[:12]
+
+    def describe(self) -> dict:
+        return {
+            "file": self.path.name,
+            "version": self.version,
+            "loaded_at": self.loaded_at.isoformat(timespec="seconds"),
+        }
+
+
+class PromptRegistry:
+    """prompts 폴더의 YAML을 파싱된 dict로 캐시
+
+    반환되는 dict는 모든 요청이 공유하므로 호출하는 쪽에서 수정하지 않는다.
+    """
+
+    def __init__(self, prompts_dir: Path):
+        self.prompts_dir = Path(prompts_dir)
+        self._entries: dict = {}
+
+    def get(self, filename: str) -> Optional[dict]:
+        """파일명으로 프롬프트 조회 (변경된 경우에만 다시 파싱)"""
+        entry = self.get_entry(filename)
+        return entry.data if entry else None
+
+    def get_entry(self, filename: str) -> Optional[PromptEntry]:
+        path = self.prompts_dir / filename
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            if self._entries.pop(filename, None) is not None:
+                print(f"[WARN] Prompt file removed: {filename}")
+            return None
+
+        entry = self._entries.get(filename)
+        if entry and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+            return entry
+
+        try:
+            raw = path.read_bytes()
+        except OSError as e:
+            print(f"[WARN] {filename} read failed: {e}")
+            return entry
+
+        sha256 = hashlib.sha256(raw).hexdigest()
+        if entry and entry.sha256 == sha256:
+            # touch 등으로 mtime만 바뀐 경우 - 파싱 생략
+            entry.mtime_ns = stat.st_mtime_ns
+            entry.size = stat.st_size
+            return entry
+
+        try:
+            data = yaml.safe_load(raw.decode("utf-8"))
+        except Exception as e:
+            # 편집 도중 깨진 yaml이면 마지막 정상 버전을 계속 사용
+            print(f"[WARN] {filename} parse failed, keeping previous version: {e}")
+            return entry
+
+        entry = PromptEntry(
+            path=path,
+            data=data,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            sha256=sha256,
+            loaded_at=datetime.datetime.now(),
+        )
+        self._entries[filename] = entry
+        print(f"[{entry.loaded_at.strftime('%H:%M:%S')}] {filename} loaded from disk (version {entry.version})")
+        return entry
+
+    def get_section(self, filename: str, section_name: str) -> Optional[CompiledSection]:
+        """컴파일된 섹션 프롬프트 조회 (프롬프트 버전마다 1회 컴파일)"""
+        entry = self.get_entry(filename)
+        if entry is None:
+            return None
+        section = entry.sections.get(section_name)
+        if section is None:
+            section = compile_section(entry.data, section_name)
+            if section is not None:
+                section.version = f"{filename}:{entry.version}"
+                entry.sections[section_name] = section
+        return section
+
+    def get_variant(self, variant: Optional[str] = None) -> Optional[dict]:
+        """variant 이름으로 section 프롬프트 조회"""
+        return self.get(self.variant_file(variant))
+
+    @staticmethod
+    def variant_file(variant: Optional[str] = None) -> str:
+        return VARIANT_FILES.get(variant, VARIANT_FILES[DEFAULT_VARIANT])
+
+    def describe(self, filename: str) -> Optional[dict]:
+        """/health 용 버전 정보"""
+        entry = self.get_entry(filename)
+        return entry.describe() if entry else None
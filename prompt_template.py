@@ -0,0 +1,122 @@
+"""
+프롬프트 템플릿 사전 컴파일
+- 템플릿을 리터럴 조각 + 변수 슬롯으로 한 번만 분해
+- 렌더링은 슬롯만 채우는 1회 선형 join (변수마다 전체 문자열 str.replace 하지 않음)
+- 섹션별 생성 설정 (yaml generation: 최상위 = 파일 기본값, section_prompts.<섹션>.generation = 덮어쓰기)
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+from prompt_data import SajuDataFormat
+
+# {name} 형태의 ASCII 변수만 슬롯으로 취급 ({일주} 같은 예시 표기는 리터럴로 유지)
+_SLOT_PATTERN = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+class CompiledTemplate:
+    """슬롯 기반 템플릿"""
+
+    __slots__ = ("literals", "slots")
+
+    def __init__(self, template: str):
+        parts = _SLOT_PATTERN.split(template)
+        self.literals = parts[0::2]  # 항상 len(slots) + 1개
+        self.slots = parts[1::2]
+
+    def render(self, variables: dict) -> str:
+        """변수 슬롯 채우기 (variables에 없는 슬롯은 {name} 그대로 유지)"""
+        literals = self.literals
+        out = [literals[0]]
+        for i, name in enumerate(self.slots):
+            if name in variables:
+                out.append(str(variables[name]))
+            else:
+                out.append("{" + name + "}")
+            out.append(literals[i + 1])
+        return "".join(out)
+
+
+GENERATION_FIELDS = ("max_tokens", "stop_sequences", "temperature", "model", "gemini_model", "cascade_model")
+
+
+@dataclass(frozen=True)
+class GenerationConfig:
+    """섹션별 LLM 생성 설정 (None / 빈 값이면 클라이언트 기본값)"""
+    max_tokens: Optional[int] = None
+    stop_sequences: tuple = ()         # 출력에는 stop 텍스트까지 포함 ([/CARDS] 등 마커가 닫히도록)
+    temperature: Optional[float] = None
+    model: Optional[str] = None        # Claude (client.py)
+    gemini_model: Optional[str] = None  # Gemini (client_gemini.py)
+    cascade_model: Optional[str] = None  # 파트 0만 먼저 쓰는 빠른 Claude 모델 (cascade.py, 나머지는 model)
+
+    @classmethod
+    def from_prompts(cls, prompts: dict, section_prompt: dict) -> "GenerationConfig":
+        """파일 기본값 + 섹션 덮어쓰기 (잘못된 값은 경고 후 기본값)"""
+        merged = {**(prompts.get("generation") or {}), **(section_prompt.get("generation") or {})}
+        unknown = sorted(set(merged) - set(GENERATION_FIELDS))
+        if unknown:
+            print(f"[WARN] unknown generation keys ignored: {unknown}")
+        try:
+            return cls(
+                max_tokens=int(merged["max_tokens"]) if merged.get("max_tokens") else None,
+                stop_sequences=tuple(str(stop) for stop in merged.get("stop_sequences") or ()),
+                temperature=float(merged["temperature"]) if merged.get("temperature") is not None else None,
+                model=merged.get("model") or None,
+                gemini_model=merged.get("gemini_model") or None,
+                cascade_model=merged.get("cascade_model") or None,
+            )
+        except (TypeError, ValueError) as e:
+            print(f"[WARN] invalid generation config, using client defaults: {e}")
+            return cls()
+
+
+def system_text(system_prompt) -> str:
+    """system 프롬프트 문자열 (CompiledSection.system_blocks 같은 블록 튜플이면 이어 붙임)"""
+    return system_prompt if isinstance(system_prompt, str) else "".join(system_prompt)
+
+
+@dataclass
+class CompiledSection:
+    """(프롬프트 버전, 섹션) 단위로 컴파일된 프롬프트"""
+    name: str
+    system_prompt: str              # {common_system} 치환 완료 (요청마다 동일)
+    user_template: CompiledTemplate  # {common_data_template} 치환 후 컴파일
+    system_blocks: tuple = ()       # (공통 system, 섹션 system) - LLM 호출용, 블록마다 프롬프트 캐시 breakpoint
+    config: dict = field(default_factory=dict)  # yaml 원본 섹션 (system/user_template 외 설정 포함)
+    version: str = ""  # "파일명:내용해시" (레지스트리가 채움)
+    data_format: SajuDataFormat = field(default_factory=SajuDataFormat)  # yaml 최상위 saju_data_format
+    generation: GenerationConfig = field(default_factory=GenerationConfig)  # max_tokens, stop_sequences 등
+
+    def render_user(self, variables: dict) -> str:
+        return self.user_template.render(variables)
+
+
+def compile_section(prompts: dict, section_name: str) -> Optional[CompiledSection]:
+    """section_prompts[section_name]을 공통 블록과 합쳐서 컴파일"""
+    section_prompt = prompts.get("section_prompts", {}).get(section_name)
+    if not section_prompt:
+        return None
+
+    common_system = prompts.get("common_system", "")
+    common_data = prompts.get("common_data_template", "")
+    system_template = section_prompt.get("system", "")
+    system_prompt = system_template.replace("{common_system}", common_system)
+    user_template = section_prompt.get("user_template", "").replace("{common_data_template}", common_data)
+
+    # 공통 system으로 시작하는 섹션은 공통 부분을 따로 떼서 8개 섹션이 같은 캐시 항목을 공유
+    system_blocks = (system_prompt,)
+    if common_system and system_template.startswith("{common_system}"):
+        rest = system_prompt[len(common_system):]
+        system_blocks = (common_system, rest) if rest else (common_system,)
+
+    return CompiledSection(
+        name=section_name,
+        system_prompt=system_prompt,
+        system_blocks=system_blocks,
+        user_template=CompiledTemplate(user_template),
+        config=section_prompt,
+        data_format=SajuDataFormat.from_prompts(prompts),
+        generation=GenerationConfig.from_prompts(prompts, section_prompt),
+    )
@@ -0,0 +1,291 @@
+"""
+LLM 공급자 라우터 (Claude + Gemini, 헤지 요청 / 장애 전환)
+
+client.LLMClient(Claude), client_gemini.LLMClient(Gemini)를 한 앱에서 같이 쓰는 astream 래퍼
+- 건강 점수가 가장 좋은 공급자로 먼저 요청
+- hedge_after 안에 첫 토큰이 없으면 다음 공급자에 같은 요청을 하나 더 보냄 (헤지)
+  → 첫 토큰이 먼저 나온 쪽으로 끝까지 스트리밍, 진 쪽 스트림은 바로 닫음 (HTTP 스트림 종료 → 생성/과금 중단)
+- 첫 토큰 전에 오류가 나면 기다리지 않고 바로 다음 공급자로 (장애 전환)
+- 첫 토큰 이후 오류는 전환하지 않음 (이미 내보낸 텍스트를 다른 모델이 이어 쓸 수 없음) → "오류 발생" 텍스트 / 예외
+
+건강 점수 (공급자별, 낮을수록 먼저):
+- 첫 토큰 지연 EWMA × (1 + ERROR_WEIGHT × 오류율 EWMA) × (1 + PREFERENCE_BIAS × 설정 순서)
+- 헤지에서 진 쪽은 그때까지 기다린 시간을 첫 토큰 지연으로 기록 (느린 공급자는 점점 뒤로)
+- 첫 토큰 전 오류가 failure_threshold번 연속이면 cooldown 동안 제외 (그 뒤 다시 시도, 모두 제외 상태면 그래도 시도)
+
+모델 이름은 공급자마다 GenerationConfig에서 따로 고름 (Claude: model, Gemini: gemini_model)
+prefill 이어쓰기 요청(모델 캐스케이드)은 prefill을 지원하는 공급자(supports_prefill)에만 보냄
+"""
+
+import time
+import asyncio
+from typing import AsyncIterator, Optional
+
+from client import StreamUsage
+
+EWMA_ALPHA = 0.3
+ERROR_WEIGHT = 4.0
+PREFERENCE_BIAS = 0.5
+
+
+class ProviderHealth:
+    """공급자별 첫 토큰 지연 / 오류율 집계"""
+
+    def __init__(self, default_ttft: float):
+        self.ttft: Optional[float] = None  # 첫 토큰 지연 EWMA (초)
+        self.error_rate = 0.0              # 첫 토큰 전 오류 EWMA (0~1)
+        self.default_ttft = default_ttft   # 기록이 없을 때 쓰는 값
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+        self.requests = 0
+        self.wins = 0
+        self.failures = 0
+
+    def _observe_ttft(self, seconds: float) -> None:
+        self.ttft = seconds if self.ttft is None else self.ttft + EWMA_ALPHA * (seconds - self.ttft)
+
+    def record_success(self, ttft: float) -> None:
+        self.wins += 1
+        self._observe_ttft(ttft)
+        self.error_rate -= EWMA_ALPHA * self.error_rate
+        self.consecutive_failures = 0
+
+    def record_slow(self, waited: float) -> None:
+        """헤지에서 짐 (waited 동안 첫 토큰 없음 → 실제 지연은 그 이상)"""
+        self._observe_ttft(max(waited, self.ttft or 0.0))
+
+    def record_failure(self, now: float, failure_threshold: int, cooldown: float) -> None:
+        self.failures += 1
+        self.error_rate += EWMA_ALPHA * (1.0 - self.error_rate)
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= failure_threshold:
+            self.down_until = now + cooldown
+
+    def is_down(self, now: float) -> bool:
+        return now < self.down_until
+
+    def score(self, preference: int) -> float:
+        ttft = self.ttft if self.ttft is not None else self.default_ttft
+        return ttft * (1 + ERROR_WEIGHT * self.error_rate) * (1 + PREFERENCE_BIAS * preference)
+
+    def to_dict(self, now: float) -> dict:
+        return {
+            "requests": self.requests,
+            "wins": self.wins,
+            "failures": self.failures,
+            "ttft": round(self.ttft, 3) if self.ttft is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "down": self.is_down(now),
+        }
+
+
+class _Attempt:
+    """공급자 1곳에 보낸 스트림 + 첫 청크를 기다리는 태스크"""
+
+    def __init__(self, name: str, stream, usage: StreamUsage):
+        self.name = name
+        self.stream = stream
+        self.usage = usage
+        self.started = time.monotonic()
+        self.first = asyncio.ensure_future(stream.__anext__())
+
+    async def close(self) -> None:
+        if not self.first.done():
+            self.first.cancel()
+        await asyncio.gather(self.first, return_exceptions=True)
+        try:
+            await self.stream.aclose()
+        except Exception as e:
+            print(f"[WARN] provider {self.name} stream close failed: {e}")
+
+
+class ProviderRouter:
+    """여러 LLM 클라이언트를 하나의 astream / aprime으로 (api_server.llm_client 자리에 그대로 사용)"""
+
+    def __init__(
+        self,
+        providers: dict,
+        hedge_after: float = 2.0,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+    ):
+        """
+        Args:
+            providers: {이름: 클라이언트} - 순서가 기본 선호 순서 (앞이 primary)
+            hedge_after: 첫 토큰을 이 시간(초)만큼 못 받으면 다음 공급자에 헤지 요청 (0 이하면 헤지 없음)
+            failure_threshold: 첫 토큰 전 연속 오류가 이만큼이면 cooldown(초) 동안 제외
+        """
+        if not providers:
+            raise ValueError("ProviderRouter needs at least one provider")
+        self.providers = dict(providers)
+        self.hedge_after = hedge_after
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.health = {name: ProviderHealth(default_ttft=hedge_after or 1.0) for name in self.providers}
+        self.hedges = 0
+        self.hedge_wins = 0  # 헤지 요청이 먼저 첫 토큰을 냄
+        self.failovers = 0   # 첫 토큰 전 오류 → 다음 공급자
+
+    @property
+    def supports_prefill(self) -> bool:
+        """prefill 요청은 지원하는 공급자로만 보냄 (하나라도 있으면 True)"""
+        return any(getattr(client, "supports_prefill", False) for client in self.providers.values())
+
+    def _order(self, prefill: Optional[str] = None) -> list:
+        """요청 순서 (제외 안 된 공급자를 점수 순, 제외된 공급자는 맨 뒤)"""
+        now = time.monotonic()
+        names = [
+            name for name, client in self.providers.items()
+            if prefill is None or getattr(client, "supports_prefill", False)
+        ]
+        preference = {name: i for i, name in enumerate(self.providers)}
+        return sorted(names, key=lambda name: (
+            self.health[name].is_down(now), self.health[name].score(preference[name])
+        ))
+
+    def _start(self, name: str, system_prompt: str, user_message: str, conversation_history,
+               system_suffix, generation, prefill) -> _Attempt:
+        self.health[name].requests += 1
+        kwargs = {"prefill": prefill} if prefill is not None else {}
+        usage = StreamUsage()
+        stream = self.providers[name].astream(
+            system_prompt, user_message, conversation_history, system_suffix=system_suffix,
+            usage=usage, generation=generation, raise_errors=True, **kwargs
+        )
+        return _Attempt(name, stream, usage)
+
+    async def aprime(self, system_prompt: str, user_message: str, system_suffix: str = None,
+                     generation=None) -> None:
+        """prefill 이어쓰기를 받을 공급자(1순위)의 프롬프트 캐시 준비"""
+        for name in self._order(prefill=""):
+            client = self.providers[name]
+            if hasattr(client, "aprime"):
+                await client.aprime(system_prompt, user_message, system_suffix=system_suffix, generation=generation)
+            return
+
+    async def astream(self, system_prompt: str, user_message: str, conversation_history: list = None,
+                      system_suffix: str = None, usage: Optional[StreamUsage] = None, generation=None,
+                      prefill: Optional[str] = None, raise_errors: bool = False) -> AsyncIterator[str]:
+        """헤지 / 장애 전환 스트림 (인자는 client.LLMClient.astream과 같음)"""
+        pending = self._order(prefill)
+        attempts = []
+        winner = None
+        first_chunk = None
+        last_error: Optional[Exception] = None
+        hedge_at = None
+
+        def launch() -> None:
+            nonlocal hedge_at
+            name = pending.pop(0)
+            attempts.append(self._start(
+                name, system_prompt, user_message, conversation_history, system_suffix, generation, prefill
+            ))
+            hedge_at = time.monotonic() + self.hedge_after
+
+        try:
+            if not pending:
+                raise RuntimeError("no LLM provider supports this request")
+            launch()
+            while winner is None:
+                live = [attempt for attempt in attempts if not attempt.first.done()]
+                if not live:
+                    if not pending:
+                        break
+                    self.failovers += 1
+                    launch()
+                    continue
+
+                timeout = None
+                now = time.monotonic()
+                can_hedge = self.hedge_after > 0 and pending and not self.health[pending[0]].is_down(now)
+                if can_hedge:
+                    timeout = max(0.0, hedge_at - now)
+                done, _ = await asyncio.wait([attempt.first for attempt in live], timeout=timeout,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.hedges += 1
+                    print(f"[INFO] no first token from {live[0].name} in {self.hedge_after}s, hedging to {pending[0]}")
+                    launch()
+                    continue
+
+                for attempt in live:
+                    if not attempt.first.done():
+                        continue
+                    error = attempt.first.exception()
+                    if error is None or isinstance(error, StopAsyncIteration):
+                        winner = attempt
+                        first_chunk = None if error else attempt.first.result()
+                        break
+                    last_error = error
+                    self.health[attempt.name].record_failure(time.monotonic(), self.failure_threshold, self.cooldown)
+                    print(f"[WARN] provider {attempt.name} failed before first token: {error}")
+
+            if winner is None:
+                raise last_error or RuntimeError("all LLM providers failed")
+
+            now = time.monotonic()
+            self.health[winner.name].record_success(now - winner.started)
+            if winner is not attempts[0] and not attempts[0].first.done():
+                self.hedge_wins += 1
+            for attempt in attempts:
+                if attempt is not winner and not attempt.first.done():
+                    self.health[attempt.name].record_slow(now - attempt.started)
+                    await attempt.close()
+
+            if first_chunk is not None:
+                yield first_chunk
+                async for chunk in winner.stream:
+                    yield chunk
+            if usage is not None:
+                usage.add(winner.usage)
+
+        except Exception as e:
+            if raise_errors:
+                raise
+            yield f"오류 발생: {str(e)}"
+        finally:
+            for attempt in attempts:
+                await attempt.close()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "order": self._order(),
+            "hedge_after": self.hedge_after,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "providers": {name: health.to_dict(now) for name, health in self.health.items()},
+        }
+
+
+def create_provider_router(names: list, hedge_after: float, failure_threshold: int = 3,
+                           cooldown: float = 30.0):
+    """
+    LLM_PROVIDERS 이름 목록 → 클라이언트 (claude / gemini)
+    공급자가 1개면 라우터 없이 그 클라이언트를 그대로 반환
+    Gemini SDK(google-generativeai)가 없거나 초기화에 실패하면 경고 후 제외
+    """
+    providers = {}
+    for name in names:
+        if name in providers:
+            continue
+        if name == "claude":
+            from client import LLMClient
+            providers[name] = LLMClient()
+        elif name == "gemini":
+            try:
+                from client_gemini import LLMClient as GeminiClient
+                providers[name] = GeminiClient()
+            except Exception as e:
+                print(f"[WARN] gemini provider unavailable: {e}")
+        else:
+            print(f"[WARN] unknown LLM provider ignored: {name}")
+    if not providers:
+        from client import LLMClient
+        print("[WARN] no usable LLM provider configured, using claude")
+        return LLMClient()
+    if len(providers) == 1:
+        return next(iter(providers.values()))
+    print(f"[OK] LLM provider router: {list(providers)} (hedge after {hedge_after}s)")
+    return ProviderRouter(providers, hedge_after=hedge_after, failure_threshold=failure_threshold, cooldown=cooldown)
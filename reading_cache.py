@@ -0,0 +1,84 @@
+"""
+생성된 섹션 풀이 캐시 (content-addressed)
+- 키: (프롬프트 버전, 섹션, 정규화된 saju_data, user_name)의 sha256
+- 같은 사람이 결과 페이지를 새로고침/공유해도 LLM을 다시 호출하지 않고 저장된 텍스트를 재생
+"""
+
+import json
+import hashlib
+from typing import AsyncIterator, Optional
+
+from sse_streams import aclosing
+
+# 캐시 재생 시 토큰 이벤트 1개당 글자 수
+REPLAY_CHUNK_CHARS = 32
+
+
+def reading_cache_key(prompt_version: str, section_name: str, saju_data: Optional[dict], user_name: str) -> str:
+    """입력이 같으면 항상 같은 키 (dict 키 순서/공백과 무관)"""
+    canonical = json.dumps(saju_data or {}, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    raw = "\x1f".join([prompt_version, section_name, canonical, user_name or ""])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ReadingCache:
+    """섹션 풀이 텍스트 캐시 (백엔드: cache_backends의 Memory/Postgres)"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.truncated = 0  # max_tokens에서 잘려 저장하지 않은 풀이
+
+    async def get(self, key: str) -> Optional[str]:
+        """저장된 풀이 텍스트 (없거나 캐시 장애면 None)"""
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            print(f"[WARN] reading cache get failed: {e}")
+            value = None
+
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value.get("text")
+
+    async def put(self, key: str, text: str) -> None:
+        try:
+            await self.backend.set(key, {"text": text})
+        except Exception as e:
+            print(f"[WARN] reading cache put failed: {e}")
+
+    @staticmethod
+    async def replay(text: str) -> AsyncIterator[str]:
+        """저장된 텍스트를 토큰 스트림처럼 재생 (대기 없이 즉시)"""
+        for i in range(0, len(text), REPLAY_CHUNK_CHARS):
+            yield text[i:i + REPLAY_CHUNK_CHARS]
+
+    async def record(self, key: str, stream: AsyncIterator[str], usage=None) -> AsyncIterator[str]:
+        """
+        LLM 스트림을 그대로 흘려보내면서 수집 → 정상 종료 시에만 저장
+        stream은 오류를 예외로 올려야 함 (astream(raise_errors=True)) - 오류/중간 취소면 저장 없이 그대로 전파
+        usage(StreamUsage)의 stop_reason이 max_tokens면 잘린 풀이라 저장하지 않음 (다음 요청은 다시 생성)
+        """
+        chunks = []
+        async with aclosing(stream):
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+
+        if usage is not None and usage.stop_reason == "max_tokens":
+            self.truncated += 1
+            return
+        # 빈 응답은 저장하지 않음
+        if chunks:
+            await self.put(key, "".join(chunks))
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "truncated": self.truncated,
+        }
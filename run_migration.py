@@ -1,6 +1,8 @@
 """
 Supabase Migration 실행 스크립트
+실행: python run_migration.py [supabase/migrations/파일.sql]
 """
+import sys
 import asyncio
 import asyncpg
 from pathlib import Path
@@ -11,7 +13,7 @@ async def run_migration():
     """Migration SQL 파일 실행"""
 
     # SQL 파일 읽기
-    sql_file = Path("supabase/migrations/20260113_free_saju_records.sql")
+    sql_file = Path(sys.argv[1] if len(sys.argv) > 1 else "supabase/migrations/20260113_free_saju_records.sql")
 
     if not sql_file.exists():
         print(f"❌ SQL 파일을 찾을 수 없습니다: {sql_file}")
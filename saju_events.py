@@ -0,0 +1,105 @@
+"""
+무료 사주 계산 완료 알림 (폴링 대신 push)
+- 같은 프로세스: update_saju_status → publish() 로 대기 중인 요청을 바로 깨움
+- 다른 워커: Postgres NOTIFY → 전용 LISTEN 연결 → publish()
+- LISTEN 연결이 끊긴 동안 놓친 알림은 SSE 쪽 재확인 타이머(느린 주기)로 보완
+"""
+
+import asyncio
+from typing import Optional
+
+import asyncpg
+
+CHANNEL = "free_saju_status"
+RECONNECT_DELAY = 5.0
+
+
+class SajuEventHub:
+    """saju_id별 상태 변경 대기열"""
+
+    def __init__(self):
+        self._waiters: dict = {}  # saju_id → set(asyncio.Future)
+        self._listen_task: Optional[asyncio.Task] = None
+        self.listening = False
+        self.published = 0
+        self.notifications = 0
+
+    def subscribe(self, saju_id: int) -> asyncio.Future:
+        """다음 상태 변경 때 완료되는 future (DB 조회 전에 먼저 등록해야 알림을 놓치지 않음)"""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(saju_id, set()).add(future)
+        return future
+
+    def unsubscribe(self, saju_id: int, future: asyncio.Future) -> None:
+        waiters = self._waiters.get(saju_id)
+        if waiters is None:
+            return
+        waiters.discard(future)
+        if not waiters:
+            del self._waiters[saju_id]
+
+    def publish(self, saju_id: int, status: str) -> None:
+        """대기 중인 요청 깨우기 (future는 1회용 → 다시 기다리려면 subscribe)"""
+        self.published += 1
+        for future in self._waiters.pop(saju_id, ()):
+            if not future.done():
+                future.set_result(status)
+
+    @staticmethod
+    async def notify(conn: asyncpg.Connection, saju_id: int, status: str) -> None:
+        """다른 워커에 상태 변경 알림 (payload는 8000바이트 제한 → id/status만)"""
+        await conn.execute("SELECT pg_notify($1, $2)", CHANNEL, f"{saju_id}:{status}")
+
+    def _on_notification(self, conn, pid, channel, payload: str) -> None:
+        self.notifications += 1
+        try:
+            saju_id, status = payload.split(":", 1)
+            self.publish(int(saju_id), status)
+        except ValueError:
+            print(f"[WARN] Invalid {CHANNEL} payload: {payload}")
+
+    # ---------- LISTEN 연결 ----------
+
+    def start(self, dsn: str) -> None:
+        if self._listen_task is None:
+            self._listen_task = asyncio.create_task(self._listen_loop(dsn))
+
+    async def stop(self) -> None:
+        if self._listen_task:
+            self._listen_task.cancel()
+            try:
+                await self._listen_task
+            except asyncio.CancelledError:
+                pass
+            self._listen_task = None
+
+    async def _listen_loop(self, dsn: str) -> None:
+        """전용 연결로 LISTEN, 끊기면 재연결"""
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn, statement_cache_size=0)
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _: closed.set())
+                await conn.add_listener(CHANNEL, self._on_notification)
+                self.listening = True
+                print(f"[OK] LISTEN {CHANNEL}")
+                await closed.wait()
+                print(f"[WARN] LISTEN connection closed, reconnecting in {RECONNECT_DELAY:.0f}s")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[WARN] LISTEN {CHANNEL} failed: {e}")
+            finally:
+                self.listening = False
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    def stats(self) -> dict:
+        return {
+            "listening": self.listening,
+            "waiting": sum(len(waiters) for waiters in self._waiters.values()),
+            "published": self.published,
+            "notifications": self.notifications,
+        }
@@ -0,0 +1,285 @@
+"""
+무료 사주 계산 작업 큐 (free_saju_records 테이블 기반)
+- status='processing' + locked_at IS NULL + next_run_at <= NOW() 인 행이 대기 작업
+- FOR UPDATE SKIP LOCKED로 여러 워커/프로세스가 같은 행을 동시에 가져가지 않음
+- 동시 실행 수 제한 (workers), 실패 시 지수 백오프 재시도, 멈춘 작업(lock 만료) 회수
+- 재시작/재배포로 잃어버린 작업은 lock 만료 후 다른 워커가 다시 가져감
+
+컬럼은 supabase/migrations/20261017_free_saju_job_queue.sql
+"""
+
+import os
+import json
+import random
+import socket
+import asyncio
+from collections import deque
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+import asyncpg
+
+
+def _percentile(values: list, ratio: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * ratio))], 3)
+
+
+class SajuJobQueue:
+    """Postgres 작업 큐 + 제한된 워커 풀"""
+
+    def __init__(
+        self,
+        pool_getter: Callable[[], Optional[asyncpg.Pool]],
+        handler: Callable[[dict], Awaitable[None]],
+        on_give_up: Callable[[dict, str], Awaitable[None]],
+        workers: int = 4,
+        max_attempts: int = 3,
+        job_timeout: float = 60.0,
+        lock_timeout: float = 180.0,
+        backoff_base: float = 5.0,
+        backoff_max: float = 300.0,
+        poll_interval: float = 2.0,
+        sweep_interval: float = 30.0,
+    ):
+        """
+        Args:
+            handler: 작업 실행 (job dict: id, form_data, attempts, created_at) - 실패 시 예외
+            on_give_up: 재시도 횟수를 다 쓴 작업 처리 (job, 에러 메시지)
+            lock_timeout: 이 시간 넘게 잡혀 있는 작업은 워커가 죽은 것으로 보고 회수 (job_timeout보다 길게)
+        """
+        self._pool_getter = pool_getter
+        self.handler = handler
+        self.on_give_up = on_give_up
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.job_timeout = job_timeout
+        self.lock_timeout = lock_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self.sweep_interval = sweep_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._slots = asyncio.Semaphore(workers)
+        self._wake = asyncio.Event()
+        self._tasks: set = set()
+        self._loops: list = []
+
+        # 메트릭
+        self.running = 0
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.recovered = 0
+        self.depth = {"pending": None, "running": None, "oldest_pending_seconds": None}
+        self._latencies = deque(maxlen=500)  # 생성 → 완료 (초)
+        self._run_times = deque(maxlen=500)  # 실행 시간 (초)
+
+    def _pool(self) -> asyncpg.Pool:
+        pool = self._pool_getter()
+        if not pool:
+            raise Exception("DB pool not initialized")
+        return pool
+
+    # ---------- 수명 주기 ----------
+
+    def start(self) -> None:
+        if not self._loops:
+            self._loops = [asyncio.create_task(self._dispatch_loop()), asyncio.create_task(self._sweep_loop())]
+            print(f"[OK] Saju job queue started: {self.worker_id}, workers={self.workers}")
+
+    async def stop(self) -> None:
+        """새 작업 수령 중단 + 실행 중 작업 취소 (취소된 작업은 lock 만료 후 회수됨)"""
+        for task in self._loops + list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._loops, *self._tasks, return_exceptions=True)
+        self._loops = []
+
+    def wake(self) -> None:
+        """새 작업 등록 직후 호출 → 폴링 주기를 기다리지 않고 바로 수령"""
+        self._wake.set()
+
+    # ---------- 수령 / 실행 ----------
+
+    async def claim(self, limit: int) -> list:
+        """대기 작업 최대 limit개 수령 (attempts 증가, lock 설정)"""
+        async with self._pool().acquire() as conn:
+            rows = await conn.fetch(
+                """
+                UPDATE free_saju_records
+                SET locked_at = NOW(), locked_by = $1, attempts = attempts + 1
+                WHERE id IN (
+                    SELECT id FROM free_saju_records
+                    WHERE status = 'processing' AND locked_at IS NULL AND next_run_at <= NOW()
+                    ORDER BY next_run_at, id
+                    LIMIT $2
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, form_data, attempts, created_at
+                """,
+                self.worker_id,
+                limit
+            )
+        jobs = []
+        for row in rows:
+            form_data = row['form_data']
+            jobs.append({
+                "id": row['id'],
+                "form_data": form_data if isinstance(form_data, dict) else json.loads(form_data),
+                "attempts": row['attempts'],
+                "created_at": row['created_at'],
+            })
+        return jobs
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            try:
+                # 빈 슬롯이 생길 때까지 대기 → 빈 슬롯 수만큼 한 번에 수령
+                await self._slots.acquire()
+                free = 1
+                while free < self.workers and not self._slots.locked():
+                    await self._slots.acquire()
+                    free += 1
+
+                jobs = []
+                try:
+                    jobs = await self.claim(free)
+                finally:
+                    # 못 채운 슬롯 반환 (claim 실패면 전부 - 안 그러면 다음 acquire에서 영원히 대기)
+                    for _ in range(free - len(jobs)):
+                        self._slots.release()
+                for job in jobs:
+                    task = asyncio.create_task(self._run(job))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+
+                if not jobs:
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[WARN] Saju job dispatch failed: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _run(self, job: dict) -> None:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        self.running += 1
+        try:
+            await asyncio.wait_for(self.handler(job), self.job_timeout)
+            self.completed += 1
+            self._run_times.append(loop.time() - started)
+            created_at = job["created_at"]
+            if created_at is not None:
+                self._latencies.append((datetime.now(timezone.utc) - created_at).total_seconds())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            await self._handle_failure(job, error)
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+    def backoff(self, attempts: int) -> float:
+        """재시도 대기 시간 (지수 백오프 + ±20% 지터)"""
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.8, 1.2)
+
+    async def _handle_failure(self, job: dict, error: str) -> None:
+        try:
+            if job["attempts"] >= self.max_attempts:
+                self.failed += 1
+                print(f"[ERROR] Saju job failed permanently: ID={job['id']}, attempts={job['attempts']}, {error}")
+                await self.on_give_up(job, error)
+                return
+
+            delay = self.backoff(job["attempts"])
+            self.retried += 1
+            print(f"[WARN] Saju job retry in {delay:.1f}s: ID={job['id']}, attempts={job['attempts']}, {error}")
+            async with self._pool().acquire() as conn:
+                await conn.execute(
+                    """
+                    UPDATE free_saju_records
+                    SET locked_at = NULL, locked_by = NULL, error = $2,
+                        next_run_at = NOW() + make_interval(secs => $3)
+                    WHERE id = $1 AND status = 'processing'
+                    """,
+                    job["id"],
+                    error,
+                    delay
+                )
+        except Exception as e:
+            # 여기서 실패하면 lock 만료 후 스위퍼가 회수
+            print(f"[WARN] Saju job failure handling failed: ID={job['id']}, {e}")
+
+    # ---------- 멈춘 작업 회수 / 큐 깊이 ----------
+
+    async def sweep(self) -> int:
+        """lock이 만료된 작업을 대기 상태로 되돌리고 큐 깊이 갱신 → 회수 개수"""
+        async with self._pool().acquire() as conn:
+            recovered = await conn.fetchval(
+                """
+                WITH recovered AS (
+                    UPDATE free_saju_records
+                    SET locked_at = NULL, locked_by = NULL, next_run_at = NOW()
+                    WHERE status = 'processing' AND locked_at < NOW() - make_interval(secs => $1)
+                    RETURNING 1
+                )
+                SELECT COUNT(*) FROM recovered
+                """,
+                self.lock_timeout
+            )
+            row = await conn.fetchrow(
+                """
+                SELECT
+                    COUNT(*) FILTER (WHERE locked_at IS NULL) AS pending,
+                    COUNT(*) FILTER (WHERE locked_at IS NOT NULL) AS running,
+                    EXTRACT(EPOCH FROM NOW() - MIN(created_at) FILTER (WHERE locked_at IS NULL)) AS oldest
+                FROM free_saju_records
+                WHERE status = 'processing'
+                """
+            )
+        self.depth = {
+            "pending": row['pending'],
+            "running": row['running'],
+            "oldest_pending_seconds": round(float(row['oldest']), 1) if row['oldest'] is not None else None,
+        }
+        if recovered:
+            self.recovered += recovered
+            print(f"[WARN] Recovered {recovered} stuck saju jobs")
+            self.wake()
+        return recovered
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[WARN] Saju job sweep failed: {e}")
+            await asyncio.sleep(self.sweep_interval)
+
+    def stats(self) -> dict:
+        latencies = list(self._latencies)
+        run_times = list(self._run_times)
+        return {
+            "worker_id": self.worker_id,
+            "workers": self.workers,
+            "running": self.running,
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "recovered": self.recovered,
+            "queue_depth": self.depth,
+            "latency_seconds": {"p50": _percentile(latencies, 0.5), "p95": _percentile(latencies, 0.95)},
+            "run_seconds": {"p50": _percentile(run_times, 0.5), "p95": _percentile(run_times, 0.95)},
+        }
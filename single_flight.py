@@ -0,0 +1,64 @@
+"""
+동일 LLM 생성 합치기 (single-flight)
+
+프론트엔드가 같은 섹션을 중복 요청하는 경우(React strict mode, 재시도, 탭 2개)
+렌더링된 프롬프트가 같으면 LLM 스트림 1개만 열고, 진행 중에 들어온 같은 요청은
+그 토큰 시퀀스를 처음부터 따라 읽음 (구독자마다 자기 위치를 가짐)
+→ 상위 호출 수가 HTTP 요청 수가 아니라 고유 풀이 수에 비례
+
+- 키: sha256(system_prompt, user_message, 생성 설정) - 요청별 system_suffix(타임스탬프)는 제외
+- 구독자가 모두 떠나면 상위 스트림 즉시 취소 (stream_generations.Generation, idle_grace=0)
+  → 취소 중인 생성에는 합류하지 않고 새로 시작 (잘린 풀이를 정상 완료처럼 받지 않도록)
+- 합류한 생성이 취소되면 stream()은 GenerationCancelled를 올림 (조용히 끝나지 않음 → 캐시에도 저장 안 됨)
+- 끝난 생성은 바로 빠짐 → 이후 같은 요청은 풀이 캐시에서 재생되거나 새로 생성
+"""
+
+import hashlib
+from typing import AsyncIterator, Callable
+
+from prompt_template import system_text
+from sse_streams import aclosing
+from stream_generations import Generation
+
+
+def generation_key(system_prompt, user_message: str, generation=None) -> str:
+    """렌더링된 프롬프트 + 생성 설정(GenerationConfig) 해시 (같은 입력이면 같은 LLM 출력을 기대할 수 있는 단위)"""
+    raw = "\x1f".join([system_text(system_prompt), user_message, repr(generation) if generation else ""])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """진행 중인 LLM 토큰 스트림 (키 → Generation)"""
+
+    def __init__(self):
+        self._flights: dict = {}
+        self.started = 0
+        self.joined = 0
+
+    async def stream(self, key: str, start: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """같은 키의 스트림이 진행 중이면 합류, 없으면 start()로 새로 시작"""
+        generation = self._flights.get(key)
+        if generation is None or generation.done or generation.cancelling:
+            self._forget_done()
+            generation = Generation(key, max_events=None, idle_grace=0)
+            generation.start(start())
+            self._flights[key] = generation
+            self.started += 1
+        else:
+            self.joined += 1
+            print(f"[INFO] 동일 생성 합류: {key[:12]} (구독 {generation.subscribers + 1}개)")
+
+        async with aclosing(generation.follow(0)) as chunks:
+            async for _, chunk in chunks:
+                yield chunk
+
+    def _forget_done(self) -> None:
+        for key in [key for key, generation in self._flights.items() if generation.done or generation.cancelling]:
+            del self._flights[key]
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": sum(not (generation.done or generation.cancelling) for generation in self._flights.values()),
+            "started": self.started,
+            "joined": self.joined,
+        }
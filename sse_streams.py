@@ -0,0 +1,70 @@
+"""
+SSE 응답 수명 관리 (클라이언트가 끊으면 LLM 스트림도 바로 종료)
+
+sse-starlette는 연결 종료(http.disconnect)를 감지하면 전송 태스크를 취소하지만,
+생성기가 yield에서 멈춰 있던 경우(전송 대기 중)에는 생성기를 닫지 않고 GC에 맡김
+→ 그 사이 Anthropic/Gemini 스트림이 열린 채로 남아 토큰 생성(과금)이 계속됨
+
+- ClosingEventSourceResponse: 응답이 어떻게 끝나든 이벤트 생성기를 즉시 aclose()
+- aclosing: 생성기 안에서 감싼 하위 스트림까지 순서대로 닫히도록 사용
+  (이벤트 생성기 → section_part_events → 풀이 캐시 record → llm_token_stream → LLMClient.astream)
+"""
+
+from sse_starlette.sse import EventSourceResponse
+from starlette.types import Message, Receive, Scope, Send
+
+try:
+    from contextlib import aclosing
+except ImportError:  # Python 3.9
+    class aclosing:
+        """contextlib.aclosing (3.10+) 호환"""
+
+        def __init__(self, thing):
+            self.thing = thing
+
+        async def __aenter__(self):
+            return self.thing
+
+        async def __aexit__(self, *exc_info):
+            await self.thing.aclose()
+
+
+class StreamStats:
+    """SSE 스트림 집계 (/health)"""
+
+    def __init__(self):
+        self.active = 0
+        self.completed = 0
+        self.disconnected = 0
+
+    def to_dict(self) -> dict:
+        return {"active": self.active, "completed": self.completed, "disconnected": self.disconnected}
+
+
+stream_stats = StreamStats()
+
+
+class ClosingEventSourceResponse(EventSourceResponse):
+    """연결 종료/완료/에러 어느 경우든 이벤트 생성기를 닫는 EventSourceResponse"""
+
+    def __init__(self, content, **kwargs):
+        super().__init__(content, client_close_handler_callable=self._on_client_close, **kwargs)
+        self.disconnected = False
+
+    async def _on_client_close(self, message: Message) -> None:
+        self.disconnected = True
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        stream_stats.active += 1
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            stream_stats.active -= 1
+            if self.disconnected:
+                stream_stats.disconnected += 1
+            else:
+                stream_stats.completed += 1
+            # 전송 태스크가 끝난 뒤라 생성기는 실행 중이 아님 → 바로 닫을 수 있음
+            aclose = getattr(self.body_iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
@@ -0,0 +1,195 @@
+"""
+재접속 가능한 SSE 생성 (EventSource Last-Event-ID 재생)
+
+- Generation: LLM 스트림 1개를 클라이언트 연결과 분리된 태스크로 실행하고,
+  내보낸 이벤트를 순번(id)과 함께 제한된 재생 버퍼에 보관
+- 끊겼다가 같은 URL로 재접속하면(브라우저가 Last-Event-ID 헤더를 자동으로 붙임)
+  놓친 이벤트부터 재생 후 실시간으로 이어감 → LLM을 다시 호출하지 않음
+- 구독자가 모두 떠난 뒤 idle_grace초 안에 재접속이 없으면 LLM 스트림 취소 (버려진 풀이 과금 방지)
+- 끝난 생성은 retention초 동안 보관 후 삭제 (늦은 재접속 대응)
+
+생성은 프로세스 메모리에 있으므로 워커가 여러 개면 재접속이 같은 워커로 가야 함 (sticky session)
+"""
+
+import time
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Optional
+
+import json_codec
+from sse_streams import aclosing
+
+# 재생 버퍼 범위를 벗어난 Last-Event-ID로 재접속했을 때 보내는 에러
+RESUME_UNAVAILABLE = "resume_unavailable"
+# 구독자가 없어서 취소된 생성에 늦게 재접속했을 때 보내는 에러
+GENERATION_CANCELLED = "generation_cancelled"
+
+
+def error_event(error: str) -> dict:
+    return {"event": "error", "data": json_codec.dumps({"error": error})}
+
+
+class ReplayUnavailable(Exception):
+    """요청한 위치의 이벤트가 이미 재생 버퍼에서 밀려남"""
+
+
+class GenerationCancelled(Exception):
+    """생성이 끝까지 가지 못하고 취소됨 (남은 버퍼를 다 읽은 뒤 follow에서 발생 - 정상 종료와 구분)"""
+
+
+class Generation:
+    """
+    생성기 1개 + 재생 버퍼 + 구독자
+    - 항목은 무엇이든 가능 (SSE 이벤트 dict, 토큰 문자열 등) → follow()로 순번과 함께 읽음
+    - subscribe()는 SSE 이벤트 dict 전용 (id 부여 + 에러 이벤트)
+    """
+
+    def __init__(self, generation_id: str, max_events: Optional[int], idle_grace: float):
+        """
+        Args:
+            max_events: 재생 버퍼 크기 (None이면 제한 없음 - 처음부터 읽어야 하는 구독자용)
+            idle_grace: 구독자가 모두 떠난 뒤 취소까지 대기 (0이면 즉시 취소하고 종료까지 기다림)
+        """
+        self.id = generation_id
+        self.idle_grace = idle_grace
+        self.buffer: deque = deque(maxlen=max_events)  # (seq, 항목)
+        self.next_seq = 1
+        self.done = False
+        self.cancelled = False
+        self.cancelling = False  # cancel() 호출 후 상위 스트림이 닫히는 중 (새 구독자를 받지 않음)
+        self.subscribers = 0
+        self.finished_at: Optional[float] = None
+        self._waiter: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+
+    def start(self, events: AsyncIterator) -> None:
+        self._waiter = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(events))
+
+    async def _run(self, events: AsyncIterator) -> None:
+        try:
+            async with aclosing(events):
+                async for event in events:
+                    self.buffer.append((self.next_seq, event))
+                    self.next_seq += 1
+                    self._notify()
+        except asyncio.CancelledError:
+            self.cancelled = True
+        finally:
+            self.done = True
+            self.finished_at = time.monotonic()
+            self._notify()
+
+    def _notify(self) -> None:
+        """대기 중인 구독자 깨우기 (future는 1회용이라 매번 교체)"""
+        waiter, self._waiter = self._waiter, asyncio.get_running_loop().create_future()
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def cancel(self) -> None:
+        if self._task is not None and not self._task.done():
+            self.cancelling = True
+            self._task.cancel()
+
+    def _cancel_if_idle(self) -> None:
+        self._idle_handle = None
+        if self.subscribers == 0 and not self.done:
+            print(f"[INFO] 재접속 없음, 생성 취소: {self.id}")
+            self.cancel()
+
+    async def follow(self, after: int = 0) -> AsyncIterator[tuple]:
+        """
+        after 다음 항목부터 재생 → 실시간 (seq, 항목)
+        재생 버퍼에서 이미 밀려난 항목이 필요하면 ReplayUnavailable
+        취소된 생성이면 남은 항목을 다 내보낸 뒤 GenerationCancelled
+        """
+        self.subscribers += 1
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        cursor = after
+        try:
+            while True:
+                while cursor + 1 < self.next_seq:
+                    index = cursor + 1 - self.buffer[0][0]
+                    if index < 0:
+                        raise ReplayUnavailable(f"{self.id}: {cursor + 1} < {self.buffer[0][0]}")
+                    item = self.buffer[index]
+                    cursor = item[0]
+                    yield item
+                if self.done:
+                    if self.cancelled:
+                        raise GenerationCancelled(self.id)
+                    return
+                await self._waiter
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.done:
+                if self.idle_grace > 0:
+                    self._idle_handle = asyncio.get_running_loop().call_later(self.idle_grace, self._cancel_if_idle)
+                else:
+                    # 상위 스트림이 닫힐 때까지 기다림 (응답이 끝나는 시점에 LLM 연결도 닫혀 있도록)
+                    self.cancel()
+                    await asyncio.gather(self._task, return_exceptions=True)
+
+    async def subscribe(self, last_event_id: int = 0) -> AsyncIterator[dict]:
+        """
+        last_event_id 다음 이벤트부터 SSE 이벤트로 재생 → 실시간 (각 이벤트에 "id" 포함)
+        재생 버퍼에서 이미 밀려난 이벤트가 필요하면 resume_unavailable 에러 이벤트 후 종료
+        (에러 이벤트에는 id를 붙이지 않음 → 재접속해도 같은 위치에서 다시 시도)
+        """
+        try:
+            async with aclosing(self.follow(last_event_id)) as items:
+                async for seq, event in items:
+                    yield {**event, "id": str(seq)}
+        except ReplayUnavailable:
+            yield error_event(RESUME_UNAVAILABLE)
+        except GenerationCancelled:
+            yield error_event(GENERATION_CANCELLED)
+
+
+class GenerationRegistry:
+    """generation_id → Generation (프로세스 내)"""
+
+    def __init__(self, max_events: int = 4096, idle_grace: float = 15.0, retention: float = 120.0):
+        self.max_events = max_events
+        self.idle_grace = idle_grace
+        self.retention = retention
+        self._generations: dict = {}
+        self.started = 0
+        self.resumed = 0
+        self.cancelled = 0
+
+    def get(self, generation_id: str) -> Optional[Generation]:
+        self._expire()
+        return self._generations.get(generation_id)
+
+    def start(self, generation_id: str, events: AsyncIterator[dict]) -> Generation:
+        self._expire()
+        generation = Generation(generation_id, self.max_events, self.idle_grace)
+        generation.start(events)
+        self._generations[generation_id] = generation
+        self.started += 1
+        return generation
+
+    def _expire(self) -> None:
+        """retention이 지난 완료 생성 정리 (조회/생성 때마다)"""
+        now = time.monotonic()
+        expired = [
+            generation_id for generation_id, generation in self._generations.items()
+            if generation.done and now - generation.finished_at > self.retention
+        ]
+        for generation_id in expired:
+            self.cancelled += self._generations.pop(generation_id).cancelled
+
+    def stats(self) -> dict:
+        self._expire()
+        return {
+            "running": sum(not generation.done for generation in self._generations.values()),
+            "retained": len(self._generations),
+            "subscribers": sum(generation.subscribers for generation in self._generations.values()),
+            "started": self.started,
+            "resumed": self.resumed,
+            "cancelled": self.cancelled + sum(generation.cancelled for generation in self._generations.values()),
+        }
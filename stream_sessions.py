@@ -0,0 +1,111 @@
+"""
+EventSource 2단계 방식(/section-start → GET /section-stream/{id})의 세션 저장소
+- 세션은 1회용: GET에서 꺼내는 순간 삭제 (여러 워커가 동시에 꺼내도 1곳만 받음)
+- TTL이 지나도록 GET이 안 오면 만료 (주기적 정리로 메모리/행 회수)
+- 백엔드는 cache_backends 재사용
+  - memory: 단일 워커 (최대 개수 초과 시 오래된 세션부터 제거)
+  - postgres: 여러 uvicorn 워커 / 인스턴스 간 공유 (POST와 GET이 다른 워커로 가도 동작)
+- 세션에는 입력(variant, 섹션, 프롬프트 버전, user_name)만 저장, 프롬프트 렌더링은 GET 시점
+- saju_id(무료 사주 레코드)가 있으면 세션에 ID만 저장 (saju_data는 GET 때 DB에서, 세션 1개 ~수백 B)
+- 없으면 saju_data를 내용 해시 키로 1번만 저장 (같은 사람의 섹션 8개가 같은 항목을 참조)
+  - postgres(tiered 포함)는 dict 그대로 → 연결에 등록된 json_codec 코덱으로 JSONB 저장/조회
+  - memory는 json_codec.dumps 문자열 (파싱된 dict보다 약 1/3 크기, 꺼낼 때 다시 dict로)
+  - saju_data는 별도 백엔드(payload_backend, 개수 상한 따로) → 세션 상한은 세션 수 그대로,
+    세션이 남아 있는데 saju_data만 먼저 밀려나는 경우는 서로 다른 사람 수가 payload 상한을 넘을 때뿐
+"""
+
+import sys
+import json
+import uuid
+import hashlib
+from typing import Optional
+
+import json_codec
+
+PAYLOAD_PREFIX = "saju:"
+
+
+def saju_payload_key(saju_data: dict) -> str:
+    """saju_data 내용 해시 키 (dict 키 순서/공백과 무관, 같은 사람의 세션들이 키 문자열도 공유 - 세션당 ~100B 절약)"""
+    canonical = json.dumps(saju_data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return sys.intern(PAYLOAD_PREFIX + hashlib.sha256(canonical.encode("utf-8")).hexdigest())
+
+
+class StreamSessionStore:
+    """stream_id → 세션 dict (JSON 직렬화 가능한 값만)"""
+
+    def __init__(self, backend, payload_backend=None):
+        """
+        Args:
+            backend: stream_id → 세션
+            payload_backend: saju_data 해시 → saju_data (None이면 backend를 같이 씀 - 상한도 공유)
+        """
+        self.backend = backend
+        self.payload_backend = payload_backend if payload_backend is not None else backend
+        self.created = 0
+        self.consumed = 0
+        self.missing = 0
+        self.payload_missing = 0  # 세션은 있는데 saju_data가 먼저 만료/제거됨
+
+    async def create(self, session: dict, saju_data: Optional[dict] = None, saju_id: Optional[int] = None) -> str:
+        """
+        세션 저장 → stream_id (백엔드 장애면 예외)
+
+        saju_id가 있으면 세션에 ID만 남김 (saju_data는 호출하는 쪽이 GET 때 조회)
+        아니면 saju_data를 내용 해시로 따로 저장하고 세션에는 키만 남김
+        (이미 있으면 같은 객체를 다시 저장 → 만료 시각만 연장)
+        """
+        if saju_id is not None:
+            session = {**session, "saju_id": saju_id}
+        else:
+            payload_key = saju_payload_key(saju_data)
+            existing = await self.payload_backend.get(payload_key)
+            if existing is None:
+                existing = json_codec.dumps(saju_data) if self.payload_backend.name == "memory" else saju_data
+            await self.payload_backend.set(payload_key, existing)
+            session = {**session, "saju_key": payload_key}
+
+        stream_id = uuid.uuid4().hex[:16]
+        await self.backend.set(stream_id, session)
+        self.created += 1
+        return stream_id
+
+    async def take(self, stream_id: str) -> Optional[dict]:
+        """
+        세션 꺼내기 → 세션 + saju_data (없거나 만료됐거나 이미 사용됐으면 None)
+        saju_id 세션은 saju_data 없이 그대로 반환 (session["saju_id"])
+        saju_data 항목은 다른 섹션 세션이 같이 쓰므로 지우지 않음 (TTL로 만료)
+        """
+        try:
+            session = await self.backend.pop(stream_id)
+            payload = None
+            if session and "saju_key" in session:
+                payload = await self.payload_backend.get(session["saju_key"])
+                if payload is None:
+                    self.payload_missing += 1
+                    print(f"[WARN] stream session {stream_id}: saju_data expired or evicted")
+        except Exception as e:
+            print(f"[WARN] stream session take failed: {e}")
+            session = payload = None
+
+        if session is None or ("saju_key" in session and payload is None):
+            self.missing += 1
+            return None
+        self.consumed += 1
+        if payload is not None:
+            session["saju_data"] = json_codec.loads(payload) if isinstance(payload, str) else payload
+        return session
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "entries": len(self.backend) if hasattr(self.backend, "__len__") else None,
+            "payload_entries": (
+                len(self.payload_backend) if self.payload_backend is not self.backend
+                and hasattr(self.payload_backend, "__len__") else None
+            ),
+            "created": self.created,
+            "consumed": self.consumed,
+            "missing": self.missing,
+            "payload_missing": self.payload_missing,
+        }
@@ -0,0 +1,31 @@
+-- ============================================
+-- 무료 사주 계산 작업 큐 컬럼
+-- ============================================
+-- 작성일: 2026-10-17
+-- 목적: free_saju_records 를 그대로 작업 큐로 사용 (saju_jobs.py)
+--       - status='processing' + locked_at IS NULL + next_run_at <= NOW() 인 행이 대기 작업
+--       - 워커는 FOR UPDATE SKIP LOCKED 로 수령, 실패 시 백오프 후 재시도
+--       - locked_at 이 SAJU_JOB_LOCK_TIMEOUT 보다 오래된 행은 멈춘 작업으로 보고 회수
+-- 참고: 적용 시점에 processing 으로 남아 있던 기존 행도 대기 작업이 되어 다시 계산됨
+-- ============================================
+
+ALTER TABLE free_saju_records
+    ADD COLUMN IF NOT EXISTS attempts INT NOT NULL DEFAULT 0,             -- 수령 횟수
+    ADD COLUMN IF NOT EXISTS next_run_at TIMESTAMPTZ NOT NULL DEFAULT NOW(), -- 다음 실행 가능 시각 (재시도 백오프)
+    ADD COLUMN IF NOT EXISTS locked_at TIMESTAMPTZ,                       -- 수령 시각 (NULL = 대기)
+    ADD COLUMN IF NOT EXISTS locked_by TEXT,                              -- 수령한 워커 (호스트:PID)
+    ADD COLUMN IF NOT EXISTS finished_at TIMESTAMPTZ;                     -- completed / error 확정 시각
+
+-- 인덱스 추가 (수령 / 멈춘 작업 회수용)
+CREATE INDEX IF NOT EXISTS idx_free_saju_records_pending
+    ON free_saju_records(next_run_at, id)
+    WHERE status = 'processing' AND locked_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_free_saju_records_locked_at
+    ON free_saju_records(locked_at)
+    WHERE status = 'processing' AND locked_at IS NOT NULL;
+
+-- 코멘트 추가
+COMMENT ON COLUMN free_saju_records.attempts IS '작업 수령 횟수 (SAJU_JOB_MAX_ATTEMPTS 도달 시 error)';
+COMMENT ON COLUMN free_saju_records.next_run_at IS '다음 실행 가능 시각 (실패 시 지수 백오프)';
+COMMENT ON COLUMN free_saju_records.locked_at IS '워커 수령 시각 (NULL이면 대기 중)';
+COMMENT ON COLUMN free_saju_records.finished_at IS '완료/실패 확정 시각 (created_at 과의 차이 = 작업 지연)';
@@ -0,0 +1,24 @@
+-- ============================================
+-- 만세력 계산 결과 캐시 테이블
+-- ============================================
+-- 작성일: 2026-10-17
+-- 목적: 같은 출생 입력(생년월일시, 성별, 양/음력, 출생지, MBTI)의 만세력 API 응답 재사용
+--       (MANSERYUK_CACHE_BACKEND=tiered / postgres 일 때 사용)
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS manseryuk_cache (
+    cache_key TEXT PRIMARY KEY,                 -- sha256(기준 연도, 정규화된 출생 입력)
+    value JSONB NOT NULL,                       -- 만세력 API 응답 (enrichment 포함)
+    created_at TIMESTAMPTZ DEFAULT NOW(),       -- 생성 시각
+    accessed_at TIMESTAMPTZ DEFAULT NOW(),      -- 마지막 조회 시각 (초과분 정리 기준)
+    expires_at TIMESTAMPTZ NOT NULL             -- 만료 시각
+);
+
+-- 인덱스 추가 (정리 작업용)
+CREATE INDEX IF NOT EXISTS idx_manseryuk_cache_expires_at ON manseryuk_cache(expires_at);
+CREATE INDEX IF NOT EXISTS idx_manseryuk_cache_accessed_at ON manseryuk_cache(accessed_at DESC);
+
+-- 코멘트 추가
+COMMENT ON TABLE manseryuk_cache IS '만세력 계산 결과 캐시 (천기문 LLM 챗봇)';
+COMMENT ON COLUMN manseryuk_cache.cache_key IS '출생 입력 해시 (이름 제외, 기준 연도 포함 - 나이 필드가 연도별로 달라짐)';
+COMMENT ON COLUMN manseryuk_cache.expires_at IS '만료 시각 (MANSERYUK_CACHE_TTL)';
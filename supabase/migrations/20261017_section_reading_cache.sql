@@ -0,0 +1,24 @@
+-- ============================================
+-- 섹션 풀이 캐시 테이블
+-- ============================================
+-- 작성일: 2026-10-17
+-- 목적: 같은 입력(프롬프트 버전 + 섹션 + 사주 데이터 + 이름)의 풀이를 재사용
+--       (READING_CACHE_BACKEND=postgres 일 때 사용)
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS section_reading_cache (
+    cache_key TEXT PRIMARY KEY,                 -- sha256(프롬프트 버전, 섹션, 사주 데이터, 이름)
+    value JSONB NOT NULL,                       -- {"text": 풀이 원문}
+    created_at TIMESTAMPTZ DEFAULT NOW(),       -- 생성 시각
+    accessed_at TIMESTAMPTZ DEFAULT NOW(),      -- 마지막 조회 시각 (초과분 정리 기준)
+    expires_at TIMESTAMPTZ NOT NULL             -- 만료 시각
+);
+
+-- 인덱스 추가 (정리 작업용)
+CREATE INDEX IF NOT EXISTS idx_section_reading_cache_expires_at ON section_reading_cache(expires_at);
+CREATE INDEX IF NOT EXISTS idx_section_reading_cache_accessed_at ON section_reading_cache(accessed_at DESC);
+
+-- 코멘트 추가
+COMMENT ON TABLE section_reading_cache IS '섹션 풀이 캐시 (천기문 LLM 챗봇)';
+COMMENT ON COLUMN section_reading_cache.cache_key IS '입력 내용 해시 (프롬프트 yaml이 바뀌면 키도 바뀜)';
+COMMENT ON COLUMN section_reading_cache.expires_at IS '만료 시각 (READING_CACHE_TTL)';
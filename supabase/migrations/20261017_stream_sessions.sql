@@ -0,0 +1,37 @@
+-- ============================================
+-- EventSource 스트림 세션 테이블
+-- ============================================
+-- 작성일: 2026-10-17
+-- 목적: /section-start 에서 만든 1회용 세션을 워커 간 공유
+--       (STREAM_SESSION_BACKEND=postgres 일 때 사용, GET /section-stream/{id} 에서 DELETE ... RETURNING 으로 꺼냄)
+--       세션들이 공유하는 saju_data는 stream_session_payloads에 따로 저장
+--       (세션 개수 상한 STREAM_SESSION_MAX_ENTRIES와 따로 STREAM_SESSION_PAYLOAD_MAX_ENTRIES로 정리)
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS stream_sessions (
+    cache_key TEXT PRIMARY KEY,                 -- stream_id
+    value JSONB NOT NULL,                       -- 세션 입력 (variant, 섹션, 프롬프트 버전, 이름, saju_key 또는 saju_id)
+    created_at TIMESTAMPTZ DEFAULT NOW(),       -- 생성 시각
+    accessed_at TIMESTAMPTZ DEFAULT NOW(),      -- 저장 시각 (초과분 정리 기준)
+    expires_at TIMESTAMPTZ NOT NULL             -- 만료 시각 (GET이 안 오면 정리)
+);
+
+CREATE TABLE IF NOT EXISTS stream_session_payloads (
+    cache_key TEXT PRIMARY KEY,                 -- saju:<saju_data 해시>
+    value JSONB NOT NULL,                       -- saju_data
+    created_at TIMESTAMPTZ DEFAULT NOW(),       -- 생성 시각
+    accessed_at TIMESTAMPTZ DEFAULT NOW(),      -- 마지막 저장/조회 시각 (초과분 정리 기준)
+    expires_at TIMESTAMPTZ NOT NULL             -- 만료 시각 (STREAM_SESSION_TTL, 세션을 만들 때마다 연장)
+);
+
+-- 인덱스 추가 (정리 작업용)
+CREATE INDEX IF NOT EXISTS idx_stream_sessions_expires_at ON stream_sessions(expires_at);
+CREATE INDEX IF NOT EXISTS idx_stream_sessions_accessed_at ON stream_sessions(accessed_at DESC);
+CREATE INDEX IF NOT EXISTS idx_stream_session_payloads_expires_at ON stream_session_payloads(expires_at);
+CREATE INDEX IF NOT EXISTS idx_stream_session_payloads_accessed_at ON stream_session_payloads(accessed_at DESC);
+
+-- 코멘트 추가
+COMMENT ON TABLE stream_sessions IS 'EventSource 2단계 스트림 세션 (천기문 LLM 챗봇)';
+COMMENT ON COLUMN stream_sessions.cache_key IS 'stream_id (/section-start 응답)';
+COMMENT ON COLUMN stream_sessions.expires_at IS '만료 시각 (STREAM_SESSION_TTL)';
+COMMENT ON TABLE stream_session_payloads IS 'EventSource 스트림 세션이 공유하는 saju_data (천기문 LLM 챗봇)';
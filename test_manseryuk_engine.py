@@ -0,0 +1,139 @@
+"""
+로컬 만세력 엔진 검증 (네트워크/서버 불필요)
+
+1. 기록된 원격 응답(saju_data/*.json)과 enrichment 전체 비교
+   - meta(생년월일/성별/MBTI/출생지/기준년도)에서 입력을 복원해서 다시 계산
+   - 새 원격 응답을 saju_data/ 에 저장하면 자동으로 검증 대상에 포함
+2. 24절기 / 음력 테이블 기준값 (한국천문연구원 발표 시각/날짜)
+3. 배치 API
+
+실행: python -m pytest test_manseryuk_engine.py -q
+"""
+
+import json
+import re
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+from manseryuk_engine import calculate_batch, calculate_enrichment, calculate_pillars, diff_enrichment, ganji
+from manseryuk_tables import KST, get_tables
+
+RECORDED_DIR = Path(__file__).parent / "saju_data"
+BIRTH_PATTERN = re.compile(r"(\d{4})-(\d{2})-(\d{2})(?: (\d{2}):(\d{2}))? \((양력|음력)\)")
+
+
+def recorded_responses() -> list:
+    params = []
+    for path in sorted(RECORDED_DIR.glob("*.json")):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if "meta" in data and "사주팔자" in data:
+            params.append(pytest.param(data, id=path.stem))
+    return params
+
+
+def input_from_meta(meta: dict) -> dict:
+    year, month, day, hour, minute, calendar = BIRTH_PATTERN.match(meta["생년월일"]).groups()
+    return {
+        "name": meta["이름"],
+        "year": int(year),
+        "month": int(month),
+        "day": int(day),
+        "hour": int(hour) if hour else None,
+        "minute": int(minute) if minute else None,
+        "gender": "male" if meta["성별"] == "남자" else "female",
+        "is_lunar": calendar == "음력",
+        "mbti": meta.get("MBTI"),
+        "birth_place": meta.get("출생지"),
+        "base_year": meta["기준년도"],
+    }
+
+
+@pytest.mark.parametrize("recorded", recorded_responses())
+def test_matches_recorded_remote_response(recorded):
+    result = calculate_enrichment(**input_from_meta(recorded["meta"]))
+    for key, expected in recorded.items():
+        assert result[key] == expected, key
+
+
+def kst(unix_seconds: int) -> str:
+    """KST 분 단위 (반올림)"""
+    return datetime.fromtimestamp(unix_seconds + 30, KST).strftime("%Y-%m-%d %H:%M")
+
+
+@pytest.mark.parametrize("year, index, expected", [
+    (2024, 2, "2024-02-04 17:27"),   # 입춘
+    (2024, 5, "2024-03-20 12:06"),   # 춘분
+    (2023, 23, "2023-12-22 12:27"),  # 동지
+])
+def test_solar_terms(year, index, expected):
+    assert kst(get_tables().term_time(year, index)) == expected
+
+
+@pytest.mark.parametrize("solar, lunar", [
+    (date(2000, 2, 5), (2000, 1, 1, False)),
+    (date(2024, 2, 10), (2024, 1, 1, False)),
+    (date(2025, 1, 29), (2025, 1, 1, False)),
+    (date(2023, 3, 22), (2023, 2, 1, True)),   # 윤2월
+    (date(2020, 5, 23), (2020, 4, 1, True)),   # 윤4월
+])
+def test_lunar_conversion(solar, lunar):
+    tables = get_tables()
+    assert tables.solar_to_lunar(solar) == lunar
+    assert tables.lunar_to_solar(*lunar) == solar
+
+
+def test_leap_months():
+    tables = get_tables()
+    assert tables.leap_month(2023) == 2
+    assert tables.leap_month(2024) is None
+    with pytest.raises(ValueError):
+        tables.lunar_to_solar(2024, 2, 1, is_leap_month=True)
+
+
+def test_day_pillar_reference():
+    assert ganji(calculate_pillars(2000, 1, 1, None, None, "male")["pillars"][2]) == "戊午"
+
+
+def test_year_and_month_change_at_ipchun():
+    before = calculate_pillars(2024, 2, 4, 17, 0, "male")["pillars"]
+    after = calculate_pillars(2024, 2, 4, 18, 0, "male")["pillars"]
+    assert [ganji(i) for i in before[:2]] == ["癸卯", "乙丑"]
+    assert [ganji(i) for i in after[:2]] == ["甲辰", "丙寅"]
+
+
+def test_unknown_hour_has_no_hour_pillar():
+    result = calculate_enrichment("테스트", 1993, 1, 7, None, None, "female", base_year=2025)
+    assert result["사주팔자"]["시주"] is None
+    assert "시주" not in result["십성"]
+    assert result["meta"]["생년월일"] == "1993-01-07 (양력)"
+
+
+def test_lunar_input_matches_solar_input():
+    lunar = calculate_enrichment("테스트", 1992, 12, 15, 16, 30, "male", is_lunar=True, base_year=2025)
+    solar = calculate_enrichment("테스트", 1993, 1, 7, 16, 30, "male", base_year=2025)
+    assert lunar["사주팔자"] == solar["사주팔자"]
+
+
+def test_batch():
+    results = calculate_batch([
+        {"name": "앤드류", "year": 1993, "month": 1, "day": 7, "hour": 16, "minute": 30, "gender": "male"},
+        {"name": "없는날", "year": 2024, "month": 2, "day": 30, "hour": None, "minute": None, "gender": "female"},
+        {"name": "윤달", "year": 2024, "month": 2, "day": 1, "hour": None, "minute": None, "gender": "female",
+         "is_lunar": True, "is_leap_month": True},
+    ], base_year=2025)
+    assert results[0]["success"] and results[0]["enrichment"]["핵심요소"]["일주"] == "戊子"
+    assert [result["success"] for result in results] == [True, False, False]
+
+
+def test_diff_enrichment():
+    recorded = recorded_responses()[0].values[0]
+    result = calculate_enrichment(**input_from_meta(recorded["meta"]))
+    assert diff_enrichment(result, recorded) == []
+
+    changed = json.loads(json.dumps(recorded))
+    changed["용신"] = "없음"
+    changed["대운"]["전체"][0] = "다름"
+    del changed["공망"]
+    assert diff_enrichment(result, changed) == ["공망", "대운.전체[0]", "용신"]
@@ -0,0 +1,159 @@
+"""
+LLM 공급자 라우터 검증 (가짜 공급자 2개, 지연/오류 주입 - 네트워크 불필요)
+
+- 첫 토큰이 빠르면 헤지 없음
+- 첫 토큰이 hedge_after보다 늦으면 다른 공급자에 헤지 → 먼저 나온 쪽 사용, 진 쪽 스트림은 바로 닫힘
+- 첫 토큰 전 오류 → 기다리지 않고 다음 공급자로
+- 연속 오류 → 일시 제외, 느린 공급자 → 건강 점수가 밀려 다음 요청부터 뒤로
+- 클라이언트가 중간에 끊으면 모든 공급자 스트림이 닫힘
+
+실행: python -m pytest test_provider_router.py -q
+"""
+
+import asyncio
+
+import pytest
+
+from client import StreamUsage
+from fake_llm import FakeLLMClient
+from provider_router import ProviderRouter
+from prompt_template import GenerationConfig
+from sse_streams import aclosing
+
+TEXT = "가나다라마바사아자차카타파하" * 4
+
+
+class FakeProvider(FakeLLMClient):
+    """첫 토큰 지연 / 첫 토큰 전 오류를 주입하고 열린 스트림 수를 기록"""
+
+    def __init__(self, first_token_delay: float = 0.0, fail: bool = False, supports_prefill: bool = True):
+        super().__init__(TEXT, chunk_size=4, token_delay=0.001, first_token_delay=first_token_delay)
+        self.fail = fail
+        self.supports_prefill = supports_prefill
+        self.open = 0
+        self.closed = 0
+
+    async def astream(self, system_prompt: str, user_message: str, conversation_history: list = None,
+                      system_suffix: str = None, usage=None, generation=None, prefill=None, raise_errors=False):
+        self.calls += 1
+        self.open += 1
+        try:
+            await asyncio.sleep(self.first_token_delay)
+            if self.fail:
+                raise RuntimeError("provider down")
+            for chunk in self._chunks(generation, prefill):
+                await asyncio.sleep(self.token_delay)
+                yield chunk
+            if usage is not None:
+                usage.output_tokens = len(self.text)
+        finally:
+            self.open -= 1
+            self.closed += 1
+
+
+def collect(router: ProviderRouter, **kwargs) -> str:
+    async def run():
+        chunks = []
+        async with aclosing(router.astream("system", "user", **kwargs)) as stream:
+            async for chunk in stream:
+                chunks.append(chunk)
+        return "".join(chunks)
+
+    return asyncio.run(run())
+
+
+def test_fast_primary_no_hedge():
+    claude, gemini = FakeProvider(0.01), FakeProvider(0.01)
+    router = ProviderRouter({"claude": claude, "gemini": gemini}, hedge_after=0.2)
+    usage = StreamUsage()
+
+    assert collect(router, usage=usage) == TEXT
+    assert (claude.calls, gemini.calls) == (1, 0)
+    assert usage.output_tokens == len(TEXT)
+    assert router.hedges == 0
+
+
+def test_slow_primary_is_hedged_and_loser_closed():
+    claude, gemini = FakeProvider(1.0), FakeProvider(0.02)
+    router = ProviderRouter({"claude": claude, "gemini": gemini}, hedge_after=0.05)
+
+    assert collect(router) == TEXT
+    assert (claude.calls, gemini.calls) == (1, 1)
+    assert claude.open == 0 and claude.closed == 1  # 진 쪽은 첫 토큰 전에 닫힘
+    assert (router.hedges, router.hedge_wins) == (1, 1)
+    # 느린 공급자는 건강 점수가 밀려 다음 요청부터 뒤로
+    assert router._order() == ["gemini", "claude"]
+
+
+def test_hedge_loses_to_primary():
+    claude, gemini = FakeProvider(0.08), FakeProvider(1.0)
+    router = ProviderRouter({"claude": claude, "gemini": gemini}, hedge_after=0.05)
+
+    assert collect(router) == TEXT
+    assert (router.hedges, router.hedge_wins) == (1, 0)
+    assert gemini.calls == 1 and gemini.open == 0
+
+
+def test_error_fails_over_without_waiting():
+    claude, gemini = FakeProvider(fail=True), FakeProvider(0.01)
+    router = ProviderRouter({"claude": claude, "gemini": gemini}, hedge_after=5.0)
+
+    async def timed():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        chunks = [chunk async for chunk in router.astream("system", "user")]
+        return "".join(chunks), loop.time() - start
+
+    text, elapsed = asyncio.run(timed())
+    assert text == TEXT
+    assert elapsed < 1.0  # hedge_after(5초)를 기다리지 않음
+    assert router.failovers == 1
+    assert router.health["claude"].failures == 1
+
+
+def test_failures_reorder_and_take_provider_out():
+    claude, gemini = FakeProvider(fail=True), FakeProvider(0.01)
+    router = ProviderRouter({"claude": claude, "gemini": gemini}, hedge_after=5.0,
+                            failure_threshold=1, cooldown=60)
+
+    assert collect(router) == TEXT
+    assert router.stats()["providers"]["claude"]["down"]
+    assert router._order() == ["gemini", "claude"]
+
+    collect(router)
+    assert (claude.calls, gemini.calls) == (1, 2)  # 제외된 뒤에는 gemini로 바로
+
+    # 제외된 공급자도 나머지가 모두 실패하면 마지막으로 시도
+    claude.fail, gemini.fail = False, True
+    assert collect(router) == TEXT
+    assert (claude.calls, gemini.calls) == (2, 3)
+
+
+def test_all_providers_fail():
+    router = ProviderRouter({"claude": FakeProvider(fail=True), "gemini": FakeProvider(fail=True)})
+
+    assert collect(router).startswith("오류 발생: provider down")
+    with pytest.raises(RuntimeError):
+        collect(router, raise_errors=True)
+
+
+def test_prefill_only_to_supporting_provider():
+    claude, gemini = FakeProvider(0.5), FakeProvider(0.01, supports_prefill=False)
+    router = ProviderRouter({"gemini": gemini, "claude": claude}, hedge_after=0.05)
+
+    assert collect(router, prefill=TEXT[:8], generation=GenerationConfig()) == TEXT[8:]
+    assert (claude.calls, gemini.calls) == (1, 0)
+
+
+def test_disconnect_closes_all_streams():
+    claude, gemini = FakeProvider(1.0), FakeProvider(0.02)
+    router = ProviderRouter({"claude": claude, "gemini": gemini}, hedge_after=0.05)
+
+    async def read_one():
+        async with aclosing(router.astream("system", "user")) as stream:
+            async for _ in stream:
+                break
+
+    asyncio.run(read_one())
+    assert claude.open == 0 and gemini.open == 0
+    assert (claude.closed, gemini.closed) == (1, 1)
@@ -0,0 +1,51 @@
+"""
+무료 사주 작업 큐 디스패처 검증 (DB 불필요 - claim을 가짜로 대체)
+
+- claim이 실패해도(일시적 DB 오류, DB 풀 없음) 잡아둔 워커 슬롯을 돌려줘서 다음 작업이 실행되어야 함
+
+실행: python -m pytest test_saju_jobs.py -q
+"""
+
+import asyncio
+
+from saju_jobs import SajuJobQueue
+
+
+class FlakyClaimQueue(SajuJobQueue):
+    """claim 첫 호출은 실패, 이후 작업 1개를 한 번만 내줌"""
+
+    def __init__(self, **kwargs):
+        super().__init__(pool_getter=lambda: None, handler=self._handle, on_give_up=self._give_up, **kwargs)
+        self.claims = 0
+        self.handled = asyncio.Event()
+        self.job_given = False
+
+    async def claim(self, limit: int) -> list:
+        self.claims += 1
+        if self.claims == 1:
+            raise Exception("DB pool not initialized")
+        if self.job_given:
+            return []
+        self.job_given = True
+        return [{"id": "job-1", "form_data": {}, "attempts": 1, "created_at": None}]
+
+    async def _handle(self, job: dict) -> None:
+        self.handled.set()
+
+    async def _give_up(self, job: dict, error: str) -> None:
+        pass
+
+
+def test_claim_failure_returns_slots():
+    async def run():
+        queue = FlakyClaimQueue(workers=3, poll_interval=0.01)
+        queue.start()
+        try:
+            await asyncio.wait_for(queue.handled.wait(), timeout=2)
+            await asyncio.sleep(0.05)
+            assert queue.completed == 1 and queue.claims >= 2
+        finally:
+            await queue.stop()
+        assert queue._slots._value == queue.workers  # 실패한 claim의 슬롯도 모두 반환됨
+
+    asyncio.run(run())
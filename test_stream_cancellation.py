@@ -0,0 +1,324 @@
+"""
+SSE 클라이언트 연결 종료 → 상위 LLM 스트림 취소 검증 (네트워크/서버 불필요)
+
+가짜 느린 LLM(토큰 2,000개 × 5ms)으로 스트리밍을 시작하고, 이벤트 몇 개를 받은 뒤
+ASGI http.disconnect를 보내서 LLM 스트림이 바로 닫히는지(끝까지 생성하지 않는지) 확인
+- 전송 대기 중 끊김: 클라이언트가 읽기를 멈춘 상태(send가 막힘)에서 연결 종료
+- 중간 취소된 풀이는 풀이 캐시에 저장되지 않아야 함
+- 생성 도중 LLM 오류가 난 풀이도 캐시에 저장되지 않아야 함 (토큰 합치기로 오류 텍스트가 앞 토큰과 묶여도)
+- max_tokens에서 잘린 풀이도 캐시에 저장되지 않아야 함 (완성된 풀이로 재생되면 안 됨)
+- 동일 생성 합치기: 취소 중인 생성에는 합류하지 않고, 취소된 생성을 읽으면 조용히 끝나지 않음
+
+실행: python -m pytest test_stream_cancellation.py -q
+"""
+
+import os
+import json
+import asyncio
+
+import pytest
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-dummy-key")
+
+import api_server
+from cache_backends import MemoryCacheBackend
+from fake_llm import FakeLLMClient
+from reading_cache import ReadingCache
+from single_flight import SingleFlight
+from stream_generations import Generation, GenerationCancelled
+
+SAJU_DATA = json.loads((api_server.BASE_DIR / "saju_data" / "default.json").read_text(encoding="utf-8"))
+TOTAL_CHUNKS = 2000
+
+
+class SlowTrackingLLMClient(FakeLLMClient):
+    """토큰을 천천히 내보내면서 열린 스트림 수 / 생성한 토큰 수를 기록"""
+
+    def __init__(self):
+        super().__init__(text="가나다라마바사\n" * (TOTAL_CHUNKS // 8), chunk_size=4, token_delay=0.005)
+        self.open = 0
+        self.closed = 0
+        self.produced = 0
+
+    async def astream(self, system_prompt: str, user_message: str, conversation_history: list = None,
+                      system_suffix: str = None, usage=None, generation=None, prefill=None, raise_errors=False):
+        self.calls += 1
+        self.open += 1
+        try:
+            for chunk in self._chunks():
+                await asyncio.sleep(self.token_delay)
+                self.produced += 1
+                yield chunk
+        finally:
+            self.open -= 1
+            self.closed += 1
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    client = SlowTrackingLLMClient()
+    monkeypatch.setattr(api_server, "llm_client", client)
+    monkeypatch.setattr(api_server, "reading_cache", ReadingCache(MemoryCacheBackend(max_entries=100, ttl=60)))
+    return client
+
+
+async def request_then_disconnect(method: str, path: str, payload, events_before_disconnect: int,
+                                  block_send: bool) -> int:
+    """
+    ASGI 앱을 직접 호출 → 이벤트 N개 수신 후 http.disconnect
+    block_send=True면 N개 이후 send가 영원히 막힘 (클라이언트가 읽지 않는 상태)
+    """
+    body = json.dumps(payload).encode() if payload is not None else b""
+    body_sent = False
+    received = 0
+    enough = asyncio.Event()
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await enough.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal received
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200
+        if message["type"] == "http.response.body" and message.get("body"):
+            received += message["body"].count(b"event: ")
+            if received >= events_before_disconnect:
+                enough.set()
+                if block_send:
+                    await asyncio.Event().wait()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    await asyncio.wait_for(api_server.app(scope, receive, send), timeout=5)
+    return received
+
+
+def assert_upstream_cancelled(llm: SlowTrackingLLMClient, streams: int):
+    """
+    request_then_disconnect 직후 같은 이벤트 루프 안에서 호출
+    (asyncio.run 종료 시 남은 생성기를 일괄 정리하므로 그 뒤에 확인하면 항상 통과)
+    """
+    assert llm.calls == streams
+    assert llm.open == 0, "LLM 스트림이 열린 채로 남음"
+    assert llm.closed == streams
+    assert llm.produced < streams * TOTAL_CHUNKS // 4, "끊긴 뒤에도 생성이 계속됨"
+    assert len(api_server.reading_cache.backend) == 0, "중간 취소된 풀이가 캐시에 저장됨"
+
+
+@pytest.mark.parametrize("block_send", [False, True])
+def test_section_stream_v5_cancels_upstream(llm, block_send):
+    payload = {"section_name": "성격", "user_name": "테스트", "saju_data": SAJU_DATA}
+    async def run():
+        await request_then_disconnect("POST", "/api/v2/section-stream-v5", payload, 20, block_send)
+        assert_upstream_cancelled(llm, 1)
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("block_send", [False, True])
+def test_parallel_reading_cancels_all_sections(llm, block_send):
+    payload = {"user_name": "테스트", "saju_data": SAJU_DATA, "variant": "v4.1"}
+    sections = len(api_server.load_prompts_by_variant("v4.1")["section_prompts"])
+    async def run():
+        await request_then_disconnect("POST", "/api/v2/full-reading-parallel", payload, 40, block_send)
+        assert_upstream_cancelled(llm, sections)
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("block_send", [False, True])
+def test_eventsource_section_stream_cancels_upstream_after_grace(llm, monkeypatch, block_send):
+    """재접속 대기(STREAM_RESUME_GRACE) 동안은 생성 유지, 재접속이 없으면 취소"""
+    monkeypatch.setattr(api_server.stream_generations, "idle_grace", 0.2)
+
+    async def run():
+        session = await api_server.start_section_stream(
+            api_server.SectionRequest(section_name="성격", saju_data=SAJU_DATA, variant="v4.1")
+        )
+        await request_then_disconnect("GET", f"/api/v1/section-stream/{session['stream_id']}", None, 20, block_send)
+        assert llm.open == 1
+        await asyncio.sleep(0.3)
+        assert_upstream_cancelled(llm, 1)
+
+    asyncio.run(run())
+
+
+def test_full_reading_stream_cancels_upstream(llm):
+    payload = {"user_name": "테스트", "saju_data": SAJU_DATA}
+    async def run():
+        await request_then_disconnect("POST", "/full-reading-stream", payload, 20, block_send=True)
+        assert llm.calls == 1 and llm.open == 0
+        assert llm.produced < TOTAL_CHUNKS // 4
+
+    asyncio.run(run())
+
+
+class FailingLLMClient(FakeLLMClient):
+    """토큰 몇 개를 내보낸 뒤 API 오류 (raise_errors면 예외, 아니면 LLMClient처럼 "오류 발생" 텍스트)"""
+
+    def __init__(self, fail: bool = True):
+        super().__init__(text="가나다라마바사\n" * 4, chunk_size=2, token_delay=0.001)
+        self.fail = fail
+
+    async def astream(self, system_prompt: str, user_message: str, conversation_history: list = None,
+                      system_suffix: str = None, usage=None, generation=None, prefill=None, raise_errors=False):
+        self.calls += 1
+        for chunk in self._chunks():
+            await asyncio.sleep(self.token_delay)
+            yield chunk
+        if self.fail:
+            if raise_errors:
+                raise RuntimeError("overloaded")
+            yield "오류 발생: overloaded"
+        elif usage is not None:
+            usage.output_tokens = len(self.text)
+
+
+async def read_sse(path: str, payload) -> list:
+    """ASGI 앱을 직접 호출해서 응답 끝까지 읽은 (event, data) 목록"""
+    body = []
+    finished = asyncio.Event()
+
+    async def receive():
+        if not body:
+            body.append(b"")
+            return {"type": "http.request", "body": json.dumps(payload).encode(), "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+            if not message.get("more_body"):
+                finished.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+    }
+    await asyncio.wait_for(api_server.app(scope, receive, send), timeout=5)
+    events = []
+    for block in b"".join(body).decode().replace("\r\n", "\n").split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.mark.parametrize("section_name", ["성격", "first-impression"])  # first-impression은 모델 캐스케이드
+def test_llm_error_never_reaches_reading_cache(monkeypatch, section_name):
+    client = FailingLLMClient()
+    monkeypatch.setattr(api_server, "llm_client", client)
+    monkeypatch.setattr(api_server, "reading_cache", ReadingCache(MemoryCacheBackend(max_entries=100, ttl=60)))
+    # 창을 길게 → 오류 텍스트가 앞 토큰들과 한 프레임으로 묶임
+    monkeypatch.setattr(api_server, "token_coalescer", api_server.TokenCoalescer(window=1.0, sentence_flush=False))
+    payload = {"section_name": section_name, "user_name": "테스트", "saju_data": SAJU_DATA}
+
+    events = asyncio.run(read_sse("/api/v2/section-stream-v5", payload))
+    text = "".join(data["text"] for event, data in events if event == "token")
+    assert text.endswith("오류 발생: overloaded")  # 클라이언트에는 지금처럼 오류 텍스트
+    assert len(api_server.reading_cache.backend) == 0, "LLM 오류로 끝난 풀이가 캐시에 저장됨"
+
+    # 정상 생성이면 저장되고, 같은 요청은 LLM 호출 없이 캐시 재생
+    client.fail = False
+    events = asyncio.run(read_sse("/api/v2/section-stream-v5", payload))
+    done = next(data for event, data in events if event == "done")
+    assert len(api_server.reading_cache.backend) == 1
+    assert done["output_tokens"] == len(client.text) and not done["cached"]
+    assert done["total_tokens"] == done["token_events"] == sum(event == "token" for event, _ in events)
+
+    calls = client.calls
+    events = asyncio.run(read_sse("/api/v2/section-stream-v5", payload))
+    assert client.calls == calls
+    assert next(data for event, data in events if event == "done")["cached"]
+
+
+@pytest.mark.parametrize("section_name", ["성격", "first-impression"])
+def test_truncated_reading_is_not_cached(monkeypatch, section_name):
+    # 구분자 없는 긴 응답 → 섹션 max_tokens(청크 수)에서 잘림
+    client = FakeLLMClient(text="가나다라마바사아자차" * 20000, chunk_size=20, token_delay=0)
+    monkeypatch.setattr(api_server, "llm_client", client)
+    monkeypatch.setattr(api_server, "reading_cache", ReadingCache(MemoryCacheBackend(max_entries=100, ttl=60)))
+    payload = {"section_name": section_name, "user_name": "테스트", "saju_data": SAJU_DATA}
+
+    for _ in range(2):
+        events = asyncio.run(read_sse("/api/v2/section-stream-v5", payload))
+        assert not next(data for event, data in events if event == "done")["cached"]
+    assert len(api_server.reading_cache.backend) == 0, "max_tokens에서 잘린 풀이가 캐시에 저장됨"
+    assert api_server.reading_cache.truncated == 2 and client.calls == 2
+
+
+async def slow_closing_tokens(starts: list, text: str):
+    """토큰을 내보내다 닫힐 때 정리가 느린 상위 스트림 (취소 중 구간을 넓힘)"""
+    starts.append(1)
+    try:
+        for char in text:
+            await asyncio.sleep(0.001)
+            yield char
+    finally:
+        await asyncio.sleep(0.05)
+
+
+def test_single_flight_does_not_join_cancelling_generation():
+    text = "가나다라마바사아자차카타파하"
+
+    async def run():
+        flights = SingleFlight()
+        starts = []
+        leaving = flights.stream("key", lambda: slow_closing_tokens(starts, text))
+        await leaving.__anext__()
+        closing = asyncio.create_task(leaving.aclose())  # 마지막 구독자가 떠남 → 생성 취소 시작
+        await asyncio.sleep(0.01)
+
+        joined = "".join([chunk async for chunk in flights.stream("key", lambda: slow_closing_tokens(starts, text))])
+        await closing
+        assert joined == text  # 잘린 풀이가 아니라 새 생성 전체
+        assert len(starts) == 2 and flights.joined == 0
+
+    asyncio.run(run())
+
+
+def test_cancelled_generation_follow_raises():
+    async def run():
+        generation = Generation("gen", max_events=None, idle_grace=0)
+        generation.start(slow_closing_tokens([], "가나다라"))
+        await asyncio.sleep(0.003)
+        generation.cancel()
+        items = []
+        with pytest.raises(GenerationCancelled):
+            async for _, item in generation.follow(0):
+                items.append(item)
+        assert "".join(items) == "가나다라"[:len(items)]
+
+        # SSE 이벤트 구독은 에러 이벤트로 끝남 (재접속 시 generation_cancelled)
+        async def token_events():
+            async for char in slow_closing_tokens([], "가나다라"):
+                yield {"event": "token", "data": char}
+
+        generation = Generation("gen-sse", max_events=None, idle_grace=0)
+        generation.start(token_events())
+        await asyncio.sleep(0.003)
+        generation.cancel()
+        events = [event async for event in generation.subscribe(0)]
+        assert events[-1]["event"] == "error" and "generation_cancelled" in events[-1]["data"]
+
+    asyncio.run(run())
@@ -0,0 +1,126 @@
+"""
+토큰 합치기 (LLM 토큰 스트림 → SSE 프레임 묶음)
+
+한국어 출력은 토큰(delta) 1개가 1~3글자라서, 토큰마다 SSE 프레임 + json.dumps를 만들면
+글자보다 프레임 오버헤드(CPU, 전송 바이트)가 커짐 → 짧은 시간 창 안의 토큰을 1개 청크로 묶음
+
+내보내는 시점 (먼저 오는 것):
+- 스트림 첫 토큰: 즉시 (TTFT 영향 없음)
+- 묶인 크기가 max_bytes(UTF-8) 이상
+- 문장 경계 (토큰이 . ? ! … 로 끝나거나 줄바꿈 포함) - 타이핑 효과가 문장 단위로 끊기지 않게
+- 첫 토큰이 묶인 뒤 window초 경과 (상위 스트림이 멈춰도 타이머로 내보냄)
+
+상위 스트림은 별도 태스크가 읽음 → 프레임을 기다리는 동안에도 토큰을 계속 받음
+합친 스트림이 닫히면(클라이언트 끊김) 읽기 태스크를 취소하고 상위 스트림까지 닫음
+"""
+
+import asyncio
+from typing import AsyncIterator, Optional
+
+from sse_streams import aclosing
+
+SENTENCE_ENDINGS = (".", "?", "!", "…", "。")
+
+
+class TokenCoalescer:
+    """토큰 스트림 합치기 설정 + 집계 (/health)"""
+
+    def __init__(self, window: float = 0.04, max_bytes: int = 96, sentence_flush: bool = True):
+        """
+        Args:
+            window: 묶음 최대 대기 (초, 0이면 합치지 않고 그대로 통과)
+            max_bytes: 묶음이 이 크기(UTF-8 바이트) 이상이면 바로 내보냄
+            sentence_flush: 문장 경계에서 바로 내보냄
+        """
+        self.window = window
+        self.max_bytes = max_bytes
+        self.sentence_flush = sentence_flush
+        self.tokens = 0
+        self.frames = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def _is_boundary(self, chunk: str) -> bool:
+        return "\n" in chunk or chunk.rstrip().endswith(SENTENCE_ENDINGS)
+
+    async def stream(self, tokens: AsyncIterator[str]) -> AsyncIterator[str]:
+        """토큰 스트림 → 합친 청크 스트림 (이어 붙이면 원래 텍스트와 같음)"""
+        if not self.enabled:
+            async with aclosing(tokens):
+                async for chunk in tokens:
+                    self.tokens += 1
+                    self.frames += 1
+                    yield chunk
+            return
+
+        loop = asyncio.get_running_loop()
+        pending: list = []
+        pending_bytes = 0
+        ready = asyncio.Event()
+        timer: Optional[asyncio.TimerHandle] = None
+        first = True
+        finished = False
+        error: Optional[BaseException] = None
+
+        async def pump() -> None:
+            nonlocal pending_bytes, timer, first, finished, error
+            try:
+                async with aclosing(tokens):
+                    async for chunk in tokens:
+                        if not chunk:
+                            continue
+                        self.tokens += 1
+                        pending.append(chunk)
+                        pending_bytes += len(chunk.encode("utf-8"))
+                        if (
+                            first
+                            or pending_bytes >= self.max_bytes
+                            or (self.sentence_flush and self._is_boundary(chunk))
+                        ):
+                            first = False
+                            ready.set()
+                        elif timer is None and not ready.is_set():
+                            timer = loop.call_later(self.window, ready.set)
+            except Exception as e:
+                error = e
+            finally:
+                finished = True
+                ready.set()
+
+        reader = asyncio.create_task(pump())
+        try:
+            while True:
+                await ready.wait()
+                ready.clear()
+                if timer is not None:
+                    timer.cancel()
+                    timer = None
+                if pending:
+                    text = "".join(pending)
+                    pending.clear()
+                    pending_bytes = 0
+                    self.frames += 1
+                    yield text
+                if finished and not pending:
+                    break
+            if error is not None:
+                raise error
+        finally:
+            if timer is not None:
+                timer.cancel()
+            if not reader.done():
+                # 클라이언트가 끊음 → 상위 스트림(LLM)까지 닫힐 때까지 기다림
+                reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "window_ms": round(self.window * 1000),
+            "max_bytes": self.max_bytes,
+            "tokens": self.tokens,
+            "frames": self.frames,
+            "tokens_per_frame": round(self.tokens / self.frames, 2) if self.frames else None,
+        }